@@ -0,0 +1,416 @@
+"""
+EASY_SECURE™ Backup Benchmark Suite
+Version: 1.0
+
+Usage:
+    python -m src.benchmarks.backup_benchmark [--scale 0.1] [--modes mirror chunked]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.easy_secure import chunk_store
+from src.easy_secure.backup_config import BackupConfig
+
+SUITE_VERSION = 1
+OPERATIONS = ("backup", "verify_quick", "verify_deep", "restore", "info")
+DEFAULT_RESULTS = os.path.join("benchmarks", "results.jsonl")
+
+# A drop in speed or a rise in memory beyond this fraction is a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Timings this short are mostly noise and are never flagged
+MIN_SECONDS = 0.05
+
+# Chunking slower than this makes full chunked backups of large trees
+# take hours, whatever the baseline
+MIN_CHUNKER_MB_PER_S = 50.0
+
+MB = 1024 * 1024
+
+
+def _write_file(path: str, rng: random.Random, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining:
+            block = min(remaining, 4 * MB)
+            f.write(rng.randbytes(block))
+            remaining -= block
+
+
+def _tiny_files(root: str, rng: random.Random, scale: float):
+    """Many small files spread over a shallow tree."""
+    for i in range(max(1, int(20000 * scale))):
+        _write_file(
+            os.path.join(root, f"d{i % 100:02d}", f"f{i:06d}.txt"),
+            rng, rng.randint(64, 4096)
+        )
+
+
+def _huge_files(root: str, rng: random.Random, scale: float):
+    """A few large files."""
+    for i in range(3):
+        _write_file(
+            os.path.join(root, f"huge_{i}.bin"), rng,
+            max(MB, int(256 * MB * scale))
+        )
+
+
+def _sparse_files(root: str, rng: random.Random, scale: float):
+    """Large files that are mostly holes."""
+    os.makedirs(root, exist_ok=True)
+    for i in range(4):
+        size = max(4 * MB, int(512 * MB * scale))
+        with open(os.path.join(root, f"sparse_{i}.img"), 'wb') as f:
+            for offset in range(0, size, size // 8):
+                f.seek(offset)
+                f.write(rng.randbytes(64 * 1024))
+            f.truncate(size)
+
+
+def _deep_tree(root: str, rng: random.Random, scale: float):
+    """A long chain of nested directories with a few files at each level."""
+    path = root
+    for depth in range(max(2, int(64 * min(1.0, scale * 10)))):
+        path = os.path.join(path, f"level{depth:02d}")
+        for i in range(8):
+            _write_file(os.path.join(path, f"f{i}.dat"), rng, rng.randint(1024, 32768))
+
+
+def _mixed(root: str, rng: random.Random, scale: float):
+    """A blend of the other shapes, like a real home directory."""
+    _tiny_files(os.path.join(root, "docs"), rng, scale / 4)
+    _huge_files(os.path.join(root, "media"), rng, scale / 4)
+    _sparse_files(os.path.join(root, "vm"), rng, scale / 4)
+    _deep_tree(os.path.join(root, "src"), rng, scale / 4)
+
+
+SCENARIOS: Dict[str, Callable[[str, random.Random, float], None]] = {
+    "tiny": _tiny_files,
+    "huge": _huge_files,
+    "sparse": _sparse_files,
+    "deep": _deep_tree,
+    "mixed": _mixed,
+}
+
+
+def generate_tree(scenario: str, root: str, scale: float = 1.0,
+                  seed: int = 1) -> dict:
+    """Build a synthetic source tree; the same seed gives the same tree."""
+    SCENARIOS[scenario](root, random.Random(f"{scenario}:{seed}"), scale)
+    files = 0
+    size = 0
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(dir_path, name))
+    return {'files': files, 'bytes': size}
+
+
+def _run_operation(operation: str, workdir: str, source: str, options: dict) -> dict:
+    """Run one operation from ``workdir`` and measure it."""
+    os.chdir(workdir)
+    config = BackupConfig("bench", **options)
+    latest = config._latest_backup()
+
+    usage_before = _usage()
+    started = time.perf_counter()
+    if operation == "backup":
+        result = config.create_backup(source)
+    elif operation.startswith("verify"):
+        result = config.verify_backup(latest, level=operation.split("_")[1])
+    elif operation == "restore":
+        target = os.path.join(workdir, "restore")
+        shutil.rmtree(target, ignore_errors=True)
+        result = config.restore_backup(target, latest)
+    else:
+        result = config.get_backup_info(latest)
+    seconds = time.perf_counter() - started
+    usage_after = _usage()
+
+    return {
+        'status': result.get('status', 'error'),
+        'seconds': seconds,
+        'cpu_seconds': (
+            round(usage_after['cpu_seconds'] - usage_before['cpu_seconds'], 4)
+            if usage_after else None
+        ),
+        'peak_rss_mb': usage_after['peak_rss_mb'] if usage_after else None
+    }
+
+
+def _usage() -> Optional[dict]:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = usage.ru_maxrss / (MB if sys.platform == "darwin" else 1024)
+    return {
+        'cpu_seconds': usage.ru_utime + usage.ru_stime,
+        'peak_rss_mb': round(rss, 1)
+    }
+
+
+def _isolated(operation: str, workdir: str, source: str, options: dict) -> dict:
+    """Run an operation in a fresh process so its peak RSS is its own."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_run_operation, (operation, workdir, source, options))
+
+
+def measure_chunker(scale: float = 1.0, seed: int = 1) -> dict:
+    """Throughput of content-defined chunking on random data."""
+    size = max(4 * MB, int(64 * MB * scale))
+    data = random.Random(seed).randbytes(size)
+    chunker = chunk_store.Chunker()
+    started = time.perf_counter()
+    chunks = sum(1 for _ in chunker.chunks(io.BytesIO(data)))
+    seconds = max(time.perf_counter() - started, 1e-9)
+    return {
+        'mb_per_s': round(size / MB / seconds, 1),
+        'chunks': chunks,
+        'vectorized': chunk_store.numpy is not None
+    }
+
+
+def run_suite(scenarios: Iterable[str] = None, modes: Iterable[str] = ("mirror",),
+              scale: float = 1.0, workers: int = 1, seed: int = 1,
+              isolate: bool = True, workdir: str = None) -> dict:
+    """Benchmark every operation for each scenario and backup mode.
+
+    With ``isolate`` each operation runs in its own process, so peak RSS
+    and CPU time belong to that operation alone.
+    """
+    scenarios = list(scenarios or SCENARIOS)
+    cwd = os.getcwd()
+    base = workdir or tempfile.mkdtemp(prefix="easy_secure_bench_")
+    results = []
+    try:
+        for scenario in scenarios:
+            source = os.path.join(base, scenario, "source")
+            tree = generate_tree(scenario, source, scale, seed)
+            for mode in modes:
+                run_dir = os.path.join(base, scenario, mode)
+                os.makedirs(run_dir, exist_ok=True)
+                options = {'backup_mode': mode, 'workers': workers}
+                for operation in OPERATIONS:
+                    runner = _isolated if isolate else _run_operation
+                    measured = runner(operation, run_dir, source, options)
+                    os.chdir(cwd)
+                    seconds = max(measured['seconds'], 1e-9)
+                    moves_data = operation not in ("info", "verify_quick")
+                    results.append({
+                        'scenario': scenario,
+                        'mode': mode,
+                        'operation': operation,
+                        **measured,
+                        'seconds': round(measured['seconds'], 4),
+                        'mb_per_s': round(tree['bytes'] / MB / seconds, 2)
+                        if moves_data else None,
+                        'files_per_s': round(tree['files'] / seconds, 1)
+                        if operation != "info" else None,
+                        'tree_files': tree['files'],
+                        'tree_bytes': tree['bytes']
+                    })
+                shutil.rmtree(run_dir, ignore_errors=True)
+            shutil.rmtree(os.path.dirname(source), ignore_errors=True)
+    finally:
+        os.chdir(cwd)
+        if workdir is None:
+            shutil.rmtree(base, ignore_errors=True)
+
+    return {
+        'suite_version': SUITE_VERSION,
+        'timestamp': datetime.now().isoformat(),
+        'commit': _git_commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'scale': scale,
+        'workers': workers,
+        'seed': seed,
+        'chunker': measure_chunker(scale, seed),
+        'results': results
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_run(run: dict, results_file: str = DEFAULT_RESULTS):
+    """Append a run to the results history."""
+    os.makedirs(os.path.dirname(results_file) or '.', exist_ok=True)
+    with open(results_file, 'a') as f:
+        f.write(f"{json.dumps(run)}\n")
+
+
+def load_runs(results_file: str = DEFAULT_RESULTS) -> List[dict]:
+    """Read the results history, oldest first."""
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline_for(run: dict, history: List[dict]) -> Optional[dict]:
+    """The latest earlier run measured under the same conditions."""
+    for previous in reversed(history):
+        if previous is run:
+            continue
+        if all(previous.get(key) == run.get(key)
+               for key in ('suite_version', 'host', 'scale', 'workers', 'seed')):
+            return previous
+    return None
+
+
+def compare(baseline: dict, run: dict,
+            threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """List operations that got slower or hungrier since the baseline."""
+    before = {
+        (r['scenario'], r['mode'], r['operation']): r for r in baseline['results']
+    }
+    regressions = []
+    for result in run['results']:
+        old = before.get((result['scenario'], result['mode'], result['operation']))
+        if old is None:
+            continue
+        checks = (
+            ('seconds', result['seconds'], old['seconds']),
+            ('cpu_seconds', result.get('cpu_seconds'), old.get('cpu_seconds')),
+            ('peak_rss_mb', result.get('peak_rss_mb'), old.get('peak_rss_mb')),
+        )
+        for metric, new_value, old_value in checks:
+            if new_value is None or not old_value:
+                continue
+            if metric != 'peak_rss_mb' and max(new_value, old_value) < MIN_SECONDS:
+                continue
+            change = (new_value - old_value) / old_value
+            if change > threshold:
+                regressions.append({
+                    'scenario': result['scenario'],
+                    'mode': result['mode'],
+                    'operation': result['operation'],
+                    'metric': metric,
+                    'before': old_value,
+                    'after': new_value,
+                    'change_percent': round(change * 100, 1)
+                })
+
+    old_rate = (baseline.get('chunker') or {}).get('mb_per_s')
+    new_rate = (run.get('chunker') or {}).get('mb_per_s')
+    if old_rate and new_rate:
+        # Throughput: a drop is the regression, reported as slowdown
+        change = old_rate / new_rate - 1
+        if change > threshold:
+            regressions.append(_chunker_regression(old_rate, new_rate, change))
+    return regressions
+
+
+def _chunker_regression(before: float, after: float, change: float) -> dict:
+    return {
+        'scenario': 'chunker',
+        'mode': '-',
+        'operation': 'chunking',
+        'metric': 'mb_per_s',
+        'before': before,
+        'after': after,
+        'change_percent': round(change * 100, 1)
+    }
+
+
+def check_chunker(run: dict, minimum: float = MIN_CHUNKER_MB_PER_S) -> List[dict]:
+    """Flag chunking throughput below the absolute minimum."""
+    rate = (run.get('chunker') or {}).get('mb_per_s')
+    if rate is None or rate >= minimum:
+        return []
+    return [_chunker_regression(minimum, rate, minimum / rate - 1)]
+
+
+def format_table(run: dict) -> str:
+    """Render a run as a fixed-width table."""
+    header = (
+        f"{'scenario':<8} {'mode':<8} {'operation':<13} {'status':<8} "
+        f"{'seconds':>9} {'MB/s':>9} {'files/s':>10} {'cpu s':>8} {'rss MB':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in run['results']:
+        lines.append(
+            f"{r['scenario']:<8} {r['mode']:<8} {r['operation']:<13} "
+            f"{r['status']:<8} {r['seconds']:>9.3f} "
+            f"{r['mb_per_s'] if r['mb_per_s'] is not None else '-':>9} "
+            f"{r['files_per_s'] if r['files_per_s'] is not None else '-':>10} "
+            f"{r['cpu_seconds'] if r['cpu_seconds'] is not None else '-':>8} "
+            f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>8}"
+        )
+    chunker = run.get('chunker')
+    if chunker:
+        lines.append(
+            f"\nchunking: {chunker['mb_per_s']} MB/s "
+            f"({'vectorized' if chunker['vectorized'] else 'pure Python'})"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark EASY_SECURE backups")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", default=["mirror"])
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Tree size relative to the full suite (about 3 GB)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--workdir", help="Where trees are built (default: temp)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    run = run_suite(args.scenarios, args.modes, args.scale, args.workers,
+                    args.seed, workdir=args.workdir)
+    print(format_table(run))
+
+    baseline = baseline_for(run, load_runs(args.results))
+    if not args.no_save:
+        save_run(run, args.results)
+    regressions = check_chunker(run)
+    if baseline:
+        regressions += compare(baseline, run)
+        print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    elif regressions:
+        print(f"\nBelow the {MIN_CHUNKER_MB_PER_S} MB/s chunking minimum:")
+    for r in regressions:
+        print(
+            f"  REGRESSION {r['scenario']}/{r['mode']}/{r['operation']} "
+            f"{r['metric']}: {r['before']} -> {r['after']} "
+            f"(+{r['change_percent']}%)"
+        )
+    if baseline and not regressions:
+        print("  no regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+PrecisionWatch™ Sampler Benchmark
+Version: 1.0
+
+Usage:
+    python -m src.benchmarks.sampler_benchmark [--iterations 2000]
+"""
+
+import sys
+import time
+import argparse
+from typing import Callable, Dict, List
+
+from src.precisionwatch.procfs import ProcCounters, PsutilCounters
+from src.precisionwatch.rate_sampler import RateSampler
+
+FAMILIES = ("cpu_times", "memory", "disk_io", "net_io", "connection_count")
+
+
+def _per_call(func: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per call, after one warm-up call."""
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _tick(counters) -> Callable[[], None]:
+    """One collector tick's worth of counter reads and rate math."""
+    sampler = RateSampler(counters=counters)
+
+    def tick():
+        sampler.cpu()
+        sampler.disk_io()
+        sampler.net_io()
+        counters.memory()
+        counters.connection_count()
+    return tick
+
+
+def run(iterations: int = 2000) -> Dict[str, Dict[str, float]]:
+    """Microseconds per sample for each backend, by counter family."""
+    backends = {'psutil': PsutilCounters()}
+    if sys.platform.startswith('linux'):
+        backends['procfs'] = ProcCounters()
+
+    results = {}
+    for name, counters in backends.items():
+        results[name] = {
+            family: round(_per_call(getattr(counters, family), iterations), 1)
+            for family in FAMILIES
+        }
+        results[name]['tick'] = round(_per_call(_tick(counters), iterations), 1)
+    return results
+
+
+def format_table(results: Dict[str, Dict[str, float]]) -> str:
+    names = list(results)
+    rows = list(FAMILIES) + ['tick']
+    lines = [f"{'us/sample':<18}" + "".join(f"{name:>12}" for name in names)]
+    if len(names) == 2:
+        lines[0] += f"{'speedup':>10}"
+    for row in rows:
+        line = f"{row:<18}" + "".join(f"{results[name][row]:>12.1f}" for name in names)
+        if len(names) == 2 and results[names[1]][row]:
+            line += f"{results[names[0]][row] / results[names[1]][row]:>9.1f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare psutil and /proc sampling cost"
+    )
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+    print(format_table(run(args.iterations)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+EASY_SECURE™ Compressed Archive Format
+Version: 1.0
+"""
+
+import os
+import bz2
+import lzma
+import zlib
+import hashlib
+from typing import Callable, Dict, Iterable, Iterator, List
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_SEGMENT_SIZE = 256 * 1024 * 1024
+
+
+class Codec:
+    """A named block compressor; levels follow the codec's own scale."""
+
+    def __init__(self, name: str, compress: Callable, decompress: Callable,
+                 default_level: int):
+        self.name = name
+        self._compress = compress
+        self._decompress = decompress
+        self.default_level = default_level
+
+    def compress(self, data: bytes, level: int = None) -> bytes:
+        return self._compress(
+            data, self.default_level if level is None else level
+        )
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompress(data)
+
+
+CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Make a codec available to archive backups.
+
+    Codecs used with process workers must be registered at import time so
+    the worker processes see them too.
+    """
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a registered codec by name."""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown compression codec: {name}") from None
+
+
+register_codec(Codec('none', lambda data, level: data, lambda data: data, 0))
+register_codec(Codec('zlib', zlib.compress, zlib.decompress, 6))
+register_codec(Codec('bz2', bz2.compress, bz2.decompress, 9))
+register_codec(Codec(
+    'lzma',
+    lambda data, level: lzma.compress(data, preset=level),
+    lzma.decompress,
+    6
+))
+
+
+def segment_name(segment: int) -> str:
+    """File name of an archive segment."""
+    return f"segment_{segment:05d}.seg"
+
+
+def _compress_block_task(job: tuple) -> tuple:
+    """Read, compress and seal one block; runs on a worker thread or process."""
+    index, file_path, offset, length, codec_name, level, throttle, cipher = job
+    if throttle and file_path:
+        throttle.consume(files=1 if offset == 0 else 0, nbytes=length)
+    if length:
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            raw = f.read(length)
+    else:
+        raw = b''
+    if not raw:
+        return index, raw, b''
+    compressed = get_codec(codec_name).compress(raw, level)
+    return index, raw, cipher.seal(compressed) if cipher else compressed
+
+
+def _block_cost(job: tuple) -> tuple:
+    _, file_path, offset, length = job[:4]
+    if not file_path:
+        return 0, 0
+    return (1 if offset == 0 else 0), length
+
+
+class ArchiveWriter:
+    """Streams files into compressed, seekable segment files.
+
+    Each file is cut into fixed-size blocks that are compressed on their own,
+    so any block can be read back without decompressing its neighbours. A
+    file's entry in the snapshot manifest lists its blocks as
+    ``[segment, offset, compressed size, raw size]``. With a cipher, each
+    block is sealed right after compression on the same worker.
+    """
+
+    def __init__(self, archive_dir: str, codec: str = "zlib", level: int = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 segment_size: int = DEFAULT_SEGMENT_SIZE, cipher=None):
+        self.archive_dir = archive_dir
+        self.cipher = cipher
+        self.codec = get_codec(codec)
+        self.level = self.codec.default_level if level is None else level
+        self.block_size = block_size
+        self.segment_size = segment_size
+        # Continue after any segments already in the directory
+        self.segment = 0
+        while os.path.exists(os.path.join(archive_dir, segment_name(self.segment))):
+            self.segment += 1
+        self.bytes_written = 0
+        self._handle = None
+        self._offset = 0
+
+    def write(self, tasks: Iterable, engine) -> Iterator[tuple]:
+        """Archive changed files, yielding (task, entry data, bytes written).
+
+        Tasks that carry an earlier entry are passed through with no data.
+        Blocks are compressed on the engine's workers and appended here in
+        order.
+        """
+        pending = {}
+        jobs = self._block_jobs(tasks, pending, engine.task_throttle)
+
+        current = None
+        for index, raw, compressed in engine.map(
+            _compress_block_task, jobs, cost=_block_cost
+        ):
+            task, block_count = pending[index]
+            if task.carried is not None:
+                del pending[index]
+                yield task, None, 0
+                continue
+
+            if current is None or current['index'] != index:
+                current = {
+                    'index': index, 'hash': hashlib.sha256(), 'size': 0,
+                    'blocks': [], 'written': 0, 'remaining': block_count
+                }
+            if raw:
+                current['hash'].update(raw)
+                current['size'] += len(raw)
+                current['blocks'].append(self._append(compressed, len(raw)))
+                current['written'] += len(compressed)
+            current['remaining'] -= 1
+
+            if current['remaining'] == 0:
+                del pending[index]
+                data = {
+                    'sha256': current['hash'].hexdigest(),
+                    'size': current['size'],
+                    'blocks': current['blocks'],
+                    'codec': self.codec.name
+                }
+                if self.cipher:
+                    data['encrypted'] = True
+                yield task, data, current['written']
+                current = None
+
+    def _block_jobs(self, tasks: Iterable, pending: dict,
+                    throttle=None) -> Iterator[tuple]:
+        """Expand file tasks into per-block compression jobs."""
+        for index, task in enumerate(tasks):
+            if task.carried is not None:
+                pending[index] = (task, 1)
+                yield index, None, 0, 0, self.codec.name, self.level, None, None
+                continue
+
+            size = task.stat.st_size
+            offsets = range(0, size, self.block_size) if size else [0]
+            pending[index] = (task, len(offsets))
+            for offset in offsets:
+                yield (
+                    index, task.file_path, offset,
+                    min(self.block_size, size - offset),
+                    self.codec.name, self.level, throttle, self.cipher
+                )
+
+    def append_block(self, compressed: bytes, raw_size: int) -> List[int]:
+        """Append an already compressed block, returning its location."""
+        return self._append(compressed, raw_size)
+
+    def _append(self, compressed: bytes, raw_size: int) -> List[int]:
+        """Append a compressed block to the current segment."""
+        if self._handle is None or self._offset >= self.segment_size:
+            self._open_segment()
+        block = [self.segment, self._offset, len(compressed), raw_size]
+        self._handle.write(compressed)
+        self._offset += len(compressed)
+        self.bytes_written += len(compressed)
+        return block
+
+    def sync(self):
+        """Make every block appended so far durable."""
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def _open_segment(self):
+        if self._handle is not None:
+            self.sync()
+            self._handle.close()
+            self.segment += 1
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._handle = open(
+            os.path.join(self.archive_dir, segment_name(self.segment)), 'wb'
+        )
+        self._offset = 0
+
+    def close(self):
+        """Sync and close the open segment."""
+        if self._handle is not None:
+            self.sync()
+            self._handle.close()
+            self._handle = None
+
+
+class ArchiveReader:
+    """Random access to files stored in an archive snapshot."""
+
+    def __init__(self, archive_dir: str, cipher=None):
+        self.archive_dir = archive_dir
+        self.cipher = cipher
+        self._handles = {}
+
+    def read_blocks(self, entry: dict) -> Iterator[bytes]:
+        """Yield the decompressed blocks of one file."""
+        codec = get_codec(entry.get('codec', 'zlib'))
+        encrypted = entry.get('encrypted', False)
+        if encrypted and self.cipher is None:
+            raise ValueError("Archive entry is encrypted and no key was given")
+        for segment, offset, compressed_size, raw_size in entry['blocks']:
+            stored = self.read_raw(segment, offset, compressed_size)
+            data = codec.decompress(
+                self.cipher.open(stored) if encrypted else stored
+            )
+            if len(data) != raw_size:
+                raise ValueError(
+                    f"Block in {segment_name(segment)} at {offset} has "
+                    f"{len(data)} bytes, expected {raw_size}"
+                )
+            yield data
+
+    def read_raw(self, segment: int, offset: int, size: int) -> bytes:
+        """Read compressed bytes from a segment."""
+        handle = self._handles.get(segment)
+        if handle is None:
+            handle = open(os.path.join(self.archive_dir, segment_name(segment)), 'rb')
+            self._handles[segment] = handle
+        handle.seek(offset)
+        data = handle.read(size)
+        if len(data) != size:
+            raise ValueError(f"Truncated segment {segment_name(segment)}")
+        return data
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
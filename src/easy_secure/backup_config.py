@@ -5,10 +5,28 @@ Version: 1.0
 
 import os
 import logging
+import threading
+from collections import namedtuple
 from datetime import datetime
-import shutil
-import hashlib
+from typing import Iterable, List
 import json
+import shutil
+from .chunk_store import ChunkStore
+from .copy_pipeline import copy_and_hash, link_file, VerificationWriter, LINK_METHODS
+from .fast_copy import COPY_STRATEGIES
+from .archive import ArchiveReader, ArchiveWriter, get_codec, segment_name
+from .restore import RestoreEngine, RestoreTask, matches
+from .retention import RetentionPolicy
+from .throttle import Throttle
+from .checkpoint import CheckpointJournal
+from .encryption import ALGORITHM, DataCipher
+from .merkle import MerkleTree
+from .catalog import BackupCatalog
+from .parallel_engine import ParallelBackupEngine
+from .verifier import BackupVerifier, VERIFY_LEVELS
+from .manifest import (
+    scan_tree, scan_dirs, file_entry, new_manifest, save_manifest, load_manifest
+)
 
 # Configure logging
 logging.basicConfig(
@@ -22,110 +40,891 @@ logging.basicConfig(
 
 logger = logging.getLogger('EASY_SECURE')
 
+BACKUP_MODES = ("mirror", "chunked", "linked", "archive")
+
+# Modes whose snapshots are plain file trees that can serve as link sources
+TREE_MODES = ("mirror", "linked")
+
+# Snapshots are written under this prefix and renamed when complete
+PARTIAL_PREFIX = ".partial_"
+
+
+BackupTask = namedtuple('BackupTask', [
+    'rel_path', 'file_path', 'stat', 'dest_path', 'chunk_store', 'carried',
+    'link', 'copy_strategy', 'throttle', 'resumed'
+])
+
+BackupResult = namedtuple('BackupResult', [
+    'rel_path', 'entry', 'new_bytes', 'new_chunks', 'changed', 'copy_stats'
+])
+
+
+def _backup_cost(task: BackupTask) -> tuple:
+    """Files and bytes a backup task touches, for throttling."""
+    if task.carried is not None:
+        return (0 if task.link is None else 1), 0
+    return 1, task.stat.st_size
+
+
+def _backup_file_task(task: BackupTask) -> BackupResult:
+    """Back up one file; runs on a worker thread or process."""
+    if task.resumed is not None:
+        return task.resumed
+    carried = task.carried
+
+    if carried is not None and task.link is None:
+        return BackupResult(task.rel_path, carried, 0, 0, False, None)
+
+    if task.throttle:
+        task.throttle.consume(files=1)
+
+    if task.link is not None:
+        link_source, link_method = task.link
+        if os.path.exists(link_source) and link_file(
+            link_source, task.dest_path, link_method
+        ):
+            return BackupResult(task.rel_path, carried, 0, 0, False, None)
+
+    if task.chunk_store is not None:
+        stored = task.chunk_store.store_file(task.file_path, task.throttle)
+        entry = file_entry(task.stat, stored['sha256'], chunks=stored['chunks'])
+        return BackupResult(
+            task.rel_path, entry, stored['new_bytes'], stored['new_chunks'],
+            True, None
+        )
+
+    copied = copy_and_hash(
+        task.file_path, task.dest_path,
+        strategy=task.copy_strategy,
+        known_hash=carried['sha256'] if carried else None,
+        throttle=task.throttle,
+        # The checkpoint may record this file as done once it returns
+        sync=True
+    )
+    return BackupResult(
+        task.rel_path, file_entry(task.stat, copied['sha256']),
+        copied['size'], 0, True, copied
+    )
+
+
 class BackupConfig:
-    def __init__(self, client_name: str):
+    def __init__(self, client_name: str, backup_mode: str = "mirror",
+                 incremental: bool = False, workers: int = 1,
+                 worker_type: str = "thread", worker_limiter=None,
+                 catalog: BackupCatalog = None, link_method: str = "auto",
+                 copy_strategy: str = "auto", compression: str = "zlib",
+                 compression_level: int = None,
+                 retention: RetentionPolicy = None,
+                 bytes_per_sec: float = None, files_per_sec: float = None,
+                 global_throttle: Throttle = None, cipher: DataCipher = None):
+        if backup_mode not in BACKUP_MODES:
+            raise ValueError(f"Invalid backup mode: {backup_mode}")
+        if cipher is not None and backup_mode in TREE_MODES:
+            raise ValueError(
+                f"Encryption needs chunked or archive mode, not {backup_mode}"
+            )
+        if link_method not in LINK_METHODS:
+            raise ValueError(f"Invalid link method: {link_method}")
+        if copy_strategy not in COPY_STRATEGIES:
+            raise ValueError(f"Invalid copy strategy: {copy_strategy}")
+        get_codec(compression)
+
         self.client_name = client_name
+        self.backup_mode = backup_mode
+        self.incremental = incremental
+        self.link_method = link_method
+        self.copy_strategy = copy_strategy
+        # Lower levels favour throughput, higher levels favour ratio
+        self.compression = compression
+        self.compression_level = compression_level
+        self.retention = retention
+        # Seals chunks and archive blocks as they are written
+        self.cipher = cipher
+        # Held while snapshots are written, read or retired
+        self.lock = threading.RLock()
+        # Applies to backup, verify and restore alike
+        self.throttle = Throttle(bytes_per_sec, files_per_sec, global_throttle)
+        self.engine = ParallelBackupEngine(
+            workers=workers,
+            worker_type=worker_type,
+            limiter=worker_limiter,
+            throttle=self.throttle
+        )
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.backup_root = os.path.join("backups", client_name)
         self.verify_path = os.path.join("verification", client_name)
+        self.chunk_root = os.path.join("chunks", client_name)
+        self.trash_root = os.path.join("trash", client_name)
+        self.gc_state_file = os.path.join(self.verify_path, "gc_state.json")
+        self._chunk_store = None
+        self.catalog = catalog
         
         # Ensure directories exist
         os.makedirs(self.backup_root, exist_ok=True)
         os.makedirs(self.verify_path, exist_ok=True)
 
-    def create_backup(self, source_path: str) -> dict:
-        """Create a backup of the specified directory."""
+        self.gc_stats = self._load_gc_stats()
+
+        if self.catalog:
+            self._sync_catalog()
+
+    @property
+    def chunk_store(self) -> ChunkStore:
+        """Chunk store shared by all chunked snapshots of this client."""
+        if self._chunk_store is None:
+            self._chunk_store = ChunkStore(self.chunk_root, cipher=self.cipher)
+        return self._chunk_store
+
+    def reset_stores(self):
+        """Drop cached stores so they pick up the current cipher."""
+        self._chunk_store = None
+
+    def _new_timestamp(self) -> str:
+        """Return a timestamp that does not collide with an existing backup."""
+        base = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = base
+        counter = 1
+        while (os.path.exists(os.path.join(self.backup_root, timestamp))
+               or os.path.exists(self._staging_dir(timestamp))):
+            timestamp = f"{base}_{counter}"
+            counter += 1
+        return timestamp
+
+    def _staging_dir(self, backup_timestamp: str) -> str:
+        """Directory a snapshot is written to before it is committed."""
+        return os.path.join(self.backup_root, f"{PARTIAL_PREFIX}{backup_timestamp}")
+
+    def _checkpoint_file(self, backup_timestamp: str) -> str:
+        """Path of the checkpoint journal of a snapshot being written."""
+        return os.path.join(
+            self.verify_path, f"checkpoint_{backup_timestamp}.jsonl"
+        )
+
+    def checkpoint_files(self) -> List[str]:
+        """Checkpoint journals of snapshots that were interrupted."""
+        return [
+            os.path.join(self.verify_path, name)
+            for name in sorted(os.listdir(self.verify_path))
+            if name.startswith("checkpoint_") and name.endswith(".jsonl")
+        ]
+
+    def _open_checkpoint(self, source_path: str) -> tuple:
+        """Resume an interrupted snapshot of a source, or start a new one.
+
+        Sets ``self.timestamp`` and returns the checkpoint journal and the
+        files the interrupted run finished. Interrupted snapshots of other
+        sources or modes are discarded.
+        """
+        source = os.path.abspath(source_path)
+        for journal_file in self.checkpoint_files():
+            name = os.path.basename(journal_file)
+            backup_timestamp = name[len("checkpoint_"):-len(".jsonl")]
+            staging_dir = self._staging_dir(backup_timestamp)
+
+            header, completed = CheckpointJournal.load(journal_file)
+            if (header and os.path.isdir(staging_dir)
+                    and header['source'] == source
+                    and header['mode'] == self.backup_mode):
+                self.timestamp = backup_timestamp
+                logger.info(
+                    f"Resuming backup {backup_timestamp} of {self.client_name} "
+                    f"with {len(completed)} files done"
+                )
+                return CheckpointJournal(journal_file), completed
+
+            # Committed just before the journal was removed, or not resumable
+            os.remove(journal_file)
+            if os.path.isdir(staging_dir):
+                shutil.rmtree(staging_dir)
+                logger.info(f"Discarded interrupted backup {backup_timestamp}")
+
+        self.timestamp = self._new_timestamp()
+        checkpoint = CheckpointJournal(
+            self._checkpoint_file(self.timestamp),
+            {'source': source, 'mode': self.backup_mode,
+             'timestamp': self.timestamp}
+        )
+        return checkpoint, {}
+
+    def _manifest_file(self, backup_timestamp: str) -> str:
+        """Path of the snapshot manifest for a backup."""
+        return os.path.join(self.verify_path, f"manifest_{backup_timestamp}.json")
+
+    def _tree_file(self, backup_timestamp: str) -> str:
+        """Path of the Merkle verification tree for a backup."""
+        return os.path.join(self.verify_path, f"verify_{backup_timestamp}.mtree")
+
+    def _previous_manifest(self) -> dict:
+        """Load the manifest of the latest snapshot usable as a baseline."""
+        for backup_timestamp in self.list_backups():
+            if backup_timestamp == self.timestamp:
+                continue
+            manifest = load_manifest(self._manifest_file(backup_timestamp))
+            if not manifest:
+                continue
+            if manifest['mode'] == self.backup_mode:
+                return manifest
+            if self.backup_mode == "linked" and manifest['mode'] in TREE_MODES:
+                return manifest
+            return None
+        return None
+
+    def _data_path(self, backup_timestamp: str, rel_path: str,
+                   entry: dict) -> str:
+        """Location of a file's data, following carried-over references."""
+        return os.path.join(
+            self.backup_root, entry.get('base', backup_timestamp), rel_path
+        )
+
+    def create_backup(self, source_path: str,
+                      changed_paths: Iterable[str] = None) -> dict:
+        """Create a backup of the specified directory.
+
+        With ``changed_paths`` (relative to the source) only those files and
+        directories are read; the rest is carried over from the previous
+        snapshot unchecked.
+        """
         try:
-            # Create backup directory with timestamp
-            backup_dir = os.path.join(self.backup_root, self.timestamp)
-            os.makedirs(backup_dir, exist_ok=True)
+            with self.lock:
+                if not os.path.isdir(source_path):
+                    raise FileNotFoundError(f"Source not found: {source_path}")
 
-            # Copy files
-            shutil.copytree(source_path, backup_dir, dirs_exist_ok=True)
+                # Pick up an interrupted run of this source, or start anew
+                checkpoint, resume = self._open_checkpoint(source_path)
+                backup_dir = os.path.join(self.backup_root, self.timestamp)
+                staging_dir = self._staging_dir(self.timestamp)
+                os.makedirs(staging_dir, exist_ok=True)
 
-            # Generate verification data
-            verification = self._generate_verification(backup_dir)
+                # Copy and hash in one pass, emitting verification data as
+                # each file finishes
+                try:
+                    with self._verification_writer() as verification:
+                        manifest = self._create_snapshot(
+                            source_path, staging_dir, verification,
+                            changed_paths, checkpoint, resume
+                        )
+                finally:
+                    checkpoint.close()
 
-            logger.info(f"Backup completed for {self.client_name}")
+                # The snapshot becomes visible in one rename
+                os.replace(staging_dir, backup_dir)
+                checkpoint.remove()
+
+                if self.catalog:
+                    self.catalog.record_snapshot(
+                        self.client_name,
+                        self._manifest_info(manifest),
+                        manifest['files']
+                    )
+
+                logger.info(f"Backup completed for {self.client_name}")
+                return {
+                    "status": "success",
+                    "timestamp": self.timestamp,
+                    "backup_location": backup_dir,
+                    "verification": verification.entries,
+                    "root_hash": verification.build_tree().root_hash,
+                    "bytes_written": manifest['totals']['new_bytes'],
+                    "resumed_files": len(resume),
+                    "throughput": manifest['throughput']
+                }
+
+        except Exception as e:
+            logger.error(f"Backup failed: {str(e)}")
             return {
-                "status": "success",
-                "timestamp": self.timestamp,
-                "backup_location": backup_dir,
-                "verification": verification
+                "status": "error",
+                "message": str(e)
+            }
+
+    def _create_snapshot(self, source_path: str, backup_dir: str,
+                         verification: VerificationWriter,
+                         changed_paths: Iterable[str] = None,
+                         checkpoint: CheckpointJournal = None,
+                         resume: dict = None) -> dict:
+        """Back up changed files of the source tree and write its manifest."""
+        if changed_paths is not None:
+            changed_paths = {path.strip('/') for path in changed_paths}
+            if '' in changed_paths or '.' in changed_paths:
+                changed_paths = None
+
+        # Linked snapshots always start from the previous tree
+        previous = (
+            self._previous_manifest()
+            if self.incremental or self.backup_mode == "linked"
+            or changed_paths is not None else None
+        )
+        if previous is None:
+            changed_paths = None
+
+        manifest = new_manifest(self.backup_mode, self.timestamp, source_path)
+        manifest['dirs'] = (
+            scan_dirs(source_path) if changed_paths is None
+            else self._changed_dirs(source_path, previous, changed_paths)
+        )
+        manifest['previous'] = previous['timestamp'] if previous else None
+        manifest['scan'] = "full" if changed_paths is None else "changed"
+        if self.cipher:
+            manifest['encryption'] = ALGORITHM
+        totals = {
+            'file_count': 0, 'size_bytes': 0, 'new_bytes': 0, 'new_chunks': 0,
+            'changed_files': 0, 'unchanged_files': 0
+        }
+
+        if self.backup_mode in TREE_MODES:
+            for rel_dir in manifest['dirs']:
+                os.makedirs(os.path.join(backup_dir, rel_dir), exist_ok=True)
+
+        throughput = {}
+        archive = None
+
+        resume = resume or {}
+        tasks = self._snapshot_tasks(
+            source_path, backup_dir, previous, changed_paths, resume
+        )
+        if self.backup_mode == "archive":
+            archive = ArchiveWriter(
+                backup_dir, self.compression, self.compression_level,
+                cipher=self.cipher
+            )
+            if checkpoint:
+                # Blocks may sit in the segment's write buffer
+                checkpoint.before_sync = archive.sync
+            manifest['archive'] = {
+                'codec': archive.codec.name,
+                'level': archive.level,
+                'block_size': archive.block_size
             }
+            results = self._archive_results(archive, tasks)
+        else:
+            results = self.engine.map(
+                _backup_file_task, tasks, cost=_backup_cost
+            )
+
+        for result in results:
+            entry = result.entry
+            totals['new_bytes'] += result.new_bytes
+            totals['new_chunks'] += result.new_chunks
+            totals['changed_files' if result.changed else 'unchanged_files'] += 1
+            if result.copy_stats:
+                self._add_throughput(throughput, result.copy_stats)
+
+            manifest['files'][result.rel_path] = entry
+            verification.add(result.rel_path, entry['sha256'])
+            if checkpoint:
+                record = [entry, result.new_bytes, result.new_chunks,
+                          result.changed]
+                if resume.get(result.rel_path) != record:
+                    checkpoint.record(result.rel_path, *record)
+            totals['file_count'] += 1
+            totals['size_bytes'] += entry['size']
+
+        if archive:
+            archive.close()
+
+        for stats in throughput.values():
+            stats['mb_per_s'] = round(
+                stats['bytes'] / 1e6 / stats['seconds'], 2
+            ) if stats['seconds'] else None
+
+        manifest['totals'] = totals
+        manifest['throughput'] = throughput
+        manifest['merkle_root'] = verification.build_tree().root_hash
+        save_manifest(self._manifest_file(self.timestamp), manifest)
+        logger.info(
+            f"Snapshot for {self.client_name}: {totals['changed_files']} changed, "
+            f"{totals['new_bytes']} of {totals['size_bytes']} bytes new"
+        )
+        return manifest
+
+    def _snapshot_tasks(self, source_path: str, backup_dir: str,
+                        previous: dict, changed_paths: set = None,
+                        resume: dict = None):
+        """Yield one backup task per source file.
+
+        Files an interrupted run already finished, and that have not
+        changed since, are passed on as ``resumed`` results.
+        """
+        previous_files = previous['files'] if previous else {}
+        chunk_store = self.chunk_store if self.backup_mode == "chunked" else None
+        throttle = self.engine.task_throttle
+        segment_sizes = {}
+
+        for rel_path, file_path, stat in self._scan_source(
+            source_path, previous, changed_paths
+        ):
+            carried = previous_files.get(rel_path)
+            link = None
+            # A missing stat means the file is known to be unchanged
+            if carried and (stat is None or self._is_unchanged(carried, stat)):
+                carried = dict(carried)
+                if self.backup_mode == "linked":
+                    # Share the data of the previous tree's copy
+                    link_source = self._data_path(
+                        previous['timestamp'], rel_path, carried
+                    )
+                    link = (link_source, self.link_method)
+                    carried.pop('base', None)
+                elif self.backup_mode in ("mirror", "archive"):
+                    # Carry the file over by reference to the earlier snapshot
+                    carried.setdefault('base', previous['timestamp'])
+            else:
+                carried = None
+
+            dest_path = os.path.join(backup_dir, rel_path)
+            resumed = None
+            if resume and stat is not None:
+                done = resume.get(rel_path)
+                if (done and self._is_unchanged(done[0], stat)
+                        and self._has_data(backup_dir, rel_path, done[0],
+                                           segment_sizes)):
+                    resumed = BackupResult(rel_path, *done, None)
+                    carried, link = done[0], None
+                elif (self.backup_mode in TREE_MODES
+                      and os.path.lexists(dest_path)):
+                    # May be a hardlink into an older snapshot; never
+                    # write through it
+                    os.remove(dest_path)
+
+            yield BackupTask(
+                rel_path, file_path, stat, dest_path, chunk_store, carried,
+                link, self.copy_strategy, throttle, resumed
+            )
+
+    def _has_data(self, backup_dir: str, rel_path: str, entry: dict,
+                  segment_sizes: dict) -> bool:
+        """Check that the data of a resumed file is still stored."""
+        if 'chunks' in entry:
+            return all(self.chunk_store.has_chunk(d) for d in entry['chunks'])
+        if 'blocks' in entry:
+            archive_dir = os.path.join(
+                self.backup_root, entry['base']
+            ) if 'base' in entry else backup_dir
+            for segment, offset, length, _ in entry['blocks']:
+                segment_file = os.path.join(archive_dir, segment_name(segment))
+                if segment_file not in segment_sizes:
+                    segment_sizes[segment_file] = (
+                        os.path.getsize(segment_file)
+                        if os.path.exists(segment_file) else -1
+                    )
+                if offset + length > segment_sizes[segment_file]:
+                    return False
+            return True
+        data_path = (self._data_path(entry['base'], rel_path, entry)
+                     if 'base' in entry else os.path.join(backup_dir, rel_path))
+        try:
+            return os.path.getsize(data_path) == entry['size']
+        except OSError:
+            return False
+
+    def _scan_source(self, source_path: str, previous: dict,
+                     changed_paths: set = None):
+        """Yield (relative path, path, stat) for the files of a snapshot.
+
+        With ``changed_paths`` only those paths are read from the source.
+        Other files of the previous snapshot are yielded with a None stat,
+        except in linked mode, which needs their stat to fall back to
+        copying.
+        """
+        if changed_paths is None:
+            yield from scan_tree(source_path)
+            return
+
+        current = {}
+        for rel_path in changed_paths:
+            path = os.path.join(source_path, rel_path)
+            if os.path.isdir(path):
+                for sub_path, file_path, stat in scan_tree(path):
+                    current[f"{rel_path}/{sub_path}"] = (file_path, stat)
+            elif os.path.isfile(path):
+                current[rel_path] = (path, os.stat(path))
+
+        for rel_path in sorted(set(previous['files']) | set(current)):
+            if rel_path in current:
+                yield (rel_path,) + current[rel_path]
+            elif not self._is_under(rel_path, changed_paths):
+                file_path = os.path.join(source_path, rel_path)
+                stat = os.stat(file_path) if self.backup_mode == "linked" else None
+                yield rel_path, file_path, stat
+
+    def _changed_dirs(self, source_path: str, previous: dict,
+                      changed_paths: set) -> list:
+        """Update the previous snapshot's directory list for changed paths."""
+        dirs = set(previous.get('dirs', []))
+        for rel_path in changed_paths:
+            dirs = {
+                rel_dir for rel_dir in dirs
+                if not self._is_under(rel_dir, {rel_path})
+            }
+            path = os.path.join(source_path, rel_path)
+            if os.path.isdir(path):
+                dirs.add(rel_path)
+                dirs.update(f"{rel_path}/{sub_dir}" for sub_dir in scan_dirs(path))
+            parent = os.path.dirname(rel_path)
+            while parent and os.path.isdir(os.path.join(source_path, parent)):
+                dirs.add(parent)
+                parent = os.path.dirname(parent)
+        return sorted(dirs)
+
+    @staticmethod
+    def _is_under(rel_path: str, prefixes: set) -> bool:
+        """Check whether a path or one of its parents is in a set."""
+        parts = rel_path.split('/')
+        return any(
+            '/'.join(parts[:depth]) in prefixes
+            for depth in range(1, len(parts) + 1)
+        )
+
+    def _archive_results(self, archive: ArchiveWriter, tasks):
+        """Turn archived files into backup results."""
+        for task, data, written in archive.write(tasks, self.engine):
+            if data is None:
+                yield task.resumed or BackupResult(
+                    task.rel_path, task.carried, 0, 0, False, None
+                )
+                continue
+            entry = file_entry(
+                task.stat, data['sha256'], blocks=data['blocks'], codec=data['codec']
+            )
+            if data.get('encrypted'):
+                entry['encrypted'] = True
+            entry['size'] = data['size']
+            yield BackupResult(task.rel_path, entry, written, 0, True, None)
+
+    @staticmethod
+    def _add_throughput(throughput: dict, copy_stats: dict):
+        """Accumulate copy timings per file class."""
+        stats = throughput.setdefault(
+            copy_stats['class'], {'files': 0, 'bytes': 0, 'seconds': 0.0}
+        )
+        stats['files'] += 1
+        stats['bytes'] += copy_stats['size']
+        stats['seconds'] += copy_stats['seconds']
+
+    @staticmethod
+    def _is_unchanged(entry: dict, stat: os.stat_result) -> bool:
+        """Check a file against its previous manifest entry."""
+        return (
+            entry['size'] == stat.st_size
+            and entry['mtime_ns'] == stat.st_mtime_ns
+            and entry['inode'] == stat.st_ino
+        )
+
+    def _verification_writer(self) -> VerificationWriter:
+        """Open the verification tree of the backup being written."""
+        return VerificationWriter(self._tree_file(self.timestamp))
+
+    def verify_backup(self, backup_timestamp: str = None, level: str = "deep",
+                      fail_fast: bool = False, subtree: str = None) -> dict:
+        """Verify the integrity of a specific backup or the latest one.
+
+        With ``subtree`` only files below that relative path are checked.
+        """
+        try:
+            with self.lock:
+                if level not in VERIFY_LEVELS:
+                    raise ValueError(f"Invalid verification level: {level}")
+
+                if not backup_timestamp:
+                    backup_timestamp = self._latest_backup()
+                    if not backup_timestamp:
+                        return {"status": "error", "message": "No backups found"}
+
+                backup_dir = os.path.join(self.backup_root, backup_timestamp)
+                manifest = load_manifest(self._manifest_file(backup_timestamp))
+                verifier = BackupVerifier(self.engine, self.cipher)
+
+                if manifest:
+                    selected = manifest['files']
+                    if subtree:
+                        selected = self._select_subtree(manifest, subtree)
+                        if selected is None:
+                            return {
+                                "status": "success",
+                                "timestamp": backup_timestamp,
+                                "is_valid": False,
+                                "level": level,
+                                "checked_files": 0,
+                                "failed_files": [{'path': subtree, 'reason': 'tree'}]
+                            }
+
+                if manifest and manifest['mode'] == "chunked":
+                    report = verifier.verify_chunks(
+                        self.chunk_store, selected, level, fail_fast
+                    )
+                elif manifest and manifest['mode'] == "archive":
+                    files = {
+                        rel_path: (
+                            os.path.join(
+                                self.backup_root, entry.get('base', backup_timestamp)
+                            ),
+                            entry
+                        )
+                        for rel_path, entry in selected.items()
+                    }
+                    report = verifier.verify_archive(files, level, fail_fast)
+                elif manifest:
+                    files = {
+                        rel_path: (
+                            self._data_path(backup_timestamp, rel_path, entry), entry
+                        )
+                        for rel_path, entry in selected.items()
+                    }
+                    report = verifier.verify_files(files, level, fail_fast)
+                elif subtree:
+                    raise ValueError("Subtree verification needs a snapshot manifest")
+                else:
+                    # Load verification data
+                    verify_file = os.path.join(
+                        self.verify_path,
+                        f"verify_{backup_timestamp}.json"
+                    )
+                
+                    with open(verify_file, 'r') as f:
+                        stored_verification = json.load(f)
+
+                    report = verifier.verify_legacy(
+                        stored_verification, backup_dir, level, fail_fast
+                    )
+
+                if not report['is_valid']:
+                    logger.warning(
+                        f"Backup {backup_timestamp} of {self.client_name} failed "
+                        f"{level} verification: {len(report['failed_files'])} files"
+                    )
+
+                return {
+                    "status": "success",
+                    "timestamp": backup_timestamp,
+                    **report
+                }
 
         except Exception as e:
-            logger.error(f"Backup failed: {str(e)}")
+            logger.error(f"Verification failed: {str(e)}")
             return {
                 "status": "error",
                 "message": str(e)
             }
 
-    def _generate_verification(self, backup_dir: str) -> dict:
-        """Generate verification data for backup integrity."""
-        verification_data = {}
-        
-        for root, _, files in os.walk(backup_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                with open(file_path, 'rb') as f:
-                    file_hash = hashlib.sha256(f.read()).hexdigest()
-                    verification_data[file_path] = file_hash
+    def restore_backup(self, target_path: str, backup_timestamp: str = None,
+                       patterns: list = None, newest_first: bool = False,
+                       verify: bool = True, progress=None) -> dict:
+        """Restore a backup, or only the paths matching globs, to a directory.
 
-        # Save verification data
+        ``progress`` is called with running totals while files are restored.
+        """
+        try:
+            with self.lock:
+                if not backup_timestamp:
+                    backup_timestamp = self._latest_backup()
+                    if not backup_timestamp:
+                        return {"status": "error", "message": "No backups found"}
+
+                entries, dirs = self._restore_entries(backup_timestamp)
+                selected = [
+                    (rel_path, entry) for rel_path, entry in entries
+                    if matches(rel_path, patterns)
+                ]
+                if newest_first:
+                    selected.sort(key=lambda item: item[1].get('mtime_ns') or 0,
+                                  reverse=True)
+
+                target_root = os.path.abspath(target_path)
+                for rel_dir in dirs:
+                    if matches(rel_dir, patterns):
+                        os.makedirs(self._restore_path(target_root, rel_dir),
+                                    exist_ok=True)
+
+                tasks = [
+                    self._restore_task(backup_timestamp, rel_path, entry,
+                                       self._restore_path(target_root, rel_path),
+                                       verify)
+                    for rel_path, entry in selected
+                ]
+                stats = RestoreEngine(self.engine, progress).restore(tasks)
+
+                logger.info(
+                    f"Restored {stats['files_done']} files of {self.client_name} "
+                    f"from {backup_timestamp} at {stats['mb_per_s']} MB/s"
+                )
+                return {
+                    "status": "success",
+                    "timestamp": backup_timestamp,
+                    "target": target_root,
+                    "is_complete": not stats['failed_files'],
+                    **stats
+                }
+
+        except Exception as e:
+            logger.error(f"Restore failed: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    def _restore_entries(self, backup_timestamp: str) -> tuple:
+        """Return the (path, entry) pairs and directories of a backup."""
+        manifest = load_manifest(self._manifest_file(backup_timestamp))
+        if manifest:
+            return list(manifest['files'].items()), manifest.get('dirs', [])
+
+        # Legacy snapshot: only a flat verification file of backup paths
+        backup_dir = os.path.join(self.backup_root, backup_timestamp)
         verify_file = os.path.join(
-            self.verify_path, 
-            f"verify_{self.timestamp}.json"
+            self.verify_path, f"verify_{backup_timestamp}.json"
+        )
+        with open(verify_file, 'r') as f:
+            stored_verification = json.load(f)
+        entries = [
+            (os.path.relpath(path, backup_dir).replace(os.sep, '/'),
+             {'sha256': file_hash, 'size': os.path.getsize(path)})
+            for path, file_hash in stored_verification.items()
+        ]
+        return entries, []
+
+    def _restore_task(self, backup_timestamp: str, rel_path: str, entry: dict,
+                      dest_path: str, verify: bool) -> RestoreTask:
+        """Describe where one file's data comes from."""
+        if 'chunks' in entry:
+            kind, source = "chunked", self.chunk_store
+        elif 'blocks' in entry:
+            kind = "archive"
+            source = os.path.join(
+                self.backup_root, entry.get('base', backup_timestamp)
+            )
+        else:
+            kind = "file"
+            source = self._data_path(backup_timestamp, rel_path, entry)
+        return RestoreTask(
+            rel_path, kind, source, entry, dest_path, verify,
+            self.engine.task_throttle, self.cipher
         )
-        
-        with open(verify_file, 'w') as f:
-            json.dump(verification_data, f, indent=4)
 
-        return verification_data
+    @staticmethod
+    def _restore_path(target_root: str, rel_path: str) -> str:
+        """Resolve a path inside the restore target, refusing escapes."""
+        dest_path = os.path.normpath(os.path.join(target_root, rel_path))
+        if os.path.commonpath([target_root, dest_path]) != target_root:
+            raise ValueError(f"Refusing to restore outside target: {rel_path}")
+        return dest_path
 
-    def verify_backup(self, backup_timestamp: str) -> dict:
-        """Verify the integrity of a specific backup."""
-        try:
-            # Load verification data
-            verify_file = os.path.join(
-                self.verify_path,
-                f"verify_{backup_timestamp}.json"
+    def _select_subtree(self, manifest: dict, subtree: str) -> dict:
+        """Pick the manifest entries under a path after checking its tree.
+
+        Returns None if the stored tree does not hash up to the root
+        recorded in the manifest.
+        """
+        tree = MerkleTree.load(self._tree_file(manifest['timestamp']))
+        if (tree is None or tree.root_hash != manifest.get('merkle_root')
+                or not tree.check_subtree(subtree)):
+            return None
+
+        selected = {}
+        for rel_path, file_hash in tree.iter_files(subtree):
+            entry = manifest['files'].get(rel_path)
+            # A leaf that disagrees with the manifest fails the hash check
+            selected[rel_path] = (
+                entry if entry and entry['sha256'] == file_hash
+                else dict(entry or {}, sha256=file_hash)
             )
-            
-            with open(verify_file, 'r') as f:
-                stored_verification = json.load(f)
-
-            # Verify each file
-            backup_dir = os.path.join(self.backup_root, backup_timestamp)
-            current_verification = {}
-            
-            for root, _, files in os.walk(backup_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'rb') as f:
-                        file_hash = hashlib.sha256(f.read()).hexdigest()
-                        current_verification[file_path] = file_hash
-
-            # Compare verifications
-            is_valid = stored_verification == current_verification
-            
+        return selected
+
+    def diff_backups(self, old_timestamp: str, new_timestamp: str) -> dict:
+        """List files added, removed or changed between two backups."""
+        try:
+            old_tree = MerkleTree.load(self._tree_file(old_timestamp))
+            new_tree = MerkleTree.load(self._tree_file(new_timestamp))
+            if old_tree is None or new_tree is None:
+                raise FileNotFoundError("Both backups need a verification tree")
+
             return {
                 "status": "success",
-                "is_valid": is_valid,
-                "timestamp": backup_timestamp
+                "old_timestamp": old_timestamp,
+                "new_timestamp": new_timestamp,
+                **old_tree.diff(new_tree)
             }
 
         except Exception as e:
-            logger.error(f"Verification failed: {str(e)}")
+            logger.error(f"Failed to diff backups: {str(e)}")
             return {
                 "status": "error",
                 "message": str(e)
             }
 
+    def _manifest_info(self, manifest: dict) -> dict:
+        """Summarise a snapshot from its manifest."""
+        totals = manifest['totals']
+        return {
+            "timestamp": manifest['timestamp'],
+            "mode": manifest['mode'],
+            "created": manifest['created'],
+            "size_bytes": totals['size_bytes'],
+            "file_count": totals['file_count'],
+            "new_bytes": totals.get('new_bytes', totals['size_bytes']),
+            "changed_files": totals.get('changed_files', totals['file_count']),
+            "merkle_root": manifest.get('merkle_root'),
+            "location": os.path.join(self.backup_root, manifest['timestamp'])
+        }
+
+    def _read_backup_info(self, backup_timestamp: str) -> dict:
+        """Summarise a snapshot from disk when the catalog cannot."""
+        manifest = load_manifest(self._manifest_file(backup_timestamp))
+        if manifest:
+            return self._manifest_info(manifest)
+
+        backup_dir = os.path.join(self.backup_root, backup_timestamp)
+
+        # Calculate size
+        total_size = 0
+        file_count = 0
+        
+        for root, _, files in os.walk(backup_dir):
+            for file in files:
+                file_path = os.path.join(root, file)
+                total_size += os.path.getsize(file_path)
+                file_count += 1
+
+        return {
+            "timestamp": backup_timestamp,
+            "size_bytes": total_size,
+            "file_count": file_count,
+            "mode": "mirror",
+            "location": backup_dir
+        }
+
+    def _sync_catalog(self):
+        """Record snapshots that exist on disk but not yet in the catalog."""
+        known = set(self.catalog.list_snapshots(self.client_name))
+        for backup_timestamp in os.listdir(self.backup_root):
+            if backup_timestamp in known or backup_timestamp.startswith(
+                PARTIAL_PREFIX
+            ):
+                continue
+            manifest = load_manifest(self._manifest_file(backup_timestamp))
+            if manifest:
+                files = manifest['files']
+                info = self._manifest_info(manifest)
+            else:
+                files = None
+                info = self._read_backup_info(backup_timestamp)
+            self.catalog.record_snapshot(self.client_name, info, files)
+            logger.info(f"Catalogued backup {backup_timestamp} of {self.client_name}")
+
+    def _latest_backup(self) -> str:
+        """Return the timestamp of the newest backup, if any."""
+        if self.catalog:
+            return self.catalog.latest_snapshot(self.client_name)
+        backups = self.list_backups()
+        return backups[0] if backups else None
+
     def list_backups(self) -> list:
         """List all backups for the client."""
         try:
-            backups = os.listdir(self.backup_root)
+            if self.catalog:
+                return self.catalog.list_snapshots(self.client_name)
+            backups = [
+                name for name in os.listdir(self.backup_root)
+                if not name.startswith(PARTIAL_PREFIX)
+            ]
             return sorted(backups, reverse=True)
         except Exception as e:
             logger.error(f"Failed to list backups: {str(e)}")
@@ -135,29 +934,20 @@ class BackupConfig:
         """Get information about a specific backup or the latest one."""
         try:
             if not backup_timestamp:
-                backups = self.list_backups()
-                if not backups:
+                backup_timestamp = self._latest_backup()
+                if not backup_timestamp:
                     return {"status": "error", "message": "No backups found"}
-                backup_timestamp = backups[0]
-
-            backup_dir = os.path.join(self.backup_root, backup_timestamp)
-            
-            # Calculate size
-            total_size = 0
-            file_count = 0
-            
-            for root, _, files in os.walk(backup_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    total_size += os.path.getsize(file_path)
-                    file_count += 1
+
+            info = None
+            if self.catalog:
+                info = self.catalog.snapshot_info(self.client_name, backup_timestamp)
+            if info is None:
+                info = self._read_backup_info(backup_timestamp)
 
             return {
                 "status": "success",
-                "timestamp": backup_timestamp,
-                "size_bytes": total_size,
-                "file_count": file_count,
-                "location": backup_dir
+                **info,
+                "garbage_collection": dict(self.gc_stats)
             }
 
         except Exception as e:
@@ -166,3 +956,178 @@ class BackupConfig:
                 "status": "error",
                 "message": str(e)
             }
+
+    def retire_backup(self, backup_timestamp: str) -> dict:
+        """Remove a snapshot, keeping data that other snapshots still use.
+
+        Files that newer snapshots carry over by reference are moved into
+        the oldest of them first. The snapshot's own tree is moved to the
+        trash for the garbage collector to delete.
+        """
+        try:
+            with self.lock:
+                manifest = load_manifest(self._manifest_file(backup_timestamp))
+                mode = manifest['mode'] if manifest else "mirror"
+                promoted = self._promote_references(backup_timestamp)
+
+                backup_dir = os.path.join(self.backup_root, backup_timestamp)
+                if os.path.isdir(backup_dir):
+                    os.makedirs(self.trash_root, exist_ok=True)
+                    trash_dir = os.path.join(self.trash_root, backup_timestamp)
+                    counter = 1
+                    while os.path.exists(trash_dir):
+                        trash_dir = os.path.join(
+                            self.trash_root, f"{backup_timestamp}.{counter}"
+                        )
+                        counter += 1
+                    os.replace(backup_dir, trash_dir)
+
+                if self.catalog:
+                    self.catalog.remove_snapshot(self.client_name, backup_timestamp)
+                for path in (
+                    self._manifest_file(backup_timestamp),
+                    self._tree_file(backup_timestamp),
+                    os.path.join(self.verify_path, f"verify_{backup_timestamp}.json")
+                ):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            logger.info(
+                f"Retired backup {backup_timestamp} of {self.client_name}, "
+                f"{promoted} files kept for newer snapshots"
+            )
+            return {
+                "status": "success",
+                "timestamp": backup_timestamp,
+                "mode": mode,
+                "promoted_files": promoted
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to retire backup: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    def _promote_references(self, backup_timestamp: str) -> int:
+        """Move data other snapshots reference out of a snapshot.
+
+        Each referenced file goes to the oldest snapshot carrying it, and
+        every snapshot that carried it is pointed there instead.
+        """
+        referencing = []
+        owners = {}
+        for other in sorted(self.list_backups()):
+            if other == backup_timestamp:
+                continue
+            manifest = load_manifest(self._manifest_file(other))
+            if not manifest:
+                continue
+            refs = [
+                rel_path for rel_path, entry in manifest['files'].items()
+                if entry.get('base') == backup_timestamp
+            ]
+            if refs:
+                referencing.append((manifest, refs))
+                for rel_path in refs:
+                    owners.setdefault(rel_path, manifest)
+        if not owners:
+            return 0
+
+        source_dir = os.path.join(self.backup_root, backup_timestamp)
+        moved_blocks = {}
+        if any('blocks' in owner['files'][rel_path]
+               for rel_path, owner in owners.items()):
+            moved_blocks = self._promote_archive_blocks(source_dir, owners)
+        else:
+            for rel_path, owner in owners.items():
+                source = os.path.join(source_dir, rel_path)
+                dest = os.path.join(self.backup_root, owner['timestamp'], rel_path)
+                if os.path.exists(source):
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    os.replace(source, dest)
+
+        for manifest, refs in referencing:
+            for rel_path in refs:
+                entry = manifest['files'][rel_path]
+                owner = owners[rel_path]
+                if owner is manifest:
+                    del entry['base']
+                else:
+                    entry['base'] = owner['timestamp']
+                if rel_path in moved_blocks:
+                    entry['blocks'] = moved_blocks[rel_path]
+            save_manifest(self._manifest_file(manifest['timestamp']), manifest)
+            if self.catalog:
+                self.catalog.record_snapshot(
+                    self.client_name, self._manifest_info(manifest),
+                    manifest['files']
+                )
+
+        return len(owners)
+
+    def _promote_archive_blocks(self, source_dir: str, owners: dict) -> dict:
+        """Copy referenced compressed blocks into their new owners' archives."""
+        moved_blocks = {}
+        writers = {}
+        try:
+            with ArchiveReader(source_dir) as reader:
+                for rel_path, owner in sorted(owners.items()):
+                    writer = writers.get(owner['timestamp'])
+                    if writer is None:
+                        writer = ArchiveWriter(
+                            os.path.join(self.backup_root, owner['timestamp']),
+                            owner['files'][rel_path].get('codec', 'zlib')
+                        )
+                        writers[owner['timestamp']] = writer
+                    moved_blocks[rel_path] = [
+                        writer.append_block(
+                            reader.read_raw(segment, offset, compressed_size),
+                            raw_size
+                        )
+                        for segment, offset, compressed_size, raw_size
+                        in owner['files'][rel_path]['blocks']
+                    ]
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return moved_blocks
+
+    def referenced_chunks(self) -> set:
+        """Return the digests of all chunks used by this client's snapshots."""
+        live = set()
+        for backup_timestamp in self.list_backups():
+            manifest = load_manifest(self._manifest_file(backup_timestamp))
+            if manifest and manifest['mode'] == "chunked":
+                for entry in manifest['files'].values():
+                    live.update(entry.get('chunks', ()))
+        # An interrupted snapshot's chunks are kept for its resumed run
+        for journal_file in self.checkpoint_files():
+            _, completed = CheckpointJournal.load(journal_file)
+            for entry, *_ in completed.values():
+                live.update(entry.get('chunks', ()))
+        return live
+
+    def _load_gc_stats(self) -> dict:
+        """Load the totals of past garbage collections."""
+        stats = {
+            "reclaimed_bytes": 0,
+            "expired_snapshots": 0,
+            "last_collection": None
+        }
+        if os.path.exists(self.gc_state_file):
+            with open(self.gc_state_file, 'r') as f:
+                stats.update(json.load(f))
+        return stats
+
+    def record_reclaimed(self, reclaimed_bytes: int, expired_snapshots: int):
+        """Add the results of a garbage collection to the client's totals."""
+        with self.lock:
+            self.gc_stats["reclaimed_bytes"] += reclaimed_bytes
+            self.gc_stats["expired_snapshots"] += expired_snapshots
+            self.gc_stats["last_collection"] = datetime.now().isoformat()
+            tmp_file = f"{self.gc_state_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.gc_stats, f)
+            os.replace(tmp_file, self.gc_state_file)
@@ -4,23 +4,72 @@ Version: 1.0
 """
 
 import os
-import schedule
 import time
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict
 from .backup_config import BackupConfig
+from .catalog import BackupCatalog
+from .retention import GarbageCollector, RetentionPolicy
+from .scheduler import BackupScheduler
+from .throttle import Throttle
+from .load_governor import LoadGovernor
+from .continuous import ContinuousProtector
+from .replication import DEFAULT_PART_SIZE, Replicator
+from .encryption import KeyManager
 
 class BackupManager:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, catalog_path: str = None,
+                 max_concurrent_jobs: int = 4, window_start: str = "02:00",
+                 window_hours: float = 4.0, bytes_per_sec: float = None,
+                 files_per_sec: float = None, key_manager: KeyManager = None):
         self.clients: Dict[str, BackupConfig] = {}
         self.logger = logging.getLogger('EASY_SECURE.manager')
+        # Caps concurrent file tasks across all clients
+        self.max_workers = max_workers
+        self.worker_limiter = threading.BoundedSemaphore(max_workers)
+        # Caps I/O of all clients together; each client may set its own too.
+        # The load throttle above it is steered by the load governor.
+        self.load_throttle = Throttle()
+        self.throttle = Throttle(
+            bytes_per_sec, files_per_sec, parent=self.load_throttle
+        )
+        self.load_governor = None
+        self.protectors: Dict[str, ContinuousProtector] = {}
+        self.replicators: Dict[str, Replicator] = {}
+        # Data keys of clients added with encrypt=True
+        self.key_manager = key_manager or KeyManager()
+        self.catalog = BackupCatalog(
+            catalog_path or os.path.join("catalog", "backups.db")
+        )
+        self.scheduler = BackupScheduler(
+            self.create_backup,
+            max_concurrent=max_concurrent_jobs,
+            window_start=window_start,
+            window_hours=window_hours,
+            catalog=self.catalog
+        )
+        self._scheduler_stop = threading.Event()
+        self._gc_thread = None
+        self._gc_stop = threading.Event()
+        self._gc_wakeup = threading.Event()
 
-    def add_client(self, client_name: str) -> bool:
-        """Add a new client to the backup system."""
+    def add_client(self, client_name: str, encrypt: bool = False,
+                   **options) -> bool:
+        """Add a new client to the backup system.
+
+        With ``encrypt`` the client's chunked or archive snapshots are
+        sealed with its own data keys.
+        """
         try:
             if client_name not in self.clients:
-                self.clients[client_name] = BackupConfig(client_name)
+                if encrypt:
+                    options['cipher'] = self.key_manager.cipher(client_name)
+                options.setdefault('worker_limiter', self.worker_limiter)
+                options.setdefault('catalog', self.catalog)
+                options.setdefault('global_throttle', self.throttle)
+                self.clients[client_name] = BackupConfig(client_name, **options)
                 self.logger.info(f"Added new client: {client_name}")
                 return True
             return False
@@ -32,7 +81,10 @@ class BackupManager:
         """Remove a client from the backup system."""
         try:
             if client_name in self.clients:
+                self.stop_continuous_protection(client_name)
+                self.replicators.pop(client_name, None)
                 del self.clients[client_name]
+                self.scheduler.remove_job(client_name)
                 self.logger.info(f"Removed client: {client_name}")
                 return True
             return False
@@ -41,26 +93,23 @@ class BackupManager:
             return False
 
     def schedule_backup(self, client_name: str, source_path: str, 
-                       schedule_type: str = "daily") -> bool:
-        """Schedule automated backups for a client."""
+                       schedule_type: str = "daily", priority: int = 0) -> bool:
+        """Schedule automated backups for a client.
+
+        Jobs run inside the backup window; higher priorities start first.
+        """
         try:
             if client_name not in self.clients:
                 self.logger.error(f"Client {client_name} not found")
                 return False
 
-            def backup_job():
-                self.create_backup(client_name, source_path)
-
-            if schedule_type == "daily":
-                schedule.every().day.at("02:00").do(backup_job)
-            elif schedule_type == "weekly":
-                schedule.every().monday.at("02:00").do(backup_job)
-            else:
-                self.logger.error(f"Invalid schedule type: {schedule_type}")
-                return False
+            self.scheduler.add_job(
+                client_name, source_path, schedule_type, priority
+            )
 
             self.logger.info(
-                f"Scheduled {schedule_type} backup for {client_name}"
+                f"Scheduled {schedule_type} backup for {client_name} "
+                f"with priority {priority}"
             )
             return True
 
@@ -70,7 +119,8 @@ class BackupManager:
             )
             return False
 
-    def create_backup(self, client_name: str, source_path: str) -> dict:
+    def create_backup(self, client_name: str, source_path: str,
+                      changed_paths: List[str] = None) -> dict:
         """Create a backup for a specific client."""
         try:
             if client_name not in self.clients:
@@ -79,11 +129,17 @@ class BackupManager:
                     "message": f"Client {client_name} not found"
                 }
 
-            result = self.clients[client_name].create_backup(source_path)
+            result = self.clients[client_name].create_backup(
+                source_path, changed_paths
+            )
             if result["status"] == "success":
                 self.logger.info(
                     f"Created backup for {client_name} at {result['timestamp']}"
                 )
+                # Let the background collector expire older snapshots
+                self._gc_wakeup.set()
+                if client_name in self.replicators:
+                    result["replication"] = self.replicators[client_name].replicate()
             return result
 
         except Exception as e:
@@ -96,7 +152,8 @@ class BackupManager:
             }
 
     def verify_backup(self, client_name: str, 
-                     backup_timestamp: str = None) -> dict:
+                     backup_timestamp: str = None, level: str = "deep",
+                     fail_fast: bool = False, subtree: str = None) -> dict:
         """Verify a backup for a specific client."""
         try:
             if client_name not in self.clients:
@@ -105,7 +162,10 @@ class BackupManager:
                     "message": f"Client {client_name} not found"
                 }
 
-            result = self.clients[client_name].verify_backup(backup_timestamp)
+            result = self.clients[client_name].verify_backup(
+                backup_timestamp, level=level, fail_fast=fail_fast,
+                subtree=subtree
+            )
             if result["status"] == "success":
                 self.logger.info(
                     f"Verified backup for {client_name} at {result['timestamp']}"
@@ -121,6 +181,61 @@ class BackupManager:
                 "message": str(e)
             }
 
+    def diff_backups(self, client_name: str, old_timestamp: str,
+                     new_timestamp: str) -> dict:
+        """Compare two backups of a specific client."""
+        try:
+            if client_name not in self.clients:
+                return {
+                    "status": "error",
+                    "message": f"Client {client_name} not found"
+                }
+
+            return self.clients[client_name].diff_backups(
+                old_timestamp, new_timestamp
+            )
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to diff backups for {client_name}: {str(e)}"
+            )
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    def restore_backup(self, client_name: str, target_path: str,
+                       backup_timestamp: str = None, patterns: list = None,
+                       newest_first: bool = False, verify: bool = True,
+                       progress=None) -> dict:
+        """Restore a backup, or selected paths of it, for a specific client."""
+        try:
+            if client_name not in self.clients:
+                return {
+                    "status": "error",
+                    "message": f"Client {client_name} not found"
+                }
+
+            result = self.clients[client_name].restore_backup(
+                target_path, backup_timestamp, patterns=patterns,
+                newest_first=newest_first, verify=verify, progress=progress
+            )
+            if result["status"] == "success":
+                self.logger.info(
+                    f"Restored {result['files_done']} files for {client_name} "
+                    f"from {result['timestamp']}"
+                )
+            return result
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to restore backup for {client_name}: {str(e)}"
+            )
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
     def get_client_backups(self, client_name: str) -> List[str]:
         """Get a list of all backups for a specific client."""
         try:
@@ -157,17 +272,273 @@ class BackupManager:
                 "message": str(e)
             }
 
+    def set_retention_policy(self, client_name: str, daily: int = 7,
+                             weekly: int = 4, monthly: int = 12,
+                             keep_last: int = 1) -> bool:
+        """Set how many daily, weekly and monthly backups a client keeps."""
+        try:
+            if client_name not in self.clients:
+                self.logger.error(f"Client {client_name} not found")
+                return False
+
+            self.clients[client_name].retention = RetentionPolicy(
+                daily, weekly, monthly, keep_last
+            )
+            self.logger.info(
+                f"Retention for {client_name}: {daily} daily, {weekly} weekly, "
+                f"{monthly} monthly"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to set retention for {client_name}: {str(e)}"
+            )
+            return False
+
+    def start_continuous_protection(self, client_name: str, source_path: str,
+                                    interval: float = 300.0) -> bool:
+        """Watch a client's source and snapshot its changes every interval.
+
+        Linux only. Each snapshot reads just the paths changed since the
+        last one.
+        """
+        try:
+            if client_name not in self.clients:
+                self.logger.error(f"Client {client_name} not found")
+                return False
+            if client_name in self.protectors:
+                return False
+
+            config = self.clients[client_name]
+            protector = ContinuousProtector(
+                source_path,
+                os.path.join(config.verify_path, "dirty_paths.journal"),
+                lambda paths: self.create_backup(client_name, source_path, paths),
+                interval
+            )
+            protector.start()
+            self.protectors[client_name] = protector
+            self.logger.info(
+                f"Continuous protection of {source_path} for {client_name} "
+                f"every {interval}s"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to start continuous protection for {client_name}: {str(e)}"
+            )
+            return False
+
+    def stop_continuous_protection(self, client_name: str) -> bool:
+        """Stop watching a client, backing up any pending changes first."""
+        protector = self.protectors.pop(client_name, None)
+        if protector is None:
+            return False
+        protector.stop()
+        self.logger.info(f"Stopped continuous protection for {client_name}")
+        return True
+
+    def enable_replication(self, client_name: str, s3_client, bucket: str,
+                           prefix: str = "", workers: int = 4,
+                           bytes_per_sec: float = None,
+                           part_size: int = DEFAULT_PART_SIZE) -> bool:
+        """Push a client's snapshots to an S3-compatible bucket such as R2.
+
+        Snapshots not yet in the bucket are pushed after every successful
+        backup, or on demand with ``replicate_backups``.
+        """
+        try:
+            if client_name not in self.clients:
+                self.logger.error(f"Client {client_name} not found")
+                return False
+            self.replicators[client_name] = Replicator(
+                self.clients[client_name], s3_client, bucket, prefix,
+                part_size, workers, bytes_per_sec
+            )
+            self.logger.info(f"Replicating {client_name} to bucket {bucket}")
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to enable replication for {client_name}: {str(e)}"
+            )
+            return False
+
+    def replicate_backups(self, client_name: str) -> dict:
+        """Push a client's snapshots that are not yet in its bucket."""
+        if client_name not in self.replicators:
+            return {
+                "status": "error",
+                "message": f"Replication not enabled for {client_name}"
+            }
+        return self.replicators[client_name].replicate()
+
+    def rotate_client_key(self, client_name: str) -> bool:
+        """Seal a client's new data with a fresh key; old data stays readable."""
+        try:
+            config = self.clients.get(client_name)
+            if config is None or config.cipher is None:
+                self.logger.error(f"Client {client_name} is not encrypted")
+                return False
+            with config.lock:
+                self.key_manager.rotate(client_name)
+                config.cipher = self.key_manager.cipher(client_name)
+                config.reset_stores()
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to rotate key for {client_name}: {str(e)}"
+            )
+            return False
+
+    def set_throttle(self, client_name: str = None,
+                     bytes_per_sec: float = None,
+                     files_per_sec: float = None) -> bool:
+        """Set I/O limits for one client, or for all clients together.
+
+        Takes effect immediately, including for jobs already running.
+        None lifts a limit.
+        """
+        try:
+            if client_name is None:
+                throttle = self.throttle
+            elif client_name in self.clients:
+                throttle = self.clients[client_name].throttle
+            else:
+                self.logger.error(f"Client {client_name} not found")
+                return False
+
+            throttle.set_limits(bytes_per_sec, files_per_sec)
+            self.logger.info(
+                f"I/O limits for {client_name or 'all clients'}: "
+                f"{bytes_per_sec} bytes/s, {files_per_sec} files/s"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to set I/O limits: {str(e)}")
+            return False
+
+    def start_load_governor(self, sample, thresholds: dict = None,
+                            interval: float = 5.0) -> bool:
+        """Slow down or pause all backup jobs while the host is busy.
+
+        ``sample`` returns the host's cpu_percent, memory_percent and
+        disk_busy_percent; ``thresholds`` maps them to (slow, pause) levels.
+        """
+        try:
+            self.stop_load_governor()
+            self.load_governor = LoadGovernor(
+                self.load_throttle, sample, thresholds, interval
+            )
+            self.load_governor.start()
+            self.logger.info("Load-adaptive backups enabled")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to start load governor: {str(e)}")
+            return False
+
+    def stop_load_governor(self):
+        """Stop adapting to host load and run at the configured limits."""
+        if self.load_governor:
+            self.load_governor.stop()
+            self.load_governor = None
+
+    def collect_garbage(self, client_name: str = None,
+                        pause: float = 0.0) -> dict:
+        """Enforce retention now for one client or all of them."""
+        try:
+            if client_name is not None and client_name not in self.clients:
+                return {
+                    "status": "error",
+                    "message": f"Client {client_name} not found"
+                }
+
+            names = [client_name] if client_name else list(self.clients)
+            results = {
+                name: GarbageCollector(self.clients[name]).run(pause)
+                for name in names
+            }
+            return {
+                "status": "success",
+                "clients": results,
+                "reclaimed_bytes": sum(
+                    stats['reclaimed_bytes'] for stats in results.values()
+                )
+            }
+
+        except Exception as e:
+            self.logger.error(f"Garbage collection failed: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    def start_garbage_collector(self, interval: float = 3600.0,
+                                pause: float = 0.05) -> bool:
+        """Collect garbage in a background thread.
+
+        Runs every ``interval`` seconds and after each backup, sleeping
+        ``pause`` seconds between steps so backups are never held up long.
+        """
+        if self._gc_thread and self._gc_thread.is_alive():
+            return False
+        self._gc_stop.clear()
+        self._gc_thread = threading.Thread(
+            target=self._gc_loop, args=(interval, pause),
+            name="easy-secure-gc", daemon=True
+        )
+        self._gc_thread.start()
+        self.logger.info("Background garbage collector started")
+        return True
+
+    def stop_garbage_collector(self):
+        """Stop the background garbage collector after its current step."""
+        self._gc_stop.set()
+        self._gc_wakeup.set()
+        if self._gc_thread:
+            self._gc_thread.join()
+            self._gc_thread = None
+
+    def _gc_loop(self, interval: float, pause: float):
+        while not self._gc_stop.is_set():
+            self._gc_wakeup.wait(interval)
+            self._gc_wakeup.clear()
+            for client_name, config in list(self.clients.items()):
+                if self._gc_stop.is_set():
+                    return
+                try:
+                    for _ in GarbageCollector(config).steps():
+                        if self._gc_stop.is_set():
+                            return
+                        time.sleep(pause)
+                except Exception as e:
+                    self.logger.error(
+                        f"Garbage collection failed for {client_name}: {str(e)}"
+                    )
+
     def run_scheduler(self):
-        """Run the backup scheduler."""
+        """Run the backup scheduler until stop_scheduler is called."""
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
+            self._scheduler_stop.clear()
+            self.scheduler.run(self._scheduler_stop)
         except KeyboardInterrupt:
             self.logger.info("Backup scheduler stopped")
         except Exception as e:
             self.logger.error(f"Scheduler error: {str(e)}")
 
+    def stop_scheduler(self, wait: bool = False):
+        """Stop run_scheduler and drop pending jobs.
+
+        Running jobs are allowed to finish; ``wait`` blocks until they have.
+        """
+        self._scheduler_stop.set()
+        self.scheduler.shutdown(wait=wait)
+
 # Example usage:
 if __name__ == "__main__":
     # Initialize the backup manager
@@ -0,0 +1,188 @@
+"""
+EASY_SECURE™ Backup Catalog
+Version: 1.0
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('EASY_SECURE.catalog')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    client TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    created TEXT NOT NULL,
+    file_count INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    new_bytes INTEGER NOT NULL,
+    changed_files INTEGER NOT NULL,
+    merkle_root TEXT,
+    location TEXT NOT NULL,
+    PRIMARY KEY (client, timestamp)
+);
+CREATE TABLE IF NOT EXISTS files (
+    client TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    base TEXT,
+    PRIMARY KEY (client, timestamp, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_by_path ON files (client, path);
+CREATE TABLE IF NOT EXISTS jobs (
+    client TEXT NOT NULL,
+    started TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_client ON jobs (client, started);
+"""
+
+INFO_COLUMNS = (
+    'timestamp', 'mode', 'created', 'size_bytes', 'file_count', 'new_bytes',
+    'changed_files', 'merkle_root', 'location'
+)
+
+
+class BackupCatalog:
+    """SQLite index of snapshots and their files, shared by a BackupManager.
+
+    Listing, "latest backup" and info queries are answered from indexes
+    instead of walking backup trees.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def record_snapshot(self, client_name: str, info: dict,
+                        files: Optional[Dict[str, dict]] = None):
+        """Insert or replace a snapshot and its per-file entries."""
+        timestamp = info['timestamp']
+        snapshot_row = (
+            client_name, timestamp, info['mode'],
+            info.get('created') or datetime.now().isoformat(),
+            info['file_count'], info['size_bytes'],
+            info.get('new_bytes', info['size_bytes']),
+            info.get('changed_files', info['file_count']),
+            info.get('merkle_root'), info['location']
+        )
+        file_rows = (
+            (client_name, timestamp, path, entry['size'], entry.get('mtime_ns'),
+             entry.get('sha256'), entry.get('base'))
+            for path, entry in (files or {}).items()
+        )
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM files WHERE client = ? AND timestamp = ?",
+                (client_name, timestamp)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?,?,?,?,?,?,?,?,?,?)",
+                snapshot_row
+            )
+            self._conn.executemany(
+                "INSERT INTO files VALUES (?,?,?,?,?,?,?)", file_rows
+            )
+
+    def remove_snapshot(self, client_name: str, timestamp: str):
+        """Drop a snapshot and its files from the catalog."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM files WHERE client = ? AND timestamp = ?",
+                (client_name, timestamp)
+            )
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE client = ? AND timestamp = ?",
+                (client_name, timestamp)
+            )
+
+    def list_snapshots(self, client_name: str) -> List[str]:
+        """List a client's snapshot timestamps, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp FROM snapshots WHERE client = ? "
+                "ORDER BY timestamp DESC",
+                (client_name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def latest_snapshot(self, client_name: str) -> Optional[str]:
+        """Return the newest snapshot timestamp of a client."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(timestamp) FROM snapshots WHERE client = ?",
+                (client_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def snapshot_info(self, client_name: str, timestamp: str) -> Optional[dict]:
+        """Return the recorded totals of a snapshot."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(INFO_COLUMNS)} FROM snapshots "
+                "WHERE client = ? AND timestamp = ?",
+                (client_name, timestamp)
+            ).fetchone()
+        return dict(zip(INFO_COLUMNS, row)) if row else None
+
+    def snapshot_files(self, client_name: str, timestamp: str,
+                       prefix: str = '') -> List[dict]:
+        """List the files of a snapshot, optionally under a path prefix."""
+        query = (
+            "SELECT path, size, mtime_ns, sha256, base FROM files "
+            "WHERE client = ? AND timestamp = ?"
+        )
+        params = [client_name, timestamp]
+        if prefix:
+            query += " AND path >= ? AND path < ?"
+            prefix = prefix.rstrip('/') + '/'
+            params += [prefix, prefix[:-1] + '0']
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY path", params).fetchall()
+        return [
+            dict(zip(('path', 'size', 'mtime_ns', 'sha256', 'base'), row))
+            for row in rows
+        ]
+
+    def record_job(self, client_name: str, started: str, seconds: float,
+                   status: str):
+        """Record how long a backup job ran."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?,?,?,?)",
+                (client_name, started, seconds, status)
+            )
+
+    def job_durations(self, client_name: str, limit: int = 5) -> List[float]:
+        """Return the durations of a client's latest successful jobs."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seconds FROM jobs WHERE client = ? AND status = 'success' "
+                "ORDER BY started DESC LIMIT ?",
+                (client_name, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
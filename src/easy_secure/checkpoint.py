@@ -0,0 +1,92 @@
+"""
+EASY_SECURE™ Backup Checkpoints
+Version: 1.0
+"""
+
+import os
+import json
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointJournal:
+    """Append-only record of the files a running snapshot has finished.
+
+    The first line describes the snapshot (source, mode, timestamp); each
+    further line holds one finished file's manifest entry and counters.
+    Records are held back and written at most every ``sync_interval``
+    seconds, after ``before_sync`` has made the data they describe
+    durable, so an interrupted backup can pick up from the last sync.
+    """
+
+    def __init__(self, journal_file: str, header: dict = None,
+                 sync_interval: float = 1.0,
+                 before_sync: Callable[[], None] = None):
+        self.journal_file = journal_file
+        self.sync_interval = sync_interval
+        self.before_sync = before_sync
+        self._pending = []
+        if header is not None:
+            self._handle = open(journal_file, 'w')
+            self._handle.write(
+                f"{json.dumps(dict(header, version=CHECKPOINT_VERSION))}\n"
+            )
+            self._sync()
+        else:
+            self._handle = open(journal_file, 'a')
+        self._synced = time.monotonic()
+
+    @staticmethod
+    def load(journal_file: str) -> Tuple[Optional[dict], Dict[str, list]]:
+        """Read a journal, returning its header and finished files.
+
+        Finished files map to [entry, new bytes, new chunks, changed].
+        """
+        completed = {}
+        with open(journal_file, 'r') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return None, {}
+            for line in f:
+                try:
+                    rel_path, *record = json.loads(line)
+                except ValueError:
+                    break  # torn final line
+                completed[rel_path] = record
+        if header.get('version') != CHECKPOINT_VERSION:
+            return None, {}
+        return header, completed
+
+    def record(self, rel_path: str, entry: dict, new_bytes: int,
+               new_chunks: int, changed: bool):
+        """Note that a file's data is in the snapshot."""
+        self._pending.append(
+            f"{json.dumps([rel_path, entry, new_bytes, new_chunks, changed])}\n"
+        )
+        if time.monotonic() - self._synced >= self.sync_interval:
+            self._sync()
+
+    def _sync(self):
+        if self._pending:
+            # Data first, so no record can reach the disk ahead of it
+            if self.before_sync:
+                self.before_sync()
+            self._handle.writelines(self._pending)
+            self._pending = []
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._synced = time.monotonic()
+
+    def close(self):
+        if not self._handle.closed:
+            self._sync()
+            self._handle.close()
+
+    def remove(self):
+        """Drop the journal once its snapshot is committed."""
+        self._handle.close()
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
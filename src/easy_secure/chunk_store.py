@@ -0,0 +1,270 @@
+"""
+EASY_SECURE™ Chunk Store
+Version: 1.0
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+try:
+    import numpy
+except ImportError:  # chunk boundaries are then found in pure Python
+    numpy = None
+
+from .encryption import is_sealed
+
+logger = logging.getLogger('EASY_SECURE.chunks')
+
+
+def _build_gear_table() -> Tuple[int, ...]:
+    """Build the deterministic 256-entry gear table used by the chunker."""
+    return tuple(
+        int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], 'big')
+        for i in range(256)
+    )
+
+
+GEAR = _build_gear_table()
+GEAR_ARRAY = numpy.array(GEAR, dtype=numpy.uint32) if numpy else None
+
+# The 32-bit gear hash at a byte only depends on the 32 bytes ending there
+GEAR_WINDOW = 32
+# Bytes hashed per vectorized step while looking for a boundary
+SCAN_STEP = 64 * 1024
+
+
+def _gear_hashes(values):
+    """Gear hash at every position of an array of gear values.
+
+    Equals summing ``values[i - k] << k`` over the last 32 positions,
+    built in log2(32) doubling steps instead of one pass per byte.
+    Positions before the start of the array count as zero.
+    """
+    hashes = values
+    width = 1
+    while width < GEAR_WINDOW:
+        shifted = hashes.copy()
+        shifted[width:] += hashes[:-width] << numpy.uint32(width)
+        hashes = shifted
+        width *= 2
+    return hashes
+
+
+class Chunker:
+    """Content-defined chunker using a gear rolling hash (FastCDC style).
+
+    Boundaries depend only on the bytes around them, so an insertion near
+    the start of a file only changes the chunks it touches.
+    """
+
+    def __init__(self, min_size: int = 256 * 1024, avg_size: int = 1024 * 1024,
+                 max_size: int = 4 * 1024 * 1024):
+        if not 0 < min_size <= avg_size <= max_size:
+            raise ValueError("Chunk sizes must satisfy 0 < min <= avg <= max")
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+
+        # Normalized chunking: a stricter mask before the average size and
+        # a looser one after it keeps chunk sizes close to the average.
+        bits = max(avg_size.bit_length() - 1, 2)
+        self.mask_strict = ((1 << (bits + 1)) - 1) << (31 - bits)
+        self.mask_loose = ((1 << (bits - 1)) - 1) << (33 - bits)
+
+    def _find_boundary(self, data, length: int) -> int:
+        """Return the length of the next chunk at the start of data."""
+        if length <= self.min_size:
+            return length
+        if numpy is not None:
+            return self._find_boundary_vectorized(data, length)
+        return self._find_boundary_python(data, length)
+
+    def _find_boundary_vectorized(self, data, length: int) -> int:
+        """Find the same boundary as the byte loop, a block at a time."""
+        normal = min(length, self.avg_size)
+        stop = min(length, self.max_size)
+        raw = numpy.frombuffer(data, dtype=numpy.uint8, count=stop)
+
+        start = self.min_size
+        while start < stop:
+            end = min(stop, start + SCAN_STEP)
+            # The hash restarts at min_size; later blocks need the bytes
+            # just before them, earlier positions count as zero
+            context = max(self.min_size, start - (GEAR_WINDOW - 1))
+            hashes = _gear_hashes(GEAR_ARRAY[raw[context:end]])[start - context:]
+
+            masks = numpy.full(end - start, self.mask_loose, dtype=numpy.uint32)
+            masks[:max(0, normal - start)] = self.mask_strict
+            hits = numpy.flatnonzero((hashes & masks) == 0)
+            if hits.size:
+                return start + int(hits[0]) + 1
+            start = end
+
+        return stop
+
+    def _find_boundary_python(self, data, length: int) -> int:
+        normal = min(length, self.avg_size)
+        stop = min(length, self.max_size)
+        gear = GEAR
+        mask = self.mask_strict
+        h = 0
+        i = self.min_size
+
+        while i < normal:
+            h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFF
+            if not h & mask:
+                return i + 1
+            i += 1
+
+        mask = self.mask_loose
+        while i < stop:
+            h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFF
+            if not h & mask:
+                return i + 1
+            i += 1
+
+        return stop
+
+    def chunks(self, stream: BinaryIO) -> Iterator[bytes]:
+        """Yield content-defined chunks read from a binary stream."""
+        buffer = bytearray()
+        eof = False
+
+        while True:
+            while not eof and len(buffer) < self.max_size:
+                data = stream.read(self.max_size)
+                if not data:
+                    eof = True
+                else:
+                    buffer += data
+
+            if not buffer:
+                return
+
+            cut = self._find_boundary(buffer, len(buffer))
+            yield bytes(buffer[:cut])
+            del buffer[:cut]
+
+
+class ChunkStore:
+    """Stores chunks once under their SHA-256 digest.
+
+    With a cipher, chunks are sealed as they are written and bound to
+    their digest, so a chunk cannot be swapped for another.
+    """
+
+    def __init__(self, root: str, chunker: Chunker = None, cipher=None):
+        self.root = root
+        self.chunker = chunker or Chunker()
+        self.cipher = cipher
+        os.makedirs(self.root, exist_ok=True)
+
+    def chunk_path(self, digest: str) -> str:
+        """Return the on-disk path of a chunk."""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has_chunk(self, digest: str) -> bool:
+        """Check whether a chunk is already stored."""
+        return os.path.exists(self.chunk_path(digest))
+
+    def put_chunk(self, data: bytes) -> Tuple[str, bool]:
+        """Store a chunk, returning its digest and whether it was new."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return digest, False
+
+        chunk_dir = os.path.dirname(path)
+        os.makedirs(chunk_dir, exist_ok=True)
+        # A temp file per writer: workers may store the same chunk at once
+        fd, tmp_path = tempfile.mkstemp(dir=chunk_dir, prefix=f"{digest}.",
+                                        suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.cipher.seal(data, digest.encode())
+                        if self.cipher else data)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                return digest, False  # another writer stored it first
+            except OSError:
+                os.replace(tmp_path, path)  # no hard links on this filesystem
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return digest, True
+
+    def get_chunk(self, digest: str) -> bytes:
+        """Read a chunk by digest."""
+        with open(self.chunk_path(digest), 'rb') as f:
+            return self.open_chunk(digest, f.read())
+
+    def open_chunk(self, digest: str, stored: bytes) -> bytes:
+        """Turn a chunk as stored on disk back into its data."""
+        if not is_sealed(stored):
+            return stored  # written before encryption was enabled
+        if self.cipher is None:
+            raise ValueError(f"Chunk {digest} is encrypted and no key was given")
+        return self.cipher.open(stored, digest.encode())
+
+    def verify_chunk(self, digest: str) -> bool:
+        """Check that a stored chunk still matches its digest."""
+        try:
+            return hashlib.sha256(self.get_chunk(digest)).hexdigest() == digest
+        except (OSError, ValueError):
+            return False
+
+    def remove_chunk(self, digest: str) -> int:
+        """Delete a chunk, returning the bytes freed."""
+        path = self.chunk_path(digest)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def store_file(self, file_path: str, throttle=None) -> Dict:
+        """Split a file into chunks and store the ones not yet present."""
+        file_hash = hashlib.sha256()
+        chunks = []
+        size = 0
+        new_bytes = 0
+        new_chunks = 0
+
+        with open(file_path, 'rb') as f:
+            for data in self.chunker.chunks(f):
+                if throttle:
+                    throttle.consume(nbytes=len(data))
+                file_hash.update(data)
+                digest, is_new = self.put_chunk(data)
+                chunks.append(digest)
+                size += len(data)
+                if is_new:
+                    new_bytes += len(data)
+                    new_chunks += 1
+
+        return {
+            'sha256': file_hash.hexdigest(),
+            'size': size,
+            'chunks': chunks,
+            'new_bytes': new_bytes,
+            'new_chunks': new_chunks
+        }
+
+    def read_file(self, chunks: list) -> Iterator[bytes]:
+        """Yield the contents of a file from its chunk list."""
+        for digest in chunks:
+            yield self.get_chunk(digest)
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Yield the digest of every stored chunk."""
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith('.tmp'):
+                    yield name
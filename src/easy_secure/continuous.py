@@ -0,0 +1,344 @@
+"""
+EASY_SECURE™ Continuous Protection
+Version: 1.0
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('EASY_SECURE.continuous')
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+# Journal line meaning "the whole tree must be rescanned"
+RESCAN = None
+
+_libc = None
+
+
+def _inotify_libc():
+    """Load libc's inotify functions, failing clearly off Linux."""
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32
+        ]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+class InotifyWatcher:
+    """Watches a directory tree and reports changed relative paths.
+
+    A watch is placed on every directory; new directories are watched as
+    they appear. If the kernel queue overflows or watches run out, the
+    watcher reports that a full rescan is needed instead of guessing.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._libc = _inotify_libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._paths: Dict[int, str] = {}
+        self.overflowed = False
+        self._watch_tree('')
+
+    def _watch_tree(self, rel_dir: str):
+        """Watch a directory and everything below it."""
+        top = os.path.join(self.root, rel_dir)
+        for root, dirs, _ in os.walk(top):
+            rel_root = os.path.relpath(root, self.root).replace(os.sep, '/')
+            self._add_watch('' if rel_root == '.' else rel_root)
+            if self.overflowed:
+                return
+
+    def _add_watch(self, rel_dir: str):
+        path = os.path.join(self.root, rel_dir)
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(path), WATCH_MASK
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning(
+                    f"Out of inotify watches under {self.root}; "
+                    f"falling back to full rescans"
+                )
+                self.overflowed = True
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                raise OSError(err, os.strerror(err))
+            return
+        self._paths[wd] = rel_dir
+
+    def poll(self, timeout: float = 1.0) -> Tuple[Set[str], bool]:
+        """Wait for events; returns (changed paths, rescan needed)."""
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            self._parse(data, changed)
+            ready, _, _ = select.select([self.fd], [], [], 0)
+
+        rescan = self.overflowed
+        self.overflowed = False
+        return changed, rescan
+
+    def _parse(self, data: bytes, changed: Set[str]):
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT.size:offset + _EVENT.size + length]
+            offset += _EVENT.size + length
+            name = os.fsdecode(raw_name.rstrip(b'\0'))
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning(f"inotify queue overflowed for {self.root}")
+                self.overflowed = True
+                continue
+            rel_dir = self._paths.get(wd)
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            if rel_dir is None:
+                continue
+
+            if not name:
+                # Event on the watched directory itself
+                if rel_dir == '' and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self.overflowed = True
+                changed.add(rel_dir)
+                continue
+
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            changed.add(rel_path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Files created before the watch existed are covered by
+                # the directory itself being dirty
+                self._watch_tree(rel_path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DirtyJournal:
+    """Persistent set of paths changed since the last snapshot.
+
+    Paths are appended to a journal file as they are reported, so a
+    restart loses nothing. ``take`` moves the pending set aside while a
+    snapshot runs; ``commit`` drops it and ``restore`` puts it back.
+    """
+
+    def __init__(self, journal_file: str):
+        self.journal_file = journal_file
+        self.inflight_file = f"{journal_file}.inflight"
+        self.paths: Set[str] = set()
+        self.rescan = False
+
+        # Recover paths a crash left behind, including an unfinished take
+        for path in (self.inflight_file, self.journal_file):
+            if os.path.exists(path):
+                self._load(path)
+        if os.path.exists(self.inflight_file):
+            self._rewrite()
+            os.remove(self.inflight_file)
+        self._handle = open(self.journal_file, 'a')
+
+    def _load(self, journal_file: str):
+        with open(journal_file, 'r') as f:
+            for line in f:
+                try:
+                    path = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                if path is RESCAN:
+                    self.rescan = True
+                else:
+                    self.paths.add(path)
+
+    def _rewrite(self):
+        with open(self.journal_file, 'w') as f:
+            if self.rescan:
+                f.write(f"{json.dumps(RESCAN)}\n")
+            for path in sorted(self.paths):
+                f.write(f"{json.dumps(path)}\n")
+
+    def add(self, paths: Iterable[str], rescan: bool = False):
+        """Record changed paths, or that a full rescan is needed."""
+        lines = []
+        if rescan and not self.rescan:
+            self.rescan = True
+            lines.append(RESCAN)
+        for path in paths:
+            if path not in self.paths:
+                self.paths.add(path)
+                lines.append(path)
+        if lines:
+            self._handle.write(''.join(f"{json.dumps(line)}\n" for line in lines))
+            self._handle.flush()
+
+    @property
+    def pending(self) -> bool:
+        return self.rescan or bool(self.paths)
+
+    def take(self) -> Tuple[Optional[Set[str]], bool]:
+        """Hand out the pending changes; None paths means rescan all."""
+        self._handle.close()
+        os.replace(self.journal_file, self.inflight_file)
+        taken = (None if self.rescan else self.paths), self.rescan
+        self._taken = (self.paths, self.rescan)
+        self.paths, self.rescan = set(), False
+        self._handle = open(self.journal_file, 'a')
+        return taken
+
+    def commit(self):
+        """Forget changes handed out by take, now safely backed up."""
+        if os.path.exists(self.inflight_file):
+            os.remove(self.inflight_file)
+
+    def restore(self):
+        """Return changes handed out by take to the journal."""
+        paths, rescan = self._taken
+        self.add(paths, rescan)
+        self.commit()
+
+    def close(self):
+        self._handle.close()
+
+
+class ContinuousProtector:
+    """Takes small incremental snapshots of a tree as it changes.
+
+    Changes reported by the watcher are journaled; every ``interval``
+    seconds a snapshot covering only the dirty paths is written through
+    ``run_snapshot``. The first snapshot, and any after a watcher overflow,
+    rescans the whole tree.
+    """
+
+    def __init__(self, source_path: str, journal_file: str,
+                 run_snapshot: Callable[[Optional[List[str]]], dict],
+                 interval: float = 300.0, watcher: InotifyWatcher = None):
+        self.source_path = source_path
+        self.run_snapshot = run_snapshot
+        self.interval = interval
+        self.watcher = watcher or InotifyWatcher(source_path)
+        self.journal = DirtyJournal(journal_file)
+        # Changes made while nothing was watching are unknown
+        self.journal.add([], rescan=True)
+        self.snapshots = 0
+        self.last_result = None
+
+        self._last_snapshot = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self, timeout: float = 1.0):
+        """Journal the changes the watcher has seen."""
+        changed, rescan = self.watcher.poll(timeout)
+        if changed or rescan:
+            self.journal.add(changed, rescan)
+
+    def snapshot(self) -> Optional[dict]:
+        """Back up the journaled changes now, if there are any."""
+        self._last_snapshot = time.monotonic()
+        if not self.journal.pending:
+            return None
+
+        paths, rescan = self.journal.take()
+        try:
+            result = self.run_snapshot(None if rescan else sorted(paths))
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+
+        if result.get("status") == "success":
+            self.journal.commit()
+            self.snapshots += 1
+        else:
+            self.journal.restore()
+            logger.error(
+                f"Continuous snapshot of {self.source_path} failed: "
+                f"{result.get('message')}"
+            )
+        self.last_result = result
+        return result
+
+    def run_once(self, timeout: float = 1.0):
+        """Poll for changes and snapshot if the interval has passed."""
+        self.poll(timeout)
+        if time.monotonic() - self._last_snapshot >= self.interval:
+            self.snapshot()
+
+    def start(self) -> bool:
+        if self._thread and self._thread.is_alive():
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="easy-secure-continuous", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop watching after backing up any pending changes."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.poll(0)
+        self.snapshot()
+        self.watcher.close()
+        self.journal.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once(min(1.0, self.interval))
+            except Exception as e:
+                logger.error(f"Continuous protection error: {str(e)}")
+                self._stop.wait(1.0)
@@ -0,0 +1,262 @@
+"""
+EASY_SECURE™ Streaming Copy Pipeline
+Version: 1.0
+"""
+
+import os
+import json
+import errno
+import shutil
+import time
+import hashlib
+from typing import Optional
+
+from .merkle import MerkleTree
+from .fast_copy import (
+    COPY_STRATEGIES, data_extents, file_class, is_sparse, kernel_copy_range
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+_ZEROS = memoryview(bytes(DEFAULT_BUFFER_SIZE))
+
+LINK_METHODS = ("auto", "reflink", "hardlink")
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Errors meaning the filesystem cannot share data between these two files
+_UNSUPPORTED_LINK_ERRORS = {
+    errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EPERM,
+    errno.EMLINK
+}
+
+_reflink_supported = fcntl is not None
+
+
+def copy_and_hash(source_file: str, dest_file: str,
+                  buffer_size: int = DEFAULT_BUFFER_SIZE,
+                  strategy: str = "stream", known_hash: str = None,
+                  throttle=None, sync: bool = False) -> dict:
+    """Copy a file and hash it in one pass through a reused buffer.
+
+    Holes in sparse files are kept. With the "kernel" strategy the data is
+    moved by copy_file_range/sendfile and hashed from the page cache
+    afterwards; "auto" uses it only when ``known_hash`` makes hashing
+    unnecessary. Bytes copied are charged to ``throttle`` block by block.
+    With ``sync`` the copy is on disk when this returns.
+    """
+    if strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Invalid copy strategy: {strategy}")
+    if strategy == "auto":
+        strategy = "kernel" if known_hash else "stream"
+
+    started = time.perf_counter()
+    file_hash = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    with open(source_file, 'rb') as src, open(dest_file, 'wb') as dst:
+        stat = os.fstat(src.fileno())
+        sparse = is_sparse(stat)
+        extents = data_extents(src.fileno(), stat.st_size) if sparse else None
+
+        if strategy == "kernel":
+            for start, end in extents or [(0, stat.st_size)]:
+                # Hand the kernel one buffer at a time when throttled
+                step = buffer_size if throttle else max(end - start, 1)
+                for offset in range(start, end, step):
+                    piece_end = min(end, offset + step)
+                    if throttle:
+                        throttle.consume(nbytes=piece_end - offset)
+                    kernel_copy_range(
+                        src.fileno(), dst.fileno(), offset, piece_end
+                    )
+            os.ftruncate(dst.fileno(), stat.st_size)
+            size = stat.st_size
+            if known_hash is None:
+                # Reads back from the page cache, so it is not charged
+                _hash_extents(src, extents, size, view, file_hash, None)
+        elif sparse:
+            size = stat.st_size
+            _hash_extents(src, extents, size, view, file_hash, dst, throttle)
+            dst.truncate(size)
+        else:
+            size = 0
+            while True:
+                count = src.readinto(buffer)
+                if not count:
+                    break
+                if throttle:
+                    throttle.consume(nbytes=count)
+                block = view[:count]
+                file_hash.update(block)
+                dst.write(block)
+                size += count
+
+        if sync:
+            dst.flush()
+            os.fsync(dst.fileno())
+
+    shutil.copystat(source_file, dest_file)
+    return {
+        'sha256': known_hash or file_hash.hexdigest(),
+        'size': size,
+        'class': file_class(stat),
+        'method': strategy,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def _hash_extents(src, extents, size: int, view: memoryview, file_hash,
+                  dst=None, throttle=None):
+    """Hash a file extent by extent, feeding zeros for its holes.
+
+    When ``dst`` is given the data extents are also written to it at the
+    same offsets, leaving the holes unallocated.
+    """
+    position = 0
+    for start, end in (extents if extents is not None else [(0, size)]):
+        _hash_zeros(file_hash, start - position)
+        src.seek(start)
+        position = start
+        while position < end:
+            count = src.readinto(view[:min(len(view), end - position)])
+            if not count:
+                break
+            if throttle:
+                throttle.consume(nbytes=count)
+            block = view[:count]
+            file_hash.update(block)
+            if dst is not None:
+                dst.seek(position)
+                dst.write(block)
+            position += count
+    _hash_zeros(file_hash, size - position)
+
+
+def _hash_zeros(file_hash, length: int):
+    """Feed a run of zero bytes into a hash without allocating it."""
+    while length > 0:
+        count = min(length, len(_ZEROS))
+        file_hash.update(_ZEROS[:count])
+        length -= count
+
+
+def reflink_file(source_file: str, dest_file: str) -> bool:
+    """Clone a file's extents copy-on-write; False if unsupported."""
+    global _reflink_supported
+    if not _reflink_supported:
+        return False
+
+    with open(source_file, 'rb') as src, open(dest_file, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_LINK_ERRORS:
+                raise
+            if e.errno != errno.EXDEV:
+                _reflink_supported = False
+            cloned = False
+        else:
+            cloned = True
+
+    if not cloned:
+        os.remove(dest_file)
+        return False
+    shutil.copystat(source_file, dest_file)
+    return True
+
+
+def link_file(source_file: str, dest_file: str,
+              method: str = "auto") -> Optional[str]:
+    """Share an unchanged file with an earlier snapshot instead of copying.
+
+    Returns the method used ("reflink" or "hardlink"), or None when neither
+    works and the caller has to copy the data.
+    """
+    if method in ("auto", "reflink") and reflink_file(source_file, dest_file):
+        return "reflink"
+    if method == "reflink":
+        return None
+
+    try:
+        os.link(source_file, dest_file)
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED_LINK_ERRORS:
+            raise
+        return None
+    return "hardlink"
+
+
+def hash_file(file_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE,
+              throttle=None) -> str:
+    """Hash a file through a reused buffer without loading it whole."""
+    file_hash = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    with open(file_path, 'rb') as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            if throttle:
+                throttle.consume(nbytes=count)
+            file_hash.update(view[:count])
+
+    return file_hash.hexdigest()
+
+
+class VerificationWriter:
+    """Streams verification entries to disk as each file finishes.
+
+    Entries are appended to a line-per-file journal while the backup runs;
+    on completion they are sealed into a Merkle tree and the journal is
+    removed.
+    """
+
+    def __init__(self, tree_file: str):
+        self.tree_file = tree_file
+        self.journal_file = f"{tree_file}.journal"
+        self.entries = {}
+        self._tree = None
+        self._handle = open(self.journal_file, 'w')
+
+    def add(self, rel_path: str, file_hash: str):
+        """Record the hash of a finished file."""
+        self._handle.write(f"{json.dumps([rel_path, file_hash])}\n")
+        self.entries[rel_path] = file_hash
+
+    def build_tree(self) -> MerkleTree:
+        """Seal the recorded entries into a Merkle tree."""
+        if self._tree is None:
+            self._tree = MerkleTree.from_hashes(self.entries)
+        return self._tree
+
+    def close(self):
+        """Write the tree and drop the journal."""
+        self._handle.close()
+        self.build_tree().save(self.tree_file)
+        os.remove(self.journal_file)
+
+    def abort(self):
+        """Discard a partially written journal."""
+        self._handle.close()
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
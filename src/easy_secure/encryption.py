@@ -0,0 +1,199 @@
+"""
+EASY_SECURE™ Backup Encryption
+Version: 1.0
+"""
+
+import os
+import json
+import secrets
+import logging
+from datetime import datetime
+from typing import Dict
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # encryption is optional
+    AESGCM = None
+
+logger = logging.getLogger('EASY_SECURE.encryption')
+
+ALGORITHM = "AES-256-GCM"
+MASTER_KEY_ENV = "EASY_SECURE_MASTER_KEY"
+
+# Sealed data: MAGIC, NUL-padded key id, nonce, then ciphertext and tag
+MAGIC = b"ESE1"
+KEY_ID_SIZE = 8
+NONCE_SIZE = 12
+TAG_SIZE = 16
+HEADER_SIZE = len(MAGIC) + KEY_ID_SIZE + NONCE_SIZE
+OVERHEAD = HEADER_SIZE + TAG_SIZE
+
+
+def _require_aead():
+    if AESGCM is None:
+        raise RuntimeError("Encryption needs the 'cryptography' package")
+
+
+def _key_id_field(key_id: str) -> bytes:
+    """The header bytes that name a key."""
+    try:
+        field = key_id.encode('ascii')
+    except UnicodeEncodeError:
+        field = b''
+    if not field or len(field) > KEY_ID_SIZE or b'\0' in field:
+        raise ValueError(
+            f"Key id must be 1 to {KEY_ID_SIZE} ASCII characters: {key_id!r}"
+        )
+    return field.ljust(KEY_ID_SIZE, b'\0')
+
+
+def is_sealed(data: bytes) -> bool:
+    """Check whether stored data was written by a DataCipher."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+class DataCipher:
+    """Seals chunks and archive blocks with a client's data keys.
+
+    Every piece is sealed on its own with AES-256-GCM under a random nonce,
+    so pieces can be opened in any order and in parallel. The key id is
+    stored with each piece; any key the client has had can open it, which
+    keeps old snapshots readable after a rotation. Instances are picklable
+    for process workers.
+    """
+
+    def __init__(self, keys: Dict[str, bytes], active: str):
+        _require_aead()
+        if active not in keys:
+            raise ValueError(f"Unknown data key: {active}")
+        for key_id in keys:
+            _key_id_field(key_id)
+        self.keys = keys
+        self.active = active
+        self._active_field = _key_id_field(active)
+        self._aead = {}
+
+    def __getstate__(self):
+        return {'keys': self.keys, 'active': self.active}
+
+    def __setstate__(self, state):
+        self.__init__(state['keys'], state['active'])
+
+    def _get(self, key_id: str):
+        aead = self._aead.get(key_id)
+        if aead is None:
+            try:
+                aead = self._aead[key_id] = AESGCM(self.keys[key_id])
+            except KeyError:
+                raise ValueError(f"Unknown data key: {key_id}") from None
+        return aead
+
+    def seal(self, data: bytes, aad: bytes = b'') -> bytes:
+        """Encrypt and authenticate data with the active key."""
+        nonce = os.urandom(NONCE_SIZE)
+        return b''.join((
+            MAGIC, self._active_field, nonce,
+            self._get(self.active).encrypt(nonce, data, aad)
+        ))
+
+    def open(self, sealed: bytes, aad: bytes = b'') -> bytes:
+        """Decrypt sealed data, failing if it was altered."""
+        if not is_sealed(sealed) or len(sealed) < OVERHEAD:
+            raise ValueError("Data is not sealed")
+        key_id = sealed[len(MAGIC):len(MAGIC) + KEY_ID_SIZE].rstrip(b'\0').decode()
+        nonce = sealed[len(MAGIC) + KEY_ID_SIZE:HEADER_SIZE]
+        try:
+            return self._get(key_id).decrypt(nonce, sealed[HEADER_SIZE:], aad)
+        except InvalidTag:
+            raise ValueError("Sealed data failed authentication") from None
+
+
+class KeyManager:
+    """Per-client data keys, stored wrapped under a master key.
+
+    Each client's keys live in ``<key_root>/<client>.json``, encrypted
+    with the master key and bound to the client name. The master key is
+    passed in or read from ``EASY_SECURE_MASTER_KEY`` (64 hex characters)
+    and is never written to disk.
+    """
+
+    def __init__(self, key_root: str = "keys", master_key: bytes = None):
+        self.key_root = key_root
+        self._master_key = master_key
+
+    @property
+    def master_key(self) -> bytes:
+        if self._master_key is None:
+            value = os.getenv(MASTER_KEY_ENV)
+            if not value:
+                raise RuntimeError(f"{MASTER_KEY_ENV} is not set")
+            self._master_key = bytes.fromhex(value)
+        if len(self._master_key) != 32:
+            raise ValueError("Master key must be 32 bytes")
+        return self._master_key
+
+    def _key_file(self, client_name: str) -> str:
+        return os.path.join(self.key_root, f"{client_name}.json")
+
+    def _load(self, client_name: str) -> dict:
+        key_file = self._key_file(client_name)
+        if not os.path.exists(key_file):
+            return {'active': None, 'keys': {}}
+        with open(key_file, 'r') as f:
+            return json.load(f)
+
+    def _save(self, client_name: str, record: dict):
+        os.makedirs(self.key_root, exist_ok=True)
+        key_file = self._key_file(client_name)
+        tmp_file = f"{key_file}.tmp"
+        # Wrapped keys are useless without the master key, but keep them private
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_file, key_file)
+
+    def cipher(self, client_name: str) -> DataCipher:
+        """Return a client's cipher, creating its first key if needed."""
+        _require_aead()
+        record = self._load(client_name)
+        if record['active'] is None:
+            self.rotate(client_name)
+            record = self._load(client_name)
+
+        master = AESGCM(self.master_key)
+        keys = {}
+        for key_id, wrapped in record['keys'].items():
+            sealed = bytes.fromhex(wrapped['key'])
+            try:
+                keys[key_id] = master.decrypt(
+                    sealed[:NONCE_SIZE], sealed[NONCE_SIZE:],
+                    f"{client_name}:{key_id}".encode()
+                )
+            except InvalidTag:
+                raise ValueError(
+                    f"Cannot unwrap key {key_id} of {client_name}: wrong master key"
+                ) from None
+        return DataCipher(keys, record['active'])
+
+    def rotate(self, client_name: str) -> str:
+        """Start sealing a client's new data with a fresh key."""
+        _require_aead()
+        record = self._load(client_name)
+        key_id = secrets.token_hex(KEY_ID_SIZE // 2)
+        while key_id in record['keys']:
+            key_id = secrets.token_hex(KEY_ID_SIZE // 2)
+
+        nonce = os.urandom(NONCE_SIZE)
+        wrapped = nonce + AESGCM(self.master_key).encrypt(
+            nonce, AESGCM.generate_key(bit_length=256),
+            f"{client_name}:{key_id}".encode()
+        )
+        record['keys'][key_id] = {
+            'key': wrapped.hex(),
+            'created': datetime.now().isoformat()
+        }
+        record['active'] = key_id
+        self._save(client_name, record)
+        logger.info(f"New data key {key_id} for {client_name}")
+        return key_id
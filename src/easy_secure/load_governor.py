@@ -0,0 +1,158 @@
+"""
+EASY_SECURE™ Load-Adaptive Throttling
+Version: 1.0
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .throttle import Throttle, TokenBucket
+
+logger = logging.getLogger('EASY_SECURE.load')
+
+# metric -> (slow down at, pause at), in percent
+DEFAULT_THRESHOLDS: Dict[str, Tuple[float, float]] = {
+    'cpu_percent': (75.0, 95.0),
+    'memory_percent': (85.0, 95.0),
+    'disk_busy_percent': (60.0, 90.0)
+}
+
+
+class LoadGovernor:
+    """Steers a throttle from live host load.
+
+    Every ``interval`` seconds the ``sample`` callable is asked for the
+    host's CPU, memory and disk-busy percentages. Above a slow-down
+    threshold the byte and file rates are cut to ``decrease`` times what
+    jobs currently achieve; above a pause threshold all jobs are held.
+    When every metric is below ``idle_ratio`` of its slow-down threshold
+    the rates grow by ``increase`` per tick, and the limit is lifted once
+    jobs no longer reach it.
+    """
+
+    def __init__(self, throttle: Throttle, sample: Callable[[], dict],
+                 thresholds: Dict[str, Tuple[float, float]] = None,
+                 interval: float = 5.0, idle_ratio: float = 0.6,
+                 decrease: float = 0.5, increase: float = 1.25,
+                 min_bytes_per_sec: float = 1024 * 1024,
+                 min_files_per_sec: float = 10.0):
+        self.throttle = throttle
+        self.sample = sample
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.interval = interval
+        self.idle_ratio = idle_ratio
+        self.decrease = decrease
+        self.increase = increase
+        self.minimums = {'bytes': min_bytes_per_sec, 'files': min_files_per_sec}
+        self.state = "full"
+        self.metrics = {}
+
+        self._last_tick = None
+        self._last_consumed = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def step(self) -> str:
+        """Take one sample and adjust the throttle; returns the new state."""
+        now = time.monotonic()
+        elapsed = now - self._last_tick if self._last_tick else None
+        self._last_tick = now
+        rates = {
+            name: self._measured_rate(name, bucket, elapsed)
+            for name, bucket in self._buckets()
+        }
+
+        try:
+            self.metrics = self.sample() or {}
+        except Exception as e:
+            logger.error(f"Load sample failed: {str(e)}")
+            return self.state
+
+        pressure = 0.0
+        overloaded = []
+        for metric, (slow_at, pause_at) in self.thresholds.items():
+            value = self.metrics.get(metric)
+            if value is None:
+                continue
+            pressure = max(pressure, value / slow_at)
+            if value >= pause_at:
+                overloaded.append(f"{metric}={value}")
+
+        if overloaded:
+            if not self.throttle.paused:
+                logger.warning(f"Pausing backups: {', '.join(overloaded)}")
+            self.throttle.pause()
+            self.state = "paused"
+            return self.state
+
+        if self.throttle.paused:
+            logger.info("Resuming backups")
+        self.throttle.resume()
+
+        if pressure >= 1.0:
+            for name, bucket in self._buckets():
+                self._slow_down(name, bucket, rates[name])
+        elif pressure <= self.idle_ratio:
+            for name, bucket in self._buckets():
+                self._speed_up(bucket, rates[name])
+
+        limited = any(bucket.rate is not None for _, bucket in self._buckets())
+        self.state = "slowed" if limited else "full"
+        return self.state
+
+    def _buckets(self):
+        return (('bytes', self.throttle.bytes), ('files', self.throttle.files))
+
+    def _measured_rate(self, name: str, bucket: TokenBucket,
+                       elapsed: Optional[float]) -> Optional[float]:
+        consumed = bucket.consumed
+        previous = self._last_consumed.get(name)
+        self._last_consumed[name] = consumed
+        if previous is None or not elapsed:
+            return None
+        return (consumed - previous) / elapsed
+
+    def _slow_down(self, name: str, bucket: TokenBucket,
+                   rate: Optional[float]):
+        current = bucket.rate if bucket.rate is not None else rate
+        if not current:
+            return  # nothing is running, so there is nothing to slow
+        bucket.set_rate(max(self.minimums[name], current * self.decrease))
+
+    def _speed_up(self, bucket: TokenBucket, rate: Optional[float]):
+        if bucket.rate is None:
+            return
+        raised = bucket.rate * self.increase
+        # Jobs no longer use the limit, so stop imposing it
+        if rate is not None and rate < bucket.rate * self.decrease:
+            bucket.set_rate(None)
+        else:
+            bucket.set_rate(raised)
+
+    def start(self) -> bool:
+        """Adjust the throttle from a background thread."""
+        if self._thread and self._thread.is_alive():
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="easy-secure-load", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop adjusting and lift any limits the governor imposed."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.throttle.set_limits(None, None)
+        self.throttle.resume()
+        self.state = "full"
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.step()
+            self._stop.wait(self.interval)
@@ -0,0 +1,74 @@
+"""
+EASY_SECURE™ Snapshot Manifests
+Version: 1.0
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+
+def scan_tree(source_path: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Yield (relative path, absolute path, stat) for every file in a tree."""
+    for root, dirs, files in os.walk(source_path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            rel_path = os.path.relpath(file_path, source_path)
+            yield rel_path.replace(os.sep, '/'), file_path, os.stat(file_path)
+
+
+def scan_dirs(source_path: str) -> list:
+    """List every directory of a tree relative to its root."""
+    dirs = []
+    for root, subdirs, _ in os.walk(source_path):
+        subdirs.sort()
+        for name in subdirs:
+            rel_path = os.path.relpath(os.path.join(root, name), source_path)
+            dirs.append(rel_path.replace(os.sep, '/'))
+    return dirs
+
+
+def file_entry(stat: os.stat_result, sha256: str, **extra) -> dict:
+    """Build the manifest entry for one file."""
+    entry = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'inode': stat.st_ino,
+        'sha256': sha256
+    }
+    entry.update(extra)
+    return entry
+
+
+def new_manifest(mode: str, timestamp: str, source_path: str) -> dict:
+    """Create an empty snapshot manifest."""
+    return {
+        'version': MANIFEST_VERSION,
+        'mode': mode,
+        'timestamp': timestamp,
+        'source': os.path.abspath(source_path),
+        'created': datetime.now().isoformat(),
+        'dirs': [],
+        'files': {},
+        'totals': {}
+    }
+
+
+def save_manifest(manifest_file: str, manifest: dict):
+    """Write a manifest atomically in compact form."""
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    os.replace(tmp_file, manifest_file)
+
+
+def load_manifest(manifest_file: str) -> Optional[dict]:
+    """Load a manifest, returning None if the snapshot has none."""
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, 'r') as f:
+        return json.load(f)
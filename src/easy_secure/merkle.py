@@ -0,0 +1,184 @@
+"""
+EASY_SECURE™ Merkle Verification Trees
+Version: 1.0
+"""
+
+import os
+import json
+import zlib
+import hashlib
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+# A file node is its SHA-256 hex digest; a directory node is
+# [digest, {name: child node}]. The same shape is used on disk.
+Node = Union[str, list]
+
+TREE_FORMAT = "easy_secure.merkle/1"
+
+
+def node_hash(node: Node) -> str:
+    """Return the digest of a file or directory node."""
+    return node if isinstance(node, str) else node[0]
+
+
+def _dir_hash(children: Dict[str, Node]) -> str:
+    """Hash a directory from its sorted children."""
+    digest = hashlib.sha256()
+    for name in sorted(children):
+        child = children[name]
+        digest.update(b'f' if isinstance(child, str) else b'd')
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(bytes.fromhex(node_hash(child)))
+    return digest.hexdigest()
+
+
+def _seal(children: Dict[str, Node]) -> list:
+    """Compute digests bottom-up for a tree of plain dicts."""
+    sealed = {}
+    for name, child in children.items():
+        sealed[name] = child if isinstance(child, str) else _seal(child)
+    return [_dir_hash(sealed), sealed]
+
+
+class MerkleTree:
+    """Verification tree that mirrors the snapshot's directory layout.
+
+    Every directory carries a digest over its children, so a subtree can be
+    checked on its own and two snapshots can be compared without visiting
+    subtrees whose digests match.
+    """
+
+    def __init__(self, root: list):
+        self.root = root
+
+    @classmethod
+    def from_hashes(cls, file_hashes: Dict[str, str]) -> 'MerkleTree':
+        """Build a tree from relative path -> SHA-256."""
+        tree = {}
+        for rel_path, file_hash in file_hashes.items():
+            parts = rel_path.split('/')
+            node = tree
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = file_hash
+        return cls(_seal(tree))
+
+    @property
+    def root_hash(self) -> str:
+        return self.root[0]
+
+    def node(self, rel_path: str = '') -> Optional[Node]:
+        """Return the node at a relative path, or None."""
+        node = self.root
+        for part in self._split(rel_path):
+            if isinstance(node, str) or part not in node[1]:
+                return None
+            node = node[1][part]
+        return node
+
+    def iter_files(self, rel_path: str = '') -> Iterator[Tuple[str, str]]:
+        """Yield (relative path, digest) for every file under a path."""
+        node = self.node(rel_path)
+        if node is None:
+            return
+        prefix = '/'.join(self._split(rel_path))
+        stack = [(prefix, node)]
+        while stack:
+            path, current = stack.pop()
+            if isinstance(current, str):
+                yield path, current
+                continue
+            for name in sorted(current[1], reverse=True):
+                child_path = f"{path}/{name}" if path else name
+                stack.append((child_path, current[1][name]))
+
+    def check_subtree(self, rel_path: str = '') -> bool:
+        """Recompute digests under a path and along its chain to the root."""
+        parts = self._split(rel_path)
+        chain = [self.root]
+        for part in parts:
+            parent = chain[-1]
+            if isinstance(parent, str) or part not in parent[1]:
+                return False
+            chain.append(parent[1][part])
+
+        if not self._check_node(chain[-1]):
+            return False
+        # Ancestors only need their own digest over the stored child digests
+        return all(_dir_hash(node[1]) == node[0] for node in chain[:-1])
+
+    def _check_node(self, node: Node) -> bool:
+        if isinstance(node, str):
+            return True
+        return (
+            all(self._check_node(child) for child in node[1].values())
+            and _dir_hash(node[1]) == node[0]
+        )
+
+    def diff(self, other: 'MerkleTree') -> dict:
+        """Compare with a newer tree, skipping subtrees with equal digests."""
+        changes = {'added': [], 'removed': [], 'changed': []}
+        self._diff(self.root, other.root, '', changes)
+        for paths in changes.values():
+            paths.sort()
+        return changes
+
+    def _diff(self, old: Node, new: Node, path: str, changes: dict):
+        if node_hash(old) == node_hash(new):
+            return
+
+        old_is_file = isinstance(old, str)
+        new_is_file = isinstance(new, str)
+        if old_is_file and new_is_file:
+            changes['changed'].append(path)
+            return
+        if old_is_file or new_is_file:
+            self._collect(old, path, changes['removed'])
+            self._collect(new, path, changes['added'])
+            return
+
+        for name in old[1].keys() | new[1].keys():
+            child_path = f"{path}/{name}" if path else name
+            if name not in new[1]:
+                self._collect(old[1][name], child_path, changes['removed'])
+            elif name not in old[1]:
+                self._collect(new[1][name], child_path, changes['added'])
+            else:
+                self._diff(old[1][name], new[1][name], child_path, changes)
+
+    @staticmethod
+    def _collect(node: Node, path: str, paths: list):
+        if isinstance(node, str):
+            paths.append(path)
+            return
+        for name, child in node[1].items():
+            MerkleTree._collect(child, f"{path}/{name}" if path else name, paths)
+
+    def save(self, tree_file: str):
+        """Write the tree as zlib-compressed compact JSON."""
+        payload = json.dumps(
+            {'format': TREE_FORMAT, 'root': self.root},
+            separators=(',', ':'),
+            ensure_ascii=False
+        ).encode('utf-8')
+        tmp_file = f"{tree_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(zlib.compress(payload, 6))
+        os.replace(tmp_file, tree_file)
+
+    @classmethod
+    def load(cls, tree_file: str) -> Optional['MerkleTree']:
+        """Load a tree, returning None if the file does not exist."""
+        if not os.path.exists(tree_file):
+            return None
+        with open(tree_file, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        if data.get('format') != TREE_FORMAT:
+            raise ValueError(f"Unsupported verification tree: {tree_file}")
+        return cls(data['root'])
+
+    @staticmethod
+    def _split(rel_path: str) -> list:
+        return [part for part in rel_path.replace(os.sep, '/').split('/')
+                if part and part != '.']
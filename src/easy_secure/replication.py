@@ -0,0 +1,433 @@
+"""
+EASY_SECURE™ Offsite Replication
+Version: 1.0
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Iterator, List
+
+from .manifest import load_manifest
+from .parallel_engine import ParallelBackupEngine
+from .throttle import Throttle
+
+logger = logging.getLogger('EASY_SECURE.replication')
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# S3 and R2 limits: parts per upload, and the largest single-request copy
+MAX_PARTS = 10000
+MAX_COPY_SIZE = 5 * 1024 ** 3
+
+
+def _object_key(prefix: str, path: str) -> str:
+    """Bucket key for a local backup path."""
+    key = os.path.normpath(path).replace(os.sep, '/')
+    return f"{prefix.rstrip('/')}/{key}" if prefix else key
+
+
+class Replicator:
+    """Copies a client's committed snapshots to an S3-compatible bucket.
+
+    Keys mirror the local layout (``backups/``, ``chunks/`` and
+    ``verification/``), so a bucket can be synced back and used as is.
+    Objects the bucket already holds are skipped; larger files go up as
+    multipart uploads whose parts run in parallel across ``workers``
+    threads. Open uploads are recorded in ``replication_state.json`` and
+    picked up where they stopped on the next run. A snapshot's manifest is
+    uploaded last, so a remote manifest means the snapshot is complete.
+
+    ``s3_client`` is anything with the boto3 S3 client interface, such as
+    ``R2ResourceManager().s3_client``.
+    """
+
+    def __init__(self, config, s3_client, bucket: str, prefix: str = "",
+                 part_size: int = DEFAULT_PART_SIZE, workers: int = 4,
+                 bytes_per_sec: float = None):
+        if part_size <= 0:
+            raise ValueError(f"Invalid part size: {part_size}")
+        self.config = config
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        # Network bandwidth, separate from the client's disk throttle
+        self.throttle = Throttle(bytes_per_sec)
+        self.engine = ParallelBackupEngine(workers=workers)
+        self.state_file = os.path.join(
+            config.verify_path, "replication_state.json"
+        )
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        state = {'replicated': [], 'uploads': {}}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                state.update(json.load(f))
+        return state
+
+    def _save_state(self):
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def pending_snapshots(self) -> List[str]:
+        """Committed snapshots not yet replicated, oldest first."""
+        done = set(self.state['replicated'])
+        return [
+            backup_timestamp
+            for backup_timestamp in sorted(self.config.list_backups())
+            if backup_timestamp not in done
+        ]
+
+    def replicate(self, backup_timestamp: str = None) -> dict:
+        """Push one snapshot, or every snapshot not yet in the bucket."""
+        with self._lock:
+            try:
+                started = time.perf_counter()
+                snapshots = (
+                    [backup_timestamp] if backup_timestamp
+                    else self.pending_snapshots()
+                )
+                stats = {
+                    'uploaded_objects': 0, 'uploaded_bytes': 0,
+                    'copied_objects': 0, 'skipped_objects': 0, 'failed': []
+                }
+                remote, listed = {}, set()
+                replicated = []
+                for snapshot in snapshots:
+                    if self._replicate_snapshot(snapshot, remote, listed, stats):
+                        replicated.append(snapshot)
+                    else:
+                        break  # later snapshots may refer to this one
+
+                # Forget snapshots retired locally since they were pushed
+                live = set(self.config.list_backups())
+                self.state['replicated'] = sorted(
+                    (set(self.state['replicated']) | set(replicated)) & live
+                )
+                self._save_state()
+
+                seconds = time.perf_counter() - started
+                return {
+                    "status": "error" if stats['failed'] else "success",
+                    "replicated": replicated,
+                    "pending": [s for s in snapshots if s not in replicated],
+                    **stats,
+                    "throughput": {
+                        "seconds": round(seconds, 3),
+                        "mb_per_sec": round(
+                            stats['uploaded_bytes'] / (1024 * 1024)
+                            / max(seconds, 1e-9), 2
+                        )
+                    }
+                }
+
+            except Exception as e:
+                logger.error(
+                    f"Replication of {self.config.client_name} failed: {str(e)}"
+                )
+                return {
+                    "status": "error",
+                    "message": str(e)
+                }
+
+    def _replicate_snapshot(self, backup_timestamp: str, remote: Dict[str, int],
+                            listed: set, stats: dict) -> bool:
+        """Upload one snapshot's objects; True once its manifest is up.
+
+        ``remote`` caches key -> size for the prefixes in ``listed``.
+        """
+        data_files, verification_files, manifest_file, roots, linked_from = (
+            self._snapshot_files(backup_timestamp)
+        )
+        for root in roots:
+            listing_prefix = f"{_object_key(self.prefix, root)}/"
+            if listing_prefix not in listed:
+                listed.add(listing_prefix)
+                remote.update(self._list_objects(listing_prefix))
+
+        failed = len(stats['failed'])
+        self._upload(data_files + verification_files, remote, linked_from, stats)
+        if len(stats['failed']) > failed:
+            return False
+
+        self._upload([manifest_file], remote, {}, stats)
+        if len(stats['failed']) > failed:
+            return False
+        logger.info(
+            f"Replicated backup {backup_timestamp} of "
+            f"{self.config.client_name} to {self.bucket}"
+        )
+        return True
+
+    def _snapshot_files(self, backup_timestamp: str) -> tuple:
+        """Return the local files making up a snapshot.
+
+        The manifest is returned apart from the data and verification
+        files, along with the directories all of them live under. For
+        linked snapshots, files hardlinked to an already replicated
+        snapshot are mapped to the key they can be copied from remotely.
+        """
+        config = self.config
+        with config.lock:
+            manifest_file = config._manifest_file(backup_timestamp)
+            manifest = load_manifest(manifest_file)
+            if manifest is None:
+                raise ValueError(f"No manifest for backup {backup_timestamp}")
+
+            data_files = []
+            backup_dir = os.path.join(config.backup_root, backup_timestamp)
+            roots = [backup_dir, config.verify_path]
+            for root, dirs, files in os.walk(backup_dir):
+                dirs.sort()
+                data_files.extend(os.path.join(root, name) for name in sorted(files))
+
+            if manifest['mode'] == "chunked":
+                roots.append(config.chunk_root)
+                digests = set()
+                for entry in manifest['files'].values():
+                    digests.update(entry.get('chunks', ()))
+                data_files.extend(
+                    config.chunk_store.chunk_path(digest)
+                    for digest in sorted(digests)
+                )
+
+            verification_files = [
+                os.path.join(config.verify_path, name)
+                for name in sorted(os.listdir(config.verify_path))
+                if f"_{backup_timestamp}." in name
+                and not name.startswith("checkpoint_")
+                and os.path.join(config.verify_path, name) != manifest_file
+            ]
+
+            linked_from = {}
+            if manifest['mode'] == "linked":
+                linked_from = self._linked_sources(backup_timestamp, data_files)
+
+        return data_files, verification_files, manifest_file, roots, linked_from
+
+    def _linked_sources(self, backup_timestamp: str,
+                        data_files: List[str]) -> Dict[str, str]:
+        """Map files shared with the last replicated snapshot to its keys."""
+        earlier = [
+            snapshot for snapshot in self.state['replicated']
+            if snapshot < backup_timestamp
+        ]
+        if not earlier:
+            return {}
+        previous_dir = os.path.join(self.config.backup_root, earlier[-1])
+        backup_dir = os.path.join(self.config.backup_root, backup_timestamp)
+
+        linked_from = {}
+        for path in data_files:
+            previous = os.path.join(previous_dir, os.path.relpath(path, backup_dir))
+            try:
+                if os.path.samefile(path, previous):
+                    linked_from[path] = _object_key(self.prefix, previous)
+            except OSError:
+                continue
+        return linked_from
+
+    def _list_objects(self, prefix: str) -> Dict[str, int]:
+        """Return key -> size for every object under a prefix."""
+        objects = {}
+        kwargs = {'Bucket': self.bucket, 'Prefix': prefix}
+        while True:
+            response = self.s3.list_objects_v2(**kwargs)
+            for obj in response.get('Contents', []):
+                objects[obj['Key']] = obj['Size']
+            if not response.get('IsTruncated'):
+                return objects
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+    def _upload(self, paths: List[str], remote: Dict[str, int],
+                linked_from: Dict[str, str], stats: dict):
+        """Upload files the bucket lacks, part by part, in parallel."""
+        uploads = {}
+        jobs = self._jobs(paths, remote, linked_from, uploads, stats)
+        for kind, key, part_number, result, nbytes, error in self.engine.map(
+            self._run_job, jobs
+        ):
+            stats['uploaded_bytes'] += nbytes
+            if error:
+                logger.error(f"Upload of {key} failed: {error}")
+                stats['failed'].append(key)
+                uploads.pop(key, None)
+                continue
+            if kind != 'part':
+                remote[key] = result
+                if kind == 'copy':
+                    stats['copied_objects'] += 1
+                else:
+                    stats['uploaded_objects'] += 1
+                continue
+
+            upload = uploads.get(key)
+            if upload is None:
+                continue  # an earlier part of this file failed
+            upload['parts'][part_number] = result
+            if len(upload['parts']) == upload['count']:
+                self._complete(key, uploads.pop(key), remote, stats)
+
+    def _jobs(self, paths: List[str], remote: Dict[str, int],
+              linked_from: Dict[str, str], uploads: dict,
+              stats: dict) -> Iterator[tuple]:
+        """Yield upload jobs, opening or resuming multipart uploads."""
+        for path in paths:
+            key = _object_key(self.prefix, path)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                logger.error(f"Cannot replicate {path}: {str(e)}")
+                stats['failed'].append(key)
+                continue
+            if remote.get(key) == stat.st_size:
+                stats['skipped_objects'] += 1
+                continue
+
+            source_key = linked_from.get(path)
+            if source_key and stat.st_size <= MAX_COPY_SIZE:
+                yield ('copy', key, source_key, stat.st_size)
+                continue
+
+            part_size = max(self.part_size, -(-stat.st_size // MAX_PARTS))
+            if stat.st_size <= part_size:
+                yield ('put', key, path, 0, stat.st_size)
+                continue
+
+            try:
+                upload = self._open_upload(key, stat, part_size)
+            except Exception as e:
+                logger.error(f"Cannot start upload of {key}: {str(e)}")
+                stats['failed'].append(key)
+                continue
+            uploads[key] = upload
+            if len(upload['parts']) == upload['count']:
+                self._complete(key, uploads.pop(key), remote, stats)
+                continue
+            for index in range(upload['count']):
+                part_number = index + 1
+                if part_number in upload['parts']:
+                    continue
+                offset = index * part_size
+                yield ('part', key, path, offset,
+                       min(part_size, stat.st_size - offset),
+                       upload['upload_id'], part_number)
+
+    def _open_upload(self, key: str, stat: os.stat_result, part_size: int) -> dict:
+        """Resume the recorded multipart upload of a file, or start one."""
+        recorded = self.state['uploads'].get(key)
+        parts = {}
+        current = (stat.st_size, stat.st_mtime_ns, part_size)
+        if recorded and (
+            recorded['size'], recorded['mtime_ns'], recorded['part_size']
+        ) == current:
+            try:
+                parts = self._uploaded_parts(key, recorded['upload_id'])
+                upload_id = recorded['upload_id']
+                logger.info(f"Resuming upload of {key} with {len(parts)} parts done")
+            except Exception:
+                recorded = None  # expired or aborted remotely
+        elif recorded:
+            # The file changed since; its old parts are useless
+            try:
+                self.s3.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=recorded['upload_id']
+                )
+            except Exception:
+                pass
+            recorded = None
+
+        if not recorded:
+            upload_id = self.s3.create_multipart_upload(
+                Bucket=self.bucket, Key=key
+            )['UploadId']
+            self.state['uploads'][key] = {
+                'upload_id': upload_id,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'part_size': part_size
+            }
+            self._save_state()
+
+        return {
+            'upload_id': upload_id,
+            'parts': parts,
+            'size': stat.st_size,
+            'count': -(-stat.st_size // part_size)
+        }
+
+    def _uploaded_parts(self, key: str, upload_id: str) -> Dict[int, str]:
+        """Return part number -> ETag for the parts already uploaded."""
+        parts = {}
+        kwargs = {'Bucket': self.bucket, 'Key': key, 'UploadId': upload_id}
+        while True:
+            response = self.s3.list_parts(**kwargs)
+            for part in response.get('Parts', []):
+                parts[part['PartNumber']] = part['ETag']
+            if not response.get('IsTruncated'):
+                return parts
+            kwargs['PartNumberMarker'] = response['NextPartNumberMarker']
+
+    def _complete(self, key: str, upload: dict, remote: Dict[str, int],
+                  stats: dict):
+        try:
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload['upload_id'],
+                MultipartUpload={'Parts': [
+                    {'PartNumber': number, 'ETag': etag}
+                    for number, etag in sorted(upload['parts'].items())
+                ]}
+            )
+        except Exception as e:
+            logger.error(f"Completing upload of {key} failed: {str(e)}")
+            stats['failed'].append(key)
+            return
+        del self.state['uploads'][key]
+        self._save_state()
+        remote[key] = upload['size']
+        stats['uploaded_objects'] += 1
+
+    def _run_job(self, job: tuple) -> tuple:
+        """Run one request.
+
+        Returns (kind, key, part, size or ETag, bytes sent, error). Whole
+        objects report their size, parts their ETag.
+        """
+        kind, key = job[0], job[1]
+        try:
+            if kind == 'copy':
+                # Server-side copy; nothing crosses the network
+                self.s3.copy_object(
+                    Bucket=self.bucket, Key=key,
+                    CopySource={'Bucket': self.bucket, 'Key': job[2]}
+                )
+                return kind, key, None, job[3], 0, None
+
+            _, _, path, offset, length = job[:5]
+            self.throttle.consume(nbytes=length)
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+            if len(data) != length:
+                raise IOError(f"{path} changed during replication")
+
+            if kind == 'put':
+                self.s3.put_object(Bucket=self.bucket, Key=key, Body=data)
+                return kind, key, None, length, length, None
+
+            upload_id, part_number = job[5:]
+            response = self.s3.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                PartNumber=part_number, Body=data
+            )
+            return kind, key, part_number, response['ETag'], length, None
+
+        except Exception as e:
+            return kind, key, None, None, 0, str(e)
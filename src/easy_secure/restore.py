@@ -0,0 +1,162 @@
+"""
+EASY_SECURE™ Snapshot Restore
+Version: 1.0
+"""
+
+import os
+import time
+import fnmatch
+import hashlib
+import logging
+from collections import namedtuple
+from typing import Callable, Iterable, List, Optional
+
+from .archive import ArchiveReader
+from .copy_pipeline import copy_and_hash
+from .parallel_engine import ParallelBackupEngine
+
+logger = logging.getLogger('EASY_SECURE.restore')
+
+# kind is "file", "chunked" or "archive"; source is the data path, the
+# chunk store or the archive directory respectively
+RestoreTask = namedtuple('RestoreTask', [
+    'rel_path', 'kind', 'source', 'entry', 'dest_path', 'verify', 'throttle',
+    'cipher'
+])
+
+
+def matches(rel_path: str, patterns: Optional[List[str]]) -> bool:
+    """Check a relative path against restore globs.
+
+    A pattern matches a file directly or any file below a matching
+    directory, so "docs" and "docs/*" both select the whole docs tree.
+    """
+    if not patterns:
+        return True
+    for pattern in patterns:
+        pattern = pattern.strip('/')
+        if fnmatch.fnmatchcase(rel_path, pattern):
+            return True
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            if fnmatch.fnmatchcase('/'.join(parts[:depth]), pattern):
+                return True
+    return False
+
+
+def _restore_file_task(task: RestoreTask) -> tuple:
+    """Restore one file; runs on a worker thread or process.
+
+    Returns (relative path, bytes restored, failure reason or None).
+    """
+    tmp_path = f"{task.dest_path}.restore-tmp"
+    os.makedirs(os.path.dirname(task.dest_path) or '.', exist_ok=True)
+
+    if task.throttle:
+        task.throttle.consume(files=1)
+    try:
+        if task.kind == "file":
+            copied = copy_and_hash(
+                task.source, tmp_path, strategy="stream", throttle=task.throttle
+            )
+            digest, size = copied['sha256'], copied['size']
+        else:
+            file_hash = hashlib.sha256()
+            size = 0
+            with open(tmp_path, 'wb') as out:
+                for block in _read_blocks(task):
+                    if task.throttle:
+                        task.throttle.consume(nbytes=len(block))
+                    file_hash.update(block)
+                    out.write(block)
+                    size += len(block)
+            digest = file_hash.hexdigest()
+    except FileNotFoundError:
+        _discard(tmp_path)
+        return task.rel_path, 0, 'missing'
+    except Exception as e:
+        _discard(tmp_path)
+        logger.error(f"Failed to restore {task.rel_path}: {str(e)}")
+        return task.rel_path, 0, 'corrupt'
+
+    if task.verify and digest != task.entry['sha256']:
+        _discard(tmp_path)
+        return task.rel_path, size, 'hash'
+
+    mtime_ns = task.entry.get('mtime_ns')
+    if mtime_ns is not None:
+        os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+    os.replace(tmp_path, task.dest_path)
+    return task.rel_path, size, None
+
+
+def _read_blocks(task: RestoreTask) -> Iterable[bytes]:
+    if task.kind == "chunked":
+        yield from task.source.read_file(task.entry['chunks'])
+    else:
+        with ArchiveReader(task.source, task.cipher) as reader:
+            yield from reader.read_blocks(task.entry)
+
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class RestoreEngine:
+    """Restores snapshot files in parallel and reports progress.
+
+    Files are restored through a temporary name and verified against the
+    manifest hash before being moved into place.
+    """
+
+    def __init__(self, engine: ParallelBackupEngine,
+                 progress: Callable[[dict], None] = None,
+                 progress_interval: float = 1.0):
+        self.engine = engine
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    def restore(self, tasks: List[RestoreTask]) -> dict:
+        """Run restore tasks in the given order."""
+        started = time.perf_counter()
+        state = {
+            'files_total': len(tasks),
+            'bytes_total': sum(task.entry.get('size', 0) for task in tasks),
+            'files_done': 0,
+            'bytes_done': 0
+        }
+        failed = []
+        last_report = started
+
+        for rel_path, size, reason in self.engine.map(
+            _restore_file_task, tasks,
+            cost=lambda task: (1, task.entry.get('size', 0))
+        ):
+            state['files_done'] += 1
+            state['bytes_done'] += size
+            if reason:
+                failed.append({'path': rel_path, 'reason': reason})
+
+            now = time.perf_counter()
+            if self.progress and (
+                now - last_report >= self.progress_interval
+                or state['files_done'] == state['files_total']
+            ):
+                self.progress(self._stats(state, now - started))
+                last_report = now
+
+        stats = self._stats(state, time.perf_counter() - started)
+        stats['failed_files'] = failed
+        return stats
+
+    @staticmethod
+    def _stats(state: dict, seconds: float) -> dict:
+        return {
+            **state,
+            'seconds': round(seconds, 3),
+            'mb_per_s': round(state['bytes_done'] / 1e6 / seconds, 2)
+            if seconds else None,
+            'files_per_s': round(state['files_done'] / seconds, 1)
+            if seconds else None
+        }
@@ -0,0 +1,208 @@
+"""
+EASY_SECURE™ Retention and Garbage Collection
+Version: 1.0
+"""
+
+import os
+import time
+import logging
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('EASY_SECURE.retention')
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Work done per garbage collection step before yielding
+DEFAULT_BATCH_SIZE = 500
+
+
+def snapshot_time(backup_timestamp: str) -> Optional[datetime]:
+    """Parse a backup timestamp, ignoring any collision suffix."""
+    try:
+        return datetime.strptime(backup_timestamp[:15], TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+class RetentionPolicy:
+    """Grandfather-father-son retention schedule.
+
+    Keeps the newest snapshot of each of the last ``daily`` days, ``weekly``
+    ISO weeks and ``monthly`` months that have snapshots, plus the
+    ``keep_last`` newest snapshots. Snapshots with unrecognised names are
+    never expired.
+    """
+
+    def __init__(self, daily: int = 7, weekly: int = 4, monthly: int = 12,
+                 keep_last: int = 1):
+        for name, value in (('daily', daily), ('weekly', weekly),
+                            ('monthly', monthly)):
+            if value < 0:
+                raise ValueError(f"Invalid {name} retention: {value}")
+        if keep_last < 1:
+            raise ValueError(f"Invalid keep_last retention: {keep_last}")
+
+        self.daily = daily
+        self.weekly = weekly
+        self.monthly = monthly
+        self.keep_last = keep_last
+
+    def select(self, timestamps: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split snapshots into (kept newest first, expired oldest first)."""
+        ordered = sorted(timestamps, reverse=True)
+        dated = [(ts, snapshot_time(ts)) for ts in ordered]
+        keep = set(ordered[:self.keep_last])
+        keep.update(ts for ts, when in dated if when is None)
+
+        periods = (
+            (self.daily, lambda when: when.date()),
+            (self.weekly, lambda when: when.isocalendar()[:2]),
+            (self.monthly, lambda when: (when.year, when.month))
+        )
+        for count, period in periods:
+            seen = set()
+            for ts, when in dated:
+                if when is None:
+                    continue
+                key = period(when)
+                if key in seen:
+                    continue
+                if len(seen) >= count:
+                    break
+                seen.add(key)
+                keep.add(ts)
+
+        kept = [ts for ts in ordered if ts in keep]
+        expired = [ts for ts in reversed(ordered) if ts not in keep]
+        return kept, expired
+
+    def to_dict(self) -> dict:
+        return {
+            'daily': self.daily,
+            'weekly': self.weekly,
+            'monthly': self.monthly,
+            'keep_last': self.keep_last
+        }
+
+
+class GarbageCollector:
+    """Enforces a client's retention policy a small step at a time.
+
+    Expired snapshots are first retired under the client's lock: data that
+    newer snapshots still reference is moved into the oldest of them, and
+    the snapshot is dropped from manifests and the catalog and moved to the
+    client's trash. The trash and any unreferenced chunks are then deleted
+    in batches, so no step blocks backups of the client for long.
+    """
+
+    def __init__(self, config, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.config = config
+        self.batch_size = batch_size
+        self.stats = {
+            'expired': [],
+            'reclaimed_bytes': 0,
+            'deleted_files': 0,
+            'deleted_chunks': 0
+        }
+
+    def run(self, pause: float = 0.0) -> dict:
+        """Run a full collection, sleeping ``pause`` seconds between steps."""
+        for _ in self.steps():
+            if pause:
+                time.sleep(pause)
+        return self.stats
+
+    def steps(self) -> Iterator[int]:
+        """Collect garbage, yielding the bytes reclaimed by each step."""
+        config = self.config
+        if config.retention is None:
+            return
+
+        with config.lock:
+            _, expired = config.retention.select(config.list_backups())
+
+        sweep_chunks = False
+        for backup_timestamp in expired:
+            with config.lock:
+                # A backup may have finished since the plan was made
+                if backup_timestamp not in config.list_backups():
+                    continue
+                retired = config.retire_backup(backup_timestamp)
+            if retired['status'] != "success":
+                continue
+            self.stats['expired'].append(backup_timestamp)
+            sweep_chunks = sweep_chunks or retired['mode'] == "chunked"
+            yield 0
+
+        yield from self._purge_trash()
+        if sweep_chunks and os.path.isdir(config.chunk_root):
+            yield from self._sweep_chunks()
+
+        if self.stats['expired'] or self.stats['reclaimed_bytes']:
+            config.record_reclaimed(
+                self.stats['reclaimed_bytes'], len(self.stats['expired'])
+            )
+            logger.info(
+                f"Garbage collection for {config.client_name}: "
+                f"{len(self.stats['expired'])} snapshots expired, "
+                f"{self.stats['reclaimed_bytes']} bytes reclaimed"
+            )
+
+    def _purge_trash(self) -> Iterator[int]:
+        """Delete retired snapshot trees in batches."""
+        reclaimed = 0
+        count = 0
+        for root, dirs, files in os.walk(self.config.trash_root, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.lstat(path)
+                os.remove(path)
+                # Files still hard-linked from a live snapshot free nothing
+                if stat.st_nlink == 1:
+                    reclaimed += stat.st_size
+                self.stats['deleted_files'] += 1
+                count += 1
+                if count >= self.batch_size:
+                    yield self._reclaim(reclaimed)
+                    reclaimed = count = 0
+            if root != self.config.trash_root:
+                os.rmdir(root)
+        yield self._reclaim(reclaimed)
+
+    def _sweep_chunks(self) -> Iterator[int]:
+        """Delete chunks no remaining snapshot references, in batches."""
+        config = self.config
+        store = config.chunk_store
+        chunks = store.iter_chunks()
+        marked = None
+        live = set()
+
+        while True:
+            reclaimed = 0
+            with config.lock:
+                # Rebuild the live set if a backup ran in between, whether
+                # it finished or left a checkpoint behind
+                state = (config.list_backups(), [
+                    (journal_file, os.path.getsize(journal_file))
+                    for journal_file in config.checkpoint_files()
+                ])
+                if state != marked:
+                    live = config.referenced_chunks()
+                    marked = state
+
+                batch = 0
+                for digest in chunks:
+                    if digest not in live:
+                        reclaimed += store.remove_chunk(digest)
+                        self.stats['deleted_chunks'] += 1
+                    batch += 1
+                    if batch >= self.batch_size:
+                        break
+            yield self._reclaim(reclaimed)
+            if batch < self.batch_size:
+                return
+
+    def _reclaim(self, reclaimed: int) -> int:
+        self.stats['reclaimed_bytes'] += reclaimed
+        return reclaimed
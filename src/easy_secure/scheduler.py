@@ -0,0 +1,252 @@
+"""
+EASY_SECURE™ Backup Job Scheduler
+Version: 1.0
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('EASY_SECURE.scheduler')
+
+SCHEDULE_TYPES = ("daily", "weekly")
+
+# Runs assumed for a client that has never been backed up
+DEFAULT_ESTIMATE = 600.0
+
+# Successful runs the duration estimate is taken from
+HISTORY_SIZE = 5
+
+
+class ScheduledJob:
+    """A recurring backup of one client."""
+
+    def __init__(self, client_name: str, source_path: str,
+                 schedule_type: str = "daily", priority: int = 0):
+        if schedule_type not in SCHEDULE_TYPES:
+            raise ValueError(f"Invalid schedule type: {schedule_type}")
+        self.client_name = client_name
+        self.source_path = source_path
+        self.schedule_type = schedule_type
+        self.priority = priority
+
+    def runs_in(self, window_start: datetime) -> bool:
+        """Check whether the job belongs to the window opening then."""
+        return self.schedule_type == "daily" or window_start.weekday() == 0
+
+
+class BackupScheduler:
+    """Spreads backup jobs across a nightly window on a bounded pool.
+
+    Each window is planned up front: jobs are ordered by priority (higher
+    first) and then by estimated duration, packed onto ``max_concurrent``
+    slots, and the slack left in the window is used to stagger their start
+    times. Estimates are the median of the client's recent successful runs.
+    Jobs that are due wait for a free slot in priority order. After
+    ``shutdown`` no job starts until ``run`` is called again.
+    """
+
+    def __init__(self, run_job: Callable[[str, str], dict],
+                 max_concurrent: int = 4, window_start: str = "02:00",
+                 window_hours: float = 4.0, catalog=None,
+                 default_estimate: float = DEFAULT_ESTIMATE):
+        if max_concurrent < 1:
+            raise ValueError(f"Invalid job concurrency: {max_concurrent}")
+        if window_hours <= 0:
+            raise ValueError(f"Invalid window length: {window_hours}")
+
+        self.run_job = run_job
+        self.max_concurrent = max_concurrent
+        self.window_start = datetime.strptime(window_start, "%H:%M").time()
+        self.window = timedelta(hours=window_hours)
+        self.catalog = catalog
+        self.default_estimate = default_estimate
+        self.jobs: Dict[str, ScheduledJob] = {}
+
+        self._lock = threading.Lock()
+        self._history = defaultdict(lambda: deque(maxlen=HISTORY_SIZE))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._running: Dict[str, Future] = {}
+        self._plan: List[Tuple[datetime, ScheduledJob]] = []
+        self._due = []
+        self._sequence = 0
+        self._planned_window: Optional[datetime] = None
+
+    def add_job(self, client_name: str, source_path: str,
+                schedule_type: str = "daily", priority: int = 0):
+        """Schedule a client, replacing any earlier job for it."""
+        job = ScheduledJob(client_name, source_path, schedule_type, priority)
+        with self._lock:
+            self.jobs[client_name] = job
+
+    def remove_job(self, client_name: str) -> bool:
+        """Stop scheduling a client."""
+        with self._lock:
+            return self.jobs.pop(client_name, None) is not None
+
+    def estimate(self, client_name: str) -> float:
+        """Estimate a client's backup duration in seconds from history."""
+        if self.catalog:
+            durations = self.catalog.job_durations(client_name, HISTORY_SIZE)
+        else:
+            durations = list(self._history[client_name])
+        return median(durations) if durations else self.default_estimate
+
+    def next_window(self, now: datetime) -> datetime:
+        """Return the start of the window that is open now or opens next."""
+        start = datetime.combine(now.date(), self.window_start)
+        # A window crossing midnight may still be open from yesterday
+        if start - timedelta(days=1) + self.window > now:
+            return start - timedelta(days=1)
+        if start + self.window <= now:
+            start += timedelta(days=1)
+        return start
+
+    def plan(self, window_start: datetime) -> List[Tuple[datetime, ScheduledJob]]:
+        """Work out start times for the jobs of one window."""
+        with self._lock:
+            jobs = [
+                job for job in self.jobs.values() if job.runs_in(window_start)
+            ]
+        estimates = {job.client_name: self.estimate(job.client_name)
+                     for job in jobs}
+        jobs.sort(key=lambda job: (-job.priority, -estimates[job.client_name],
+                                   job.client_name))
+
+        # List scheduling: each job takes the slot that frees up first
+        slots = [0.0] * self.max_concurrent
+        offsets = []
+        for job in jobs:
+            free_at = heapq.heappop(slots)
+            offsets.append(free_at)
+            heapq.heappush(slots, free_at + estimates[job.client_name])
+        makespan = max(slots) if jobs else 0.0
+
+        window_seconds = self.window.total_seconds()
+        if makespan > window_seconds:
+            logger.warning(
+                f"Estimated {makespan:.0f}s of backups exceed the "
+                f"{window_seconds:.0f}s window starting {window_start}"
+            )
+        # Stagger starts using the slack; a later job in a slot is never
+        # delayed less than the one before it, so slots cannot overlap
+        gap = max(0.0, window_seconds - makespan) / max(1, len(jobs))
+
+        return [
+            (window_start + timedelta(seconds=offset + index * gap), job)
+            for index, (offset, job) in enumerate(zip(offsets, jobs))
+        ]
+
+    def run_pending(self, now: datetime = None) -> int:
+        """Start the jobs that are due and fit in free slots."""
+        now = now or datetime.now()
+        window_start = self.next_window(now)
+        if window_start != self._planned_window:
+            # Jobs the last window could not start are overdue, not dropped
+            self._queue_due(self._plan)
+            self._plan = self.plan(window_start)
+            self._planned_window = window_start
+            logger.info(
+                f"Planned {len(self._plan)} backups for window {window_start}"
+            )
+
+        due = 0
+        while due < len(self._plan) and self._plan[due][0] <= now:
+            due += 1
+        self._queue_due(self._plan[:due])
+        del self._plan[:due]
+
+        started = 0
+        with self._lock:
+            if self._closed:
+                return 0
+            while self._due and len(self._running) < self.max_concurrent:
+                _, _, _, job = heapq.heappop(self._due)
+                if (job.client_name in self._running
+                        or self.jobs.get(job.client_name) is not job):
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrent,
+                        thread_name_prefix="easy-secure-job"
+                    )
+                self._running[job.client_name] = self._executor.submit(
+                    self._run, job
+                )
+                started += 1
+        return started
+
+    def _queue_due(self, planned_jobs: List[Tuple[datetime, ScheduledJob]]):
+        for planned, job in planned_jobs:
+            heapq.heappush(self._due, (-job.priority, planned, self._sequence, job))
+            self._sequence += 1
+
+    def seconds_until_next(self, now: datetime = None) -> float:
+        """Seconds until the next planned start, or until the next window."""
+        now = now or datetime.now()
+        if self._due:
+            return 1.0
+        if self._plan:
+            return max(0.0, (self._plan[0][0] - now).total_seconds())
+        if self._planned_window is None:
+            return 0.0
+        next_start = self._planned_window + self.window
+        return max(1.0, (next_start - now).total_seconds())
+
+    def run(self, stop_event: threading.Event = None, max_sleep: float = 60.0):
+        """Run jobs until ``stop_event`` is set."""
+        stop_event = stop_event or threading.Event()
+        with self._lock:
+            self._closed = False
+        while not stop_event.is_set():
+            self.run_pending()
+            stop_event.wait(min(max_sleep, self.seconds_until_next()))
+
+    def shutdown(self, wait: bool = True):
+        """Drop pending jobs and stop the worker pool.
+
+        Planned and queued jobs are discarded; jobs already running finish,
+        and ``wait`` blocks until they have.
+        """
+        with self._lock:
+            self._closed = True
+            self._plan = []
+            self._due = []
+            self._planned_window = None
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            for client_name, future in list(self._running.items()):
+                if future.cancelled():
+                    del self._running[client_name]
+
+    def _run(self, job: ScheduledJob):
+        started = time.perf_counter()
+        started_at = datetime.now().isoformat()
+        status = "error"
+        try:
+            result = self.run_job(job.client_name, job.source_path)
+            status = result.get("status", "error")
+        except Exception as e:
+            logger.error(f"Scheduled backup of {job.client_name} failed: {str(e)}")
+        finally:
+            seconds = time.perf_counter() - started
+            if self.catalog:
+                self.catalog.record_job(job.client_name, started_at, seconds, status)
+            elif status == "success":
+                self._history[job.client_name].append(seconds)
+            with self._lock:
+                self._running.pop(job.client_name, None)
+            logger.info(
+                f"Scheduled backup of {job.client_name} finished in "
+                f"{seconds:.1f}s: {status}"
+            )
@@ -0,0 +1,107 @@
+"""
+EASY_SECURE™ I/O Throttling
+Version: 1.0
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    A rate of None means unlimited. Requests larger than the bucket are
+    allowed to go into debt, so callers wait for the time their request
+    costs at the configured rate instead of being refused.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: float = None):
+        self._lock = threading.Lock()
+        # Total tokens ever taken, limited or not, for measuring rates
+        self.consumed = 0
+        self.rate = None
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate: Optional[float], burst: float = None):
+        """Change the rate; takes effect for the next request."""
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}")
+        with self._lock:
+            was_limited = self.rate is not None
+            self.rate = rate
+            # One second's worth of tokens unless told otherwise
+            self.burst = burst if burst is not None else rate
+            # Changing an existing limit must not hand out a fresh burst
+            if was_limited and self.burst is not None:
+                self._tokens = min(self._tokens, self.burst)
+            else:
+                self._tokens = self.burst or 0.0
+            self._updated = time.monotonic()
+
+    def consume(self, amount: float):
+        """Take tokens, sleeping until the bucket has paid for them."""
+        if not amount:
+            return
+        with self._lock:
+            self.consumed += amount
+            if self.rate is None:
+                return
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class Throttle:
+    """Bytes/sec and files/sec limits, optionally under a global throttle.
+
+    Copy, hash, verify and restore paths call ``consume`` as they move data,
+    so the limits hold for every kind of job. Limits can be changed, and
+    the throttle paused, while jobs are running.
+    """
+
+    def __init__(self, bytes_per_sec: Optional[float] = None,
+                 files_per_sec: Optional[float] = None,
+                 parent: 'Throttle' = None):
+        self.bytes = TokenBucket(bytes_per_sec)
+        self.files = TokenBucket(files_per_sec)
+        self.parent = parent
+        self._running = threading.Event()
+        self._running.set()
+
+    def set_limits(self, bytes_per_sec: Optional[float] = None,
+                   files_per_sec: Optional[float] = None):
+        """Replace both limits; None lifts a limit."""
+        self.bytes.set_rate(bytes_per_sec)
+        self.files.set_rate(files_per_sec)
+
+    def limits(self) -> dict:
+        return {
+            'bytes_per_sec': self.bytes.rate,
+            'files_per_sec': self.files.rate
+        }
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self):
+        """Hold every job at its next block until resumed."""
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def consume(self, files: int = 0, nbytes: int = 0):
+        """Account for files opened and bytes read or written."""
+        self._running.wait()
+        self.files.consume(files)
+        self.bytes.consume(nbytes)
+        if self.parent is not None:
+            self.parent.consume(files, nbytes)
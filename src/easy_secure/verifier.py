@@ -0,0 +1,235 @@
+"""
+EASY_SECURE™ Backup Verifier
+Version: 1.0
+"""
+
+import os
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from .copy_pipeline import hash_file
+from .archive import ArchiveReader, segment_name
+from .encryption import MAGIC, OVERHEAD, is_sealed
+from .parallel_engine import ParallelBackupEngine
+
+VERIFY_LEVELS = ("quick", "deep")
+
+
+def _verify_file_task(task: tuple) -> Tuple[str, Optional[str]]:
+    """Check one mirrored file, returning the failure reason if any."""
+    rel_path, data_path, entry, level, throttle = task
+    if throttle:
+        throttle.consume(files=1)
+    try:
+        stat = os.stat(data_path)
+    except OSError:
+        return rel_path, 'missing'
+
+    if entry.get('size') is not None and stat.st_size != entry['size']:
+        return rel_path, 'size'
+    if level == "quick":
+        if entry.get('mtime_ns') is not None and stat.st_mtime_ns != entry['mtime_ns']:
+            return rel_path, 'mtime'
+        return rel_path, None
+
+    if hash_file(data_path, throttle=throttle) != entry['sha256']:
+        return rel_path, 'hash'
+    return rel_path, None
+
+
+def _verify_chunk_task(task: tuple) -> Tuple[str, Optional[str], int]:
+    """Check one stored chunk, returning the failure reason and its size."""
+    digest, chunk_path, level, throttle, cipher = task
+    if throttle:
+        throttle.consume(files=1)
+    try:
+        if level == "quick":
+            size = os.path.getsize(chunk_path)
+            if cipher:
+                with open(chunk_path, 'rb') as f:
+                    if is_sealed(f.read(len(MAGIC))):
+                        size -= OVERHEAD
+            return digest, None, size
+        with open(chunk_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return digest, 'missing', 0
+    if throttle:
+        throttle.consume(nbytes=len(data))
+
+    if is_sealed(data):
+        if cipher is None:
+            return digest, 'encrypted', len(data)
+        try:
+            data = cipher.open(data, digest.encode())
+        except ValueError:
+            return digest, 'corrupt', len(data)
+    if hashlib.sha256(data).hexdigest() != digest:
+        return digest, 'hash', len(data)
+    return digest, None, len(data)
+
+
+def _verify_archive_task(task: tuple) -> Tuple[str, Optional[str]]:
+    """Check one archived file, returning the failure reason if any."""
+    rel_path, archive_dir, entry, level, throttle, cipher = task
+    if throttle:
+        throttle.consume(files=1)
+
+    if level == "quick":
+        for segment, offset, compressed_size, _ in entry['blocks']:
+            try:
+                segment_size = os.path.getsize(
+                    os.path.join(archive_dir, segment_name(segment))
+                )
+            except OSError:
+                return rel_path, 'missing'
+            if segment_size < offset + compressed_size:
+                return rel_path, 'size'
+        if sum(block[3] for block in entry['blocks']) != entry['size']:
+            return rel_path, 'size'
+        return rel_path, None
+
+    file_hash = hashlib.sha256()
+    try:
+        with ArchiveReader(archive_dir, cipher) as reader:
+            for data in reader.read_blocks(entry):
+                if throttle:
+                    throttle.consume(nbytes=len(data))
+                file_hash.update(data)
+    except FileNotFoundError:
+        return rel_path, 'missing'
+    except Exception:
+        return rel_path, 'corrupt'
+
+    if file_hash.hexdigest() != entry['sha256']:
+        return rel_path, 'hash'
+    return rel_path, None
+
+
+def _verify_cost(task: tuple) -> Tuple[int, int]:
+    """Files and bytes a file check touches, for throttling."""
+    entry, level = task[2], task[3]
+    return 1, (entry.get('size') or 0) if level == "deep" else 0
+
+
+class BackupVerifier:
+    """Checks snapshots at a quick (size/mtime) or deep (hash) level.
+
+    Work is spread over the client's parallel engine; with ``fail_fast``
+    verification stops at the first mismatch. Encrypted chunks and blocks
+    are opened with ``cipher`` on the workers.
+    """
+
+    def __init__(self, engine: ParallelBackupEngine, cipher=None):
+        self.engine = engine
+        self.cipher = cipher
+
+    def verify_files(self, files: Dict[str, Tuple[str, dict]], level: str,
+                     fail_fast: bool = False) -> dict:
+        """Verify files given as rel_path -> (data path, manifest entry)."""
+        tasks = (
+            (rel_path, data_path, entry, level, self.engine.task_throttle)
+            for rel_path, (data_path, entry) in files.items()
+        )
+
+        return self._collect(_verify_file_task, tasks, level, fail_fast)
+
+    def verify_archive(self, files: Dict[str, Tuple[str, dict]], level: str,
+                       fail_fast: bool = False) -> dict:
+        """Verify archived files given as rel_path -> (archive dir, entry)."""
+        tasks = (
+            (rel_path, archive_dir, entry, level, self.engine.task_throttle,
+             self.cipher)
+            for rel_path, (archive_dir, entry) in files.items()
+        )
+        return self._collect(_verify_archive_task, tasks, level, fail_fast)
+
+    def _collect(self, func, tasks, level: str, fail_fast: bool) -> dict:
+        """Run per-file checks and gather the failures."""
+        failed = []
+        checked = 0
+
+        for rel_path, reason in self.engine.map(func, tasks, cost=_verify_cost):
+            checked += 1
+            if reason:
+                failed.append({'path': rel_path, 'reason': reason})
+                if fail_fast:
+                    break
+
+        return self._report(level, checked, failed)
+
+    def verify_chunks(self, store, files: Dict[str, dict], level: str,
+                      fail_fast: bool = False) -> dict:
+        """Verify each chunk referenced by a chunked snapshot once."""
+        unique = dict.fromkeys(
+            digest for entry in files.values() for digest in entry['chunks']
+        )
+        tasks = (
+            (digest, store.chunk_path(digest), level, self.engine.task_throttle,
+             self.cipher)
+            for digest in unique
+        )
+        bad_chunks = {}
+        sizes = {}
+
+        for digest, reason, size in self.engine.map(
+            _verify_chunk_task, tasks, cost=lambda task: (1, 0)
+        ):
+            sizes[digest] = size
+            if reason:
+                bad_chunks[digest] = reason
+                if fail_fast:
+                    break
+
+        failed = []
+        checked = 0
+        for rel_path, entry in files.items():
+            checked += 1
+            reason = next(
+                (bad_chunks[d] for d in entry['chunks'] if d in bad_chunks), None
+            )
+            if reason is None and all(d in sizes for d in entry['chunks']):
+                if sum(sizes[d] for d in entry['chunks']) != entry['size']:
+                    reason = 'size'
+            if reason:
+                failed.append({'path': rel_path, 'reason': reason})
+                if fail_fast:
+                    break
+
+        return self._report(level, checked, failed)
+
+    def verify_legacy(self, stored: Dict[str, str], backup_dir: str,
+                      level: str, fail_fast: bool = False) -> dict:
+        """Verify a snapshot that only has a flat verification file."""
+        files = {
+            path: (path, {'sha256': file_hash})
+            for path, file_hash in stored.items()
+        }
+        report = self.verify_files(files, level, fail_fast)
+
+        if not (fail_fast and report['failed_files']):
+            for path in self._walk(backup_dir):
+                if path not in stored:
+                    report['failed_files'].append(
+                        {'path': path, 'reason': 'unexpected'}
+                    )
+                    if fail_fast:
+                        break
+            report['is_valid'] = not report['failed_files']
+
+        return report
+
+    @staticmethod
+    def _walk(backup_dir: str) -> Iterable[str]:
+        for root, _, files in os.walk(backup_dir):
+            for name in files:
+                yield os.path.join(root, name)
+
+    @staticmethod
+    def _report(level: str, checked: int, failed: list) -> dict:
+        return {
+            'is_valid': not failed,
+            'level': level,
+            'checked_files': checked,
+            'failed_files': failed
+        }
@@ -12,6 +12,7 @@ import json
 
 from ..precisionwatch.monitor_manager import MonitorManager
 from ..easy_secure.backup_manager import BackupManager
+from ..easy_secure.retention import RetentionPolicy
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +33,7 @@ class SystemIntegrator:
         self.clients = {}
         self.running = False
         self.integration_thread = None
+        self.scheduler_thread = None
         self.check_interval = 300  # 5 minutes
 
     def add_client(self, client_name: str, config: dict) -> bool:
@@ -42,7 +44,18 @@ class SystemIntegrator:
                 monitor_success = self.monitor_manager.add_client(client_name)
                 
                 # Add to backup
-                backup_success = self.backup_manager.add_client(client_name)
+                backup_success = self.backup_manager.add_client(
+                    client_name,
+                    backup_mode=config.get('backup_mode', 'mirror'),
+                    incremental=config.get('backup_incremental', False),
+                    workers=config.get('backup_workers', 1),
+                    compression=config.get('backup_compression', 'zlib'),
+                    compression_level=config.get('backup_compression_level'),
+                    retention=RetentionPolicy(**config['backup_retention'])
+                    if 'backup_retention' in config else None,
+                    bytes_per_sec=config.get('backup_bytes_per_sec'),
+                    files_per_sec=config.get('backup_files_per_sec')
+                )
                 
                 if monitor_success and backup_success:
                     self.clients[client_name] = {
@@ -56,7 +69,8 @@ class SystemIntegrator:
                         self.backup_manager.schedule_backup(
                             client_name,
                             config['backup_path'],
-                            config.get('backup_schedule', 'daily')
+                            config.get('backup_schedule', 'daily'),
+                            config.get('backup_priority', 0)
                         )
                     
                     logger.info(f"Successfully integrated client: {client_name}")
@@ -98,9 +112,21 @@ class SystemIntegrator:
         try:
             # Start monitoring
             self.monitor_manager.start_monitoring()
+
+            # Let host load pace backup and verify jobs
+            self.backup_manager.start_load_governor(
+                self.monitor_manager.get_load_metrics
+            )
             
+            # Enforce retention policies in the background
+            self.backup_manager.start_garbage_collector()
+
             # Start backup scheduler
-            self.backup_manager.run_scheduler()
+            self.scheduler_thread = threading.Thread(
+                target=self.backup_manager.run_scheduler
+            )
+            self.scheduler_thread.daemon = True
+            self.scheduler_thread.start()
             
             # Start integration checks
             self.running = True
@@ -119,6 +145,14 @@ class SystemIntegrator:
         try:
             # Stop monitoring
             self.monitor_manager.stop_monitoring()
+            self.backup_manager.stop_load_governor()
+
+            # Stop scheduling backups and collecting garbage
+            self.backup_manager.stop_scheduler(wait=True)
+            if self.scheduler_thread:
+                self.scheduler_thread.join()
+                self.scheduler_thread = None
+            self.backup_manager.stop_garbage_collector()
             
             # Stop integration checks
             self.running = False
@@ -201,7 +235,8 @@ class SystemIntegrator:
                     self.backup_manager.schedule_backup(
                         client_name,
                         config['backup_path'],
-                        config.get('backup_schedule', 'daily')
+                        config.get('backup_schedule', 'daily'),
+                        config.get('backup_priority', 0)
                     )
                 
                 logger.info(f"Updated configuration for {client_name}")
@@ -0,0 +1,137 @@
+"""
+PrecisionWatch™ Shared Host Collector
+Version: 1.0
+"""
+
+import time
+import socket
+import logging
+import threading
+import requests
+import psutil
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from .rate_sampler import RateSampler
+from .process_table import ProcessTable
+
+logger = logging.getLogger('PrecisionWatch.collector')
+
+CONNECTIVITY_URL = 'https://8.8.8.8'
+
+
+def sample_cpu(sampler: RateSampler) -> dict:
+    usage = sampler.cpu()
+    return {
+        'usage_percent': usage['usage_percent'],
+        'states': usage['states'],
+        'core_count': psutil.cpu_count(),
+        'frequency': psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None
+    }
+
+
+def sample_disk() -> dict:
+    disk_info = {}
+    for partition in psutil.disk_partitions():
+        try:
+            usage = psutil.disk_usage(partition.mountpoint)
+            disk_info[partition.mountpoint] = {
+                'total': usage.total,
+                'used': usage.used,
+                'free': usage.free,
+                'percent': usage.percent
+            }
+        except Exception as e:
+            logger.warning(f"Couldn't get disk usage for {partition.mountpoint}: {e}")
+    return disk_info
+
+
+def sample_network(counters) -> dict:
+    network_info = {
+        'interfaces': psutil.net_if_addrs(),
+        'connections': counters.connection_count(),
+        'hostname': socket.gethostname()
+    }
+    try:
+        response = requests.get(CONNECTIVITY_URL, timeout=5)
+        network_info['internet_access'] = True
+        network_info['latency'] = response.elapsed.total_seconds()
+    except requests.RequestException:
+        network_info['internet_access'] = False
+    return network_info
+
+
+def default_sources(sampler: RateSampler,
+                    processes: ProcessTable) -> Dict[str, Callable[[], dict]]:
+    """The standard metric sources, with rates taken from ``sampler``."""
+    return {
+        'cpu': partial(sample_cpu, sampler),
+        'memory': sampler.counters.memory,
+        'disk': sample_disk,
+        'disk_io': sampler.disk_io,
+        'network': partial(sample_network, sampler.counters),
+        'net_io': sampler.net_io,
+        'processes': processes.sample
+    }
+
+
+class HostCollector:
+    """Samples a host once per tick for every monitor that watches it.
+
+    Each metric source runs once per ``collect``, concurrently with the
+    others, so a tick takes as long as the slowest source rather than
+    their sum. CPU, disk I/O, network and per-process rates come from
+    counter deltas between ticks, so no source sleeps; processes are
+    tracked incrementally by a ``ProcessTable``. Callers asking
+    within ``max_age`` seconds of the last collection share its snapshot,
+    and concurrent callers wait for the collection already running
+    instead of starting another.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], dict]] = None,
+                 max_age: float = 0.0, sampler: RateSampler = None,
+                 processes: ProcessTable = None):
+        if sources is None:
+            self.sampler = sampler or RateSampler()
+            self.processes = processes or ProcessTable()
+            sources = default_sources(self.sampler, self.processes)
+        self.sources = dict(sources)
+        self.max_age = max_age
+        self.collections = 0
+        self._snapshot: Optional[dict] = None
+        self._collected_at = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.sources)),
+            thread_name_prefix="precisionwatch-source"
+        )
+
+    def collect(self, max_age: float = None) -> dict:
+        """Return a snapshot of every source, reusing a recent one."""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            if (self._snapshot is not None
+                    and time.monotonic() - self._collected_at <= max_age):
+                return self._snapshot
+
+            futures = {
+                name: self._executor.submit(source)
+                for name, source in self.sources.items()
+            }
+            snapshot = {'timestamp': datetime.now().isoformat(), 'errors': {}}
+            for name, future in futures.items():
+                try:
+                    snapshot[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Sampling {name} failed: {str(e)}")
+                    snapshot[name] = None
+                    snapshot['errors'][name] = str(e)
+
+            self._snapshot = snapshot
+            self._collected_at = time.monotonic()
+            self.collections += 1
+            return snapshot
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -4,14 +4,15 @@ Version: 1.0
 """
 
 import os
+import time
 import logging
 import json
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 import socket
-import psutil
 import platform
+from .host_collector import HostCollector
+from .rate_sampler import RateSampler
 
 # Configure logging
 logging.basicConfig(
@@ -26,8 +27,10 @@ logging.basicConfig(
 logger = logging.getLogger('PrecisionWatch')
 
 class SystemMonitor:
-    def __init__(self, client_name: str):
+    def __init__(self, client_name: str, collector: HostCollector = None):
         self.client_name = client_name
+        # Shared with every other monitor of the same host
+        self.collector = collector or HostCollector()
         self.thresholds = {
             'cpu_percent': 80.0,
             'memory_percent': 85.0,
@@ -35,17 +38,37 @@ class SystemMonitor:
             'response_time': 2.0  # seconds
         }
         self.alerts = []
+        # Own counters, so load checks do not skew the collector's rates
+        self._load_sampler = None
         
     def check_system_health(self) -> dict:
         """Check overall system health."""
         try:
+            return self.evaluate(self.collector.collect())
+        except Exception as e:
+            logger.error(f"Health check failed: {str(e)}")
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+
+    def evaluate(self, snapshot: dict) -> dict:
+        """Apply this client's thresholds to a collected host snapshot."""
+        try:
+            if snapshot['errors']:
+                raise RuntimeError(
+                    "; ".join(f"{name}: {error}"
+                              for name, error in snapshot['errors'].items())
+                )
             health_data = {
-                'timestamp': datetime.now().isoformat(),
-                'cpu': self._check_cpu(),
-                'memory': self._check_memory(),
-                'disk': self._check_disk(),
-                'network': self._check_network(),
-                'processes': self._check_processes()
+                'timestamp': snapshot['timestamp'],
+                'cpu': self._check_cpu(snapshot['cpu']),
+                'memory': self._check_memory(snapshot['memory']),
+                'disk': self._check_disk(snapshot['disk']),
+                'disk_io': snapshot.get('disk_io'),
+                'network': self._check_network(snapshot['network']),
+                'net_io': snapshot.get('net_io'),
+                'processes': snapshot['processes']
             }
             
             return {
@@ -61,93 +84,61 @@ class SystemMonitor:
                 'message': str(e)
             }
 
-    def _check_cpu(self) -> dict:
+    def _check_cpu(self, cpu_info: dict) -> dict:
         """Monitor CPU usage."""
-        cpu_percent = psutil.cpu_percent(interval=1)
-        cpu_info = {
-            'usage_percent': cpu_percent,
-            'core_count': psutil.cpu_count(),
-            'frequency': psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None
-        }
-        
-        if cpu_percent > self.thresholds['cpu_percent']:
+        cpu_percent = cpu_info['usage_percent']
+        # None until the collector has two CPU readings
+        if cpu_percent is not None and cpu_percent > self.thresholds['cpu_percent']:
             self._add_alert('CPU', f'High CPU usage: {cpu_percent}%')
             
         return cpu_info
 
-    def _check_memory(self) -> dict:
+    def _check_memory(self, memory_info: dict) -> dict:
         """Monitor memory usage."""
-        memory = psutil.virtual_memory()
-        memory_info = {
-            'total': memory.total,
-            'available': memory.available,
-            'percent': memory.percent,
-            'used': memory.used
-        }
-        
-        if memory.percent > self.thresholds['memory_percent']:
-            self._add_alert('Memory', f'High memory usage: {memory.percent}%')
+        if memory_info['percent'] > self.thresholds['memory_percent']:
+            self._add_alert('Memory', f"High memory usage: {memory_info['percent']}%")
             
         return memory_info
 
-    def _check_disk(self) -> dict:
+    def _check_disk(self, disk_info: dict) -> dict:
         """Monitor disk usage."""
-        disk_info = {}
-        for partition in psutil.disk_partitions():
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disk_info[partition.mountpoint] = {
-                    'total': usage.total,
-                    'used': usage.used,
-                    'free': usage.free,
-                    'percent': usage.percent
-                }
-                
-                if usage.percent > self.thresholds['disk_percent']:
-                    self._add_alert('Disk', 
-                        f'High disk usage on {partition.mountpoint}: {usage.percent}%'
-                    )
-            except Exception as e:
-                logger.warning(f"Couldn't get disk usage for {partition.mountpoint}: {e}")
+        for mountpoint, usage in disk_info.items():
+            if usage['percent'] > self.thresholds['disk_percent']:
+                self._add_alert('Disk', 
+                    f"High disk usage on {mountpoint}: {usage['percent']}%"
+                )
                 
         return disk_info
 
-    def _check_network(self) -> dict:
+    def _check_network(self, network_info: dict) -> dict:
         """Monitor network connectivity and performance."""
-        network_info = {
-            'interfaces': psutil.net_if_addrs(),
-            'connections': len(psutil.net_connections()),
-            'hostname': socket.gethostname()
-        }
-        
-        # Check internet connectivity
-        try:
-            response = requests.get('https://8.8.8.8', timeout=5)
-            network_info['internet_access'] = True
-            network_info['latency'] = response.elapsed.total_seconds()
-            
-            if response.elapsed.total_seconds() > self.thresholds['response_time']:
-                self._add_alert('Network', 
-                    f'High network latency: {response.elapsed.total_seconds()}s'
-                )
-        except requests.RequestException:
-            network_info['internet_access'] = False
+        if not network_info.get('internet_access'):
             self._add_alert('Network', 'Internet connectivity issues detected')
+        elif network_info['latency'] > self.thresholds['response_time']:
+            self._add_alert('Network', 
+                f"High network latency: {network_info['latency']}s"
+            )
             
         return network_info
 
-    def _check_processes(self) -> dict:
-        """Monitor system processes."""
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                pinfo = proc.info
-                if pinfo['cpu_percent'] > 50 or pinfo['memory_percent'] > 50:
-                    processes.append(pinfo)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-                
-        return {'high_usage_processes': processes}
+    def get_load_metrics(self) -> dict:
+        """Sample CPU, memory and disk-busy percentages without blocking.
+
+        CPU and disk busy figures cover the time since the previous call;
+        disk busy is None where the platform does not report busy time.
+        """
+        if self._load_sampler is None:
+            self._load_sampler = RateSampler()
+        disks = self._load_sampler.disk_io() or {}
+        busy = [
+            rates['busy_percent'] for rates in disks.values()
+            if rates['busy_percent'] is not None
+        ]
+        return {
+            'cpu_percent': self._load_sampler.cpu()['usage_percent'],
+            'memory_percent': self._load_sampler.counters.memory()['percent'],
+            'disk_busy_percent': max(busy) if busy else None
+        }
 
     def _add_alert(self, category: str, message: str):
         """Add a new alert."""
@@ -5,25 +5,35 @@ Version: 1.0
 
 import time
 import logging
-import json
 import threading
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .monitor_config import SystemMonitor
+from .host_collector import HostCollector
+from .timeseries import TimeSeriesStore, flatten_metrics
 
 class MonitorManager:
-    def __init__(self):
+    def __init__(self, history_root: str = "health_history"):
         self.monitors: Dict[str, SystemMonitor] = {}
         self.running = False
         self.monitor_thread = None
         self.logger = logging.getLogger('PrecisionWatch.manager')
         self.check_interval = 300  # 5 minutes
+        # Every monitor watches this host, so all share one collector;
+        # on-demand checks within a few seconds reuse the last snapshot
+        self.collector = HostCollector(max_age=5.0)
+        # Samples the local host for load-adaptive backups
+        self.host_monitor = SystemMonitor('localhost', self.collector)
+        # Health history, downsampled as it ages
+        self.history = TimeSeriesStore(history_root)
 
     def add_client(self, client_name: str) -> bool:
         """Add a new client to monitoring."""
         try:
             if client_name not in self.monitors:
-                self.monitors[client_name] = SystemMonitor(client_name)
+                self.monitors[client_name] = SystemMonitor(
+                    client_name, self.collector
+                )
                 self.logger.info(f"Added new client to monitoring: {client_name}")
                 return True
             return False
@@ -58,15 +68,19 @@ class MonitorManager:
             self.running = False
             if self.monitor_thread:
                 self.monitor_thread.join()
+            self.history.flush()
             self.logger.info("Stopped monitoring service")
 
     def _monitor_loop(self):
         """Main monitoring loop."""
         while self.running:
             try:
-                for client_name, monitor in self.monitors.items():
-                    health_data = monitor.check_system_health()
+                # Sample the host once and judge it by each client's thresholds
+                snapshot = self.collector.collect(max_age=0)
+                for client_name, monitor in list(self.monitors.items()):
+                    health_data = monitor.evaluate(snapshot)
                     self._process_health_data(client_name, health_data)
+                self.history.maintain()
                     
                 time.sleep(self.check_interval)
                 
@@ -79,11 +93,11 @@ class MonitorManager:
         try:
             if health_data['status'] == 'success':
                 # Save health data
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"health_{client_name}_{timestamp}.json"
-                
-                with open(filename, 'w') as f:
-                    json.dump(health_data, f, indent=4)
+                data = health_data['data']
+                self.history.append(
+                    client_name, flatten_metrics(data),
+                    datetime.fromisoformat(data['timestamp']).timestamp()
+                )
                 
                 # Process alerts
                 if health_data.get('alerts'):
@@ -119,6 +133,21 @@ class MonitorManager:
             )
             return None
 
+    def get_client_history(self, client_name: str, metrics: List[str],
+                           start: float, end: float = None,
+                           aggregate: str = 'mean') -> dict:
+        """Read a client's recorded metrics between two epoch times."""
+        return self.history.query(client_name, metrics, start, end,
+                                  aggregate=aggregate)
+
+    def get_load_metrics(self) -> dict:
+        """Get the host's live CPU, memory and disk-busy percentages."""
+        try:
+            return self.host_monitor.get_load_metrics()
+        except Exception as e:
+            self.logger.error(f"Failed to sample host load: {str(e)}")
+            return {}
+
     def set_check_interval(self, seconds: int):
         """Update the monitoring check interval."""
         if seconds >= 60:  # Minimum 1 minute
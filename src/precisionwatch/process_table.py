@@ -0,0 +1,134 @@
+"""
+PrecisionWatch™ Process Table
+Version: 1.0
+"""
+
+import time
+import heapq
+import threading
+import psutil
+from collections import namedtuple
+from operator import itemgetter
+from typing import Callable, Dict, List
+
+# Processes above this CPU or memory share are reported as high usage
+HIGH_USAGE_PERCENT = 50.0
+
+# A process we hold a handle for, with its counters at the last tick
+TrackedProcess = namedtuple('TrackedProcess', [
+    'process', 'name', 'cpu_seconds', 'io_bytes'
+])
+
+
+def _io_bytes(process: psutil.Process):
+    try:
+        io = process.io_counters()
+    except (psutil.AccessDenied, AttributeError):  # not ours, or no I/O counters
+        return None
+    return io.read_bytes + io.write_bytes
+
+
+class ProcessTable:
+    """Tracks every process across ticks and reports the top consumers.
+
+    ``psutil.Process`` handles are kept between ticks, so CPU and I/O
+    rates are real deltas over the time since the last tick. A process
+    first seen in a tick is rated over its lifetime instead of showing
+    0.0. Exited processes are dropped and reused PIDs get a new handle.
+    The top ``top_n`` processes by CPU, RSS and I/O are picked with
+    bounded heaps, so a tick costs one pass over the table.
+    """
+
+    def __init__(self, top_n: int = 10, clock: Callable[[], float] = time.time):
+        self.top_n = top_n
+        self.clock = clock
+        self.total_memory = psutil.virtual_memory().total
+        self._tracked: Dict[int, TrackedProcess] = {}
+        self._sampled_at = None
+        self._lock = threading.Lock()
+        self.sample()
+
+    def _track(self, pid: int):
+        tracked = self._tracked.get(pid)
+        # is_running also checks the creation time, which catches PID reuse
+        if tracked is not None and tracked.process.is_running():
+            return tracked, False
+        return TrackedProcess(psutil.Process(pid), None, None, None), True
+
+    def _rate(self, now: float, elapsed, previous, current, create_time: float):
+        if current is None:
+            return None
+        if previous is None or elapsed is None:
+            # New since the last tick: average over its lifetime so far
+            return current / max(now - create_time, 1e-3)
+        return max(current - previous, 0) / elapsed
+
+    def sample(self) -> dict:
+        """Refresh the table and return the top and high-usage processes."""
+        with self._lock:
+            now = self.clock()
+            elapsed = now - self._sampled_at if self._sampled_at else None
+            if elapsed is not None and elapsed <= 0:
+                elapsed = None
+            pids = set(psutil.pids())
+            for pid in set(self._tracked) - pids:
+                del self._tracked[pid]  # exited
+
+            rows = []
+            for pid in pids:
+                try:
+                    tracked, new = self._track(pid)
+                    process = tracked.process
+                    with process.oneshot():
+                        cpu = process.cpu_times()
+                        cpu_seconds = cpu.user + cpu.system
+                        rss = process.memory_info().rss
+                        io_bytes = _io_bytes(process)
+                        name = process.name() if new else tracked.name
+                        create_time = process.create_time()
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    self._tracked.pop(pid, None)
+                    continue
+                except psutil.AccessDenied:
+                    continue
+
+                cpu_rate = self._rate(now, elapsed, tracked.cpu_seconds,
+                                      cpu_seconds, create_time)
+                io_rate = self._rate(now, elapsed, tracked.io_bytes,
+                                     io_bytes, create_time)
+                self._tracked[pid] = TrackedProcess(
+                    process, name, cpu_seconds, io_bytes
+                )
+                rows.append({
+                    'pid': pid,
+                    'name': name,
+                    'cpu_percent': round(cpu_rate * 100, 1),
+                    'memory_percent': round(rss / self.total_memory * 100, 1),
+                    'rss': rss,
+                    'io_bytes_per_sec': (
+                        round(io_rate, 1) if io_rate is not None else None
+                    )
+                })
+            self._sampled_at = now
+
+        return {
+            'count': len(rows),
+            'top_cpu': self._top(rows, 'cpu_percent'),
+            'top_memory': self._top(rows, 'rss'),
+            'top_io': self._top(
+                [row for row in rows if row['io_bytes_per_sec'] is not None],
+                'io_bytes_per_sec'
+            ),
+            'high_usage_processes': [
+                row for row in rows
+                if row['cpu_percent'] > HIGH_USAGE_PERCENT
+                or row['memory_percent'] > HIGH_USAGE_PERCENT
+            ]
+        }
+
+    def _top(self, rows: List[dict], key: str) -> List[dict]:
+        return heapq.nlargest(self.top_n, rows, key=itemgetter(key))
+
+    def tracked_pids(self) -> List[int]:
+        with self._lock:
+            return sorted(self._tracked)
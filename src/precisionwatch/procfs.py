@@ -0,0 +1,197 @@
+"""
+PrecisionWatch™ Host Counter Sources
+Version: 1.0
+"""
+
+import os
+import sys
+import threading
+import psutil
+from typing import Dict
+
+SECTOR_SIZE = 512
+
+CPU_FIELDS = (
+    'user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal',
+    'guest', 'guest_nice'
+)
+
+MEMINFO_FIELDS = frozenset((
+    b'MemTotal', b'MemFree', b'MemAvailable', b'Buffers', b'Cached',
+    b'SReclaimable'
+))
+
+# /proc/net/dev columns after the interface name
+NET_FIELDS = {
+    0: 'bytes_recv', 1: 'packets_recv', 2: 'errin', 3: 'dropin',
+    8: 'bytes_sent', 9: 'packets_sent', 10: 'errout', 11: 'dropout'
+}
+
+
+class PsutilCounters:
+    """Raw host counters read through psutil; works on every platform."""
+
+    name = "psutil"
+
+    def cpu_times(self) -> Dict[str, float]:
+        return psutil.cpu_times()._asdict()
+
+    def disk_io(self) -> Dict[str, Dict[str, float]]:
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        return {disk: stats._asdict() for disk, stats in counters.items()}
+
+    def net_io(self) -> Dict[str, Dict[str, float]]:
+        counters = psutil.net_io_counters(pernic=True) or {}
+        return {nic: stats._asdict() for nic, stats in counters.items()}
+
+    def memory(self) -> dict:
+        memory = psutil.virtual_memory()
+        return {
+            'total': memory.total,
+            'available': memory.available,
+            'percent': memory.percent,
+            'used': memory.used
+        }
+
+    def connection_count(self) -> int:
+        return len(psutil.net_connections())
+
+
+class _ProcFile:
+    """A /proc file kept open and re-read into the same buffer."""
+
+    def __init__(self, path: str, size: int = 4096):
+        self.path = path
+        self.fd = None
+        self.buffer = bytearray(size)
+        self._lock = threading.Lock()
+
+    def read(self) -> bytes:
+        with self._lock:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_RDONLY)
+            while True:
+                length = os.preadv(self.fd, [self.buffer], 0)
+                if length < len(self.buffer):
+                    return bytes(memoryview(self.buffer)[:length])
+                self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self):
+        with self._lock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+
+
+class ProcCounters:
+    """Raw host counters parsed straight from Linux /proc.
+
+    Files stay open between samples and are read with one pread into a
+    reused buffer, which skips the per-call object building psutil does.
+    Values use psutil's names and units, so either source can feed the
+    rate sampler. Connection counts come from the kernel's socket
+    summary instead of a walk over every socket.
+    """
+
+    name = "procfs"
+
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._files = {}
+
+    def _read(self, rel_path: str) -> bytes:
+        proc_file = self._files.get(rel_path)
+        if proc_file is None:
+            proc_file = self._files.setdefault(
+                rel_path, _ProcFile(os.path.join(self.proc_root, rel_path))
+            )
+        return proc_file.read()
+
+    def cpu_times(self) -> Dict[str, float]:
+        data = self._read('stat')
+        values = data[:data.index(b'\n')].split()[1:]
+        ticks = self.clock_ticks
+        return {
+            name: int(value) / ticks for name, value in zip(CPU_FIELDS, values)
+        }
+
+    def disk_io(self) -> Dict[str, Dict[str, float]]:
+        disks = {}
+        for line in self._read('diskstats').splitlines():
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            disks[fields[2].decode()] = {
+                'read_count': int(fields[3]),
+                'write_count': int(fields[7]),
+                'read_bytes': int(fields[5]) * SECTOR_SIZE,
+                'write_bytes': int(fields[9]) * SECTOR_SIZE,
+                'read_time': int(fields[6]),
+                'write_time': int(fields[10]),
+                'busy_time': int(fields[12])
+            }
+        return disks
+
+    def net_io(self) -> Dict[str, Dict[str, float]]:
+        nics = {}
+        for line in self._read('net/dev').splitlines()[2:]:
+            name, _, counters = line.partition(b':')
+            fields = counters.split()
+            nics[name.strip().decode()] = {
+                key: int(fields[index]) for index, key in NET_FIELDS.items()
+            }
+        return nics
+
+    def memory(self) -> dict:
+        info = {}
+        for line in self._read('meminfo').splitlines():
+            name, _, value = line.partition(b':')
+            if name in MEMINFO_FIELDS:
+                info[name] = int(value.split()[0]) * 1024
+                if len(info) == len(MEMINFO_FIELDS):
+                    break
+        total = info[b'MemTotal']
+        available = info.get(b'MemAvailable', info[b'MemFree'])
+        cached = info.get(b'Cached', 0) + info.get(b'SReclaimable', 0)
+        used = total - info[b'MemFree'] - info.get(b'Buffers', 0) - cached
+        return {
+            'total': total,
+            'available': available,
+            # Same formulas as psutil.virtual_memory
+            'percent': round((total - available) / total * 100, 1),
+            'used': used if used >= 0 else total - info[b'MemFree']
+        }
+
+    def connection_count(self) -> int:
+        """TCP and UDP sockets over IPv4 and IPv6, TIME_WAIT included."""
+        count = 0
+        for rel_path in ('net/sockstat', 'net/sockstat6'):
+            try:
+                data = self._read(rel_path)
+            except FileNotFoundError:
+                continue  # no IPv6
+            for line in data.splitlines():
+                protocol, _, stats = line.partition(b':')
+                if protocol in (b'TCP', b'UDP', b'TCP6', b'UDP6'):
+                    fields = stats.split()
+                    pairs = dict(zip(fields[::2], fields[1::2]))
+                    count += int(pairs.get(b'inuse', 0)) + int(pairs.get(b'tw', 0))
+        return count
+
+    def close(self):
+        for proc_file in self._files.values():
+            proc_file.close()
+
+
+def host_counters(prefer_proc: bool = True):
+    """The fastest counter source this host supports."""
+    if prefer_proc and sys.platform.startswith('linux'):
+        counters = ProcCounters()
+        try:
+            counters.cpu_times()
+            counters.memory()
+            return counters
+        except (OSError, ValueError, KeyError):
+            counters.close()
+    return PsutilCounters()
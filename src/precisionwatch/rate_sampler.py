@@ -0,0 +1,134 @@
+"""
+PrecisionWatch™ Rate Sampler
+Version: 1.0
+"""
+
+import time
+import threading
+from typing import Callable, Dict, Hashable, Optional
+from .procfs import host_counters
+
+# CPU time fields that count as idle; the rest is busy time
+IDLE_FIELDS = ('idle', 'iowait')
+# Already included in user time on Linux
+GUEST_FIELDS = ('guest', 'guest_nice')
+
+
+class RateSampler:
+    """Turns cumulative kernel counters into rates without blocking.
+
+    The raw counters from the previous call are kept per counter family,
+    so each call reads the counters once and reports the rate over the
+    time since the last call. Counters are primed when the sampler is
+    created; a family reports None until it has two readings, and a
+    counter that went backwards (a reset or a removed device) is skipped.
+    Raw counters come from ``counters``, by default /proc on Linux and
+    psutil elsewhere.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 counters=None):
+        self.clock = clock
+        self.counters = counters or host_counters()
+        self._previous: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+        self.cpu()
+        self.disk_io()
+        self.net_io()
+
+    def _deltas(self, family: Hashable,
+                counters: Dict[Hashable, Dict[str, float]]) -> Optional[tuple]:
+        """Store new readings; return (elapsed, per-item deltas) or None."""
+        now = self.clock()
+        with self._lock:
+            previous = self._previous.get(family)
+            self._previous[family] = (now, counters)
+        if previous is None or now <= previous[0]:
+            return None
+
+        deltas = {}
+        for item, values in counters.items():
+            old = previous[1].get(item)
+            if old is None:
+                continue
+            changes = {name: value - old[name] for name, value in values.items()
+                       if name in old}
+            if all(change >= 0 for change in changes.values()):
+                deltas[item] = changes
+        return now - previous[0], deltas
+
+    def cpu(self) -> dict:
+        """Busy share of all CPUs and of each CPU state since the last call."""
+        times = {
+            name: value for name, value in self.counters.cpu_times().items()
+            if name not in GUEST_FIELDS
+        }
+        measured = self._deltas('cpu', {'all': times})
+        if not measured or 'all' not in measured[1]:
+            return {'usage_percent': None, 'states': None}
+
+        deltas = measured[1]['all']
+        total = sum(deltas.values())
+        if total <= 0:
+            return {'usage_percent': None, 'states': None}
+        busy = total - sum(deltas.get(name, 0.0) for name in IDLE_FIELDS)
+        return {
+            'usage_percent': round(busy / total * 100, 1),
+            'states': {
+                name: round(delta / total * 100, 1)
+                for name, delta in deltas.items()
+            }
+        }
+
+    def disk_io(self) -> Optional[Dict[str, dict]]:
+        """Throughput, IOPS and busy share per disk since the last call."""
+        try:
+            counters = self.counters.disk_io()
+        except Exception:
+            return None
+        measured = self._deltas('disk', counters)
+        if not measured:
+            return None
+
+        elapsed, deltas = measured
+        rates = {}
+        for disk, delta in deltas.items():
+            rates[disk] = {
+                'read_bytes_per_sec': round(delta['read_bytes'] / elapsed, 1),
+                'write_bytes_per_sec': round(delta['write_bytes'] / elapsed, 1),
+                'read_iops': round(delta['read_count'] / elapsed, 1),
+                'write_iops': round(delta['write_count'] / elapsed, 1),
+                # busy_time is in milliseconds where the platform has it
+                'busy_percent': (
+                    round(min(100.0, delta['busy_time'] / (elapsed * 10)), 1)
+                    if 'busy_time' in delta else None
+                )
+            }
+        return rates
+
+    def net_io(self) -> Optional[Dict[str, dict]]:
+        """Bandwidth, packet and error rates per interface since the last call."""
+        try:
+            counters = self.counters.net_io()
+        except Exception:
+            return None
+        measured = self._deltas('net', counters)
+        if not measured:
+            return None
+
+        elapsed, deltas = measured
+        return {
+            nic: {
+                'recv_bytes_per_sec': round(delta['bytes_recv'] / elapsed, 1),
+                'sent_bytes_per_sec': round(delta['bytes_sent'] / elapsed, 1),
+                'recv_packets_per_sec': round(delta['packets_recv'] / elapsed, 1),
+                'sent_packets_per_sec': round(delta['packets_sent'] / elapsed, 1),
+                'errors_per_sec': round(
+                    (delta['errin'] + delta['errout']) / elapsed, 2
+                ),
+                'drops_per_sec': round(
+                    (delta['dropin'] + delta['dropout']) / elapsed, 2
+                )
+            }
+            for nic, delta in deltas.items()
+        }
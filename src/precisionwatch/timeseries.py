@@ -0,0 +1,518 @@
+"""
+PrecisionWatch™ Time-Series Store
+Version: 1.0
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import struct
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('PrecisionWatch.timeseries')
+
+# Each block: header, then a zlib-compressed columnar payload
+BLOCK_MAGIC = b"PWB1"
+# magic, payload length, row count, first and last timestamp
+BLOCK_HEADER = struct.Struct('<4sIIdd')
+SEGMENT_SUFFIX = ".pwb"
+HEAD_FILE = "head.jsonl"
+
+# name, resolution and segment span in seconds; resolution 0 is raw samples
+TIERS = (
+    ('raw', 0, 86400),
+    ('1m', 60, 86400),
+    ('1h', 3600, 30 * 86400),
+)
+DEFAULT_RETENTION = {'raw': 2 * 86400, '1m': 30 * 86400, '1h': 400 * 86400}
+AGGREGATES = ('mean', 'min', 'max')
+
+NAN = float('nan')
+
+
+def flatten_metrics(data: dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of nested health data, keyed by dotted path."""
+    metrics = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not (
+                isinstance(value, float) and math.isnan(value)):
+            metrics[name] = float(value)
+    return metrics
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array('d', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    values = array('d')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_block(timestamps: array, columns: Dict[str, array]) -> bytes:
+    """Serialize rows as one timestamp array plus one array per metric."""
+    names = "\n".join(columns).encode()
+    payload = zlib.compress(b''.join(
+        [struct.pack('<II', len(timestamps), len(names)), names, _pack(timestamps)]
+        + [_pack(column) for column in columns.values()]
+    ))
+    return BLOCK_HEADER.pack(
+        BLOCK_MAGIC, len(payload), len(timestamps), timestamps[0], timestamps[-1]
+    ) + payload
+
+
+def decode_block(payload: bytes) -> Tuple[array, Dict[str, array]]:
+    data = zlib.decompress(payload)
+    rows, names_length = struct.unpack_from('<II', data)
+    offset = 8
+    names = data[offset:offset + names_length].decode().split("\n")
+    offset += names_length
+    width = rows * 8
+    timestamps = _unpack(data[offset:offset + width])
+    columns = {}
+    for name in names if names_length else []:
+        offset += width
+        columns[name] = _unpack(data[offset:offset + width])
+    return timestamps, columns
+
+
+def scan_blocks(segment_file: str, with_payload: bool = True) -> Iterator[tuple]:
+    """Yield (offset, rows, first, last, payload) for each intact block.
+
+    Stops at a torn block left by an interrupted write.
+    """
+    with open(segment_file, 'rb') as f:
+        offset = 0
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            magic, length, rows, first, last = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC:
+                return
+            if with_payload:
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+            else:
+                payload = None
+                f.seek(length, os.SEEK_CUR)
+                if f.tell() > os.fstat(f.fileno()).st_size:
+                    return
+            yield offset, rows, first, last, payload
+            offset += BLOCK_HEADER.size + length
+
+
+class TimeSeriesStore:
+    """Append-only metric history for every monitored client.
+
+    Samples are flat ``{metric: value}`` dicts. Each client has its own
+    series under ``<root>/<client>``. New samples go to a small
+    ``head.jsonl`` log and are sealed into compressed columnar blocks of
+    ``block_rows`` rows, appended to one segment file per tier and time
+    span. ``maintain`` rolls sealed raw samples up into 1-minute and
+    1-hour mean/min/max rows and deletes segments past their tier's
+    retention, which bounds disk use; ``max_bytes`` caps each client on
+    top of that. Range reads skip blocks by their header timestamps and
+    only decompress the blocks they need.
+    """
+
+    def __init__(self, root: str = "health_history", block_rows: int = 120,
+                 max_head_age: float = 3600.0, retention: Dict[str, float] = None,
+                 max_bytes: int = None, clock=time.time):
+        self.root = root
+        self.block_rows = block_rows
+        self.max_head_age = max_head_age
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._heads: Dict[str, List[tuple]] = {}
+        self._repaired = set()
+        self._lock = threading.RLock()
+
+    # Layout
+
+    def _tier_dir(self, client_name: str, tier: str) -> str:
+        return os.path.join(self.root, client_name, tier)
+
+    def _head_file(self, client_name: str) -> str:
+        return os.path.join(self.root, client_name, HEAD_FILE)
+
+    def _segment_file(self, client_name: str, tier: str, timestamp: float) -> str:
+        span = dict((name, span) for name, _, span in TIERS)[tier]
+        start = int(timestamp // span * span)
+        return os.path.join(self._tier_dir(client_name, tier),
+                            f"{start}{SEGMENT_SUFFIX}")
+
+    def _segments(self, client_name: str, tier: str) -> List[Tuple[int, str]]:
+        """(span start, path) of a tier's segment files, oldest first."""
+        tier_dir = self._tier_dir(client_name, tier)
+        if not os.path.isdir(tier_dir):
+            return []
+        return sorted(
+            (int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(tier_dir, name))
+            for name in os.listdir(tier_dir) if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def clients(self) -> List[str]:
+        with self._lock:
+            names = set(self._heads)
+            if os.path.isdir(self.root):
+                names.update(
+                    name for name in os.listdir(self.root)
+                    if os.path.isdir(os.path.join(self.root, name))
+                )
+            return sorted(names)
+
+    # Writing
+
+    def _head(self, client_name: str) -> List[tuple]:
+        """Unsealed samples, reloaded from the head log after a restart."""
+        rows = self._heads.get(client_name)
+        if rows is None:
+            rows = []
+            head_file = self._head_file(client_name)
+            if os.path.exists(head_file):
+                sealed = self._bounds(client_name, 'raw')[1]
+                with open(head_file, 'r') as f:
+                    for line in f:
+                        try:
+                            timestamp, metrics = json.loads(line)
+                        except ValueError:
+                            break  # torn final line
+                        # Already sealed if we stopped before clearing the log
+                        if sealed is None or timestamp > sealed:
+                            rows.append((timestamp, metrics))
+            self._heads[client_name] = rows
+        return rows
+
+    def append(self, client_name: str, metrics: Dict[str, float],
+               timestamp: float = None):
+        """Record one sample of a client's metrics."""
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self._lock:
+            rows = self._head(client_name)
+            if rows and (self._segment_file(client_name, 'raw', rows[0][0])
+                         != self._segment_file(client_name, 'raw', timestamp)):
+                self._seal(client_name)  # blocks never straddle segments
+                rows = self._head(client_name)
+            rows.append((timestamp, metrics))
+            os.makedirs(os.path.join(self.root, client_name), exist_ok=True)
+            with open(self._head_file(client_name), 'a') as f:
+                f.write(f"{json.dumps([timestamp, metrics])}\n")
+            if len(rows) >= self.block_rows:
+                self._seal(client_name)
+
+    def _seal(self, client_name: str):
+        rows = sorted(self._head(client_name), key=lambda row: row[0])
+        if not rows:
+            return
+        names = sorted({name for _, metrics in rows for name in metrics})
+        self._write_block(
+            client_name, 'raw',
+            array('d', (timestamp for timestamp, _ in rows)),
+            {name: array('d', (metrics.get(name, NAN) for _, metrics in rows))
+             for name in names}
+        )
+        open(self._head_file(client_name), 'w').close()
+        self._heads[client_name] = []
+
+    def _write_block(self, client_name: str, tier: str, timestamps: array,
+                     columns: Dict[str, array]):
+        segment_file = self._segment_file(client_name, tier, timestamps[0])
+        os.makedirs(os.path.dirname(segment_file), exist_ok=True)
+        self._repair(segment_file)
+        with open(segment_file, 'ab') as f:
+            f.write(encode_block(timestamps, columns))
+
+    def _repair(self, segment_file: str):
+        """Cut a torn block off the end before appending after it."""
+        if segment_file in self._repaired:
+            return
+        self._repaired.add(segment_file)
+        if not os.path.exists(segment_file):
+            return
+        valid = 0
+        for offset, _, _, _, payload in scan_blocks(segment_file):
+            valid = offset + BLOCK_HEADER.size + len(payload)
+        if valid < os.path.getsize(segment_file):
+            logger.warning(f"Truncating torn block in {segment_file}")
+            with open(segment_file, 'r+b') as f:
+                f.truncate(valid)
+
+    def flush(self, client_name: str = None):
+        """Seal unsealed samples of one or all clients into blocks."""
+        with self._lock:
+            for name in [client_name] if client_name else list(self._heads):
+                self._seal(name)
+
+    # Reading
+
+    def _bounds(self, client_name: str,
+                tier: str) -> Tuple[Optional[float], Optional[float]]:
+        """First and last sealed timestamp in a tier."""
+        segments = self._segments(client_name, tier)
+        first = last = None
+        for _, segment_file in segments[:1]:
+            for _, _, block_first, _, _ in scan_blocks(segment_file, False):
+                first = block_first if first is None else min(first, block_first)
+        for _, segment_file in reversed(segments):
+            for _, _, _, block_last, _ in scan_blocks(segment_file, False):
+                last = block_last if last is None else max(last, block_last)
+            if last is not None:
+                break
+        return first, last
+
+    def _read(self, client_name: str, tier: str, start: float, end: float,
+              names: Iterable[str] = None) -> Tuple[array, Dict[str, array]]:
+        """Sealed rows with start <= timestamp < end, in time order."""
+        span = dict((name, span) for name, _, span in TIERS)[tier]
+        timestamps = array('d')
+        columns: Dict[str, array] = {}
+        if names is not None:
+            columns = {name: array('d') for name in names}
+
+        for segment_start, segment_file in self._segments(client_name, tier):
+            if segment_start >= end or segment_start + span <= start:
+                continue
+            for _, _, first, last, payload in scan_blocks(segment_file):
+                if last < start or first >= end:
+                    continue
+                block_times, block_columns = decode_block(payload)
+                low = bisect_left(block_times, start)
+                high = bisect_left(block_times, end)
+                if low >= high:
+                    continue
+                filled = len(timestamps)
+                timestamps.extend(block_times[low:high])
+                wanted = block_columns if names is None else columns
+                for name in wanted:
+                    column = columns.get(name)
+                    if column is None:
+                        column = columns[name] = array('d', [NAN]) * filled
+                    if name in block_columns:
+                        column.extend(block_columns[name][low:high])
+                    else:
+                        column.extend(array('d', [NAN]) * (high - low))
+                for column in columns.values():
+                    if len(column) < len(timestamps):
+                        missing = len(timestamps) - len(column)
+                        column.extend(array('d', [NAN]) * missing)
+
+        if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            timestamps = array('d', (timestamps[i] for i in order))
+            columns = {name: array('d', (column[i] for i in order))
+                       for name, column in columns.items()}
+        return timestamps, columns
+
+    def _pick_tier(self, client_name: str, start: float) -> str:
+        """Finest tier holding data from ``start``, else the longest history."""
+        oldest = {}
+        for name, resolution, _ in TIERS:
+            first = self._bounds(client_name, name)[0]
+            if name == 'raw':
+                head = self._head(client_name)
+                if head:
+                    first = min(first, head[0][0]) if first is not None else head[0][0]
+            if first is not None:
+                # A bucket's row stands for the interval after its timestamp
+                oldest[name] = first + resolution
+        for name, _, _ in TIERS:
+            if name in oldest and oldest[name] <= start:
+                return name
+        if not oldest:
+            return 'raw'
+        return min(oldest, key=oldest.get)
+
+    def query(self, client_name: str, metrics: List[str], start: float,
+              end: float = None, tier: str = None, aggregate: str = 'mean') -> dict:
+        """Read metrics over [start, end) from one tier.
+
+        Without ``tier`` the finest tier that reaches back to ``start`` is
+        used. Downsampled tiers return the ``aggregate`` of each bucket.
+        Missing values are None.
+        """
+        try:
+            if aggregate not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate: {aggregate}")
+            end = self.clock() + 1 if end is None else end
+            with self._lock:
+                tier = tier or self._pick_tier(client_name, start)
+                names = [metric if tier == 'raw' else f"{metric}:{aggregate}"
+                         for metric in metrics]
+                timestamps, columns = self._read(client_name, tier, start, end, names)
+                timestamps = list(timestamps)
+                values = {metric: list(columns[name])
+                          for metric, name in zip(metrics, names)}
+                if tier == 'raw':
+                    for timestamp, sample in sorted(self._head(client_name),
+                                                    key=lambda row: row[0]):
+                        if start <= timestamp < end:
+                            timestamps.append(timestamp)
+                            for metric in metrics:
+                                values[metric].append(sample.get(metric, NAN))
+
+            return {
+                'status': 'success',
+                'tier': tier,
+                'timestamps': timestamps,
+                'series': {
+                    metric: [None if math.isnan(v) else v for v in series]
+                    for metric, series in values.items()
+                }
+            }
+        except Exception as e:
+            logger.error(f"History query for {client_name} failed: {str(e)}")
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+
+    # Downsampling and retention
+
+    def _rollup(self, client_name: str, source: tuple, target: tuple) -> int:
+        """Aggregate completed buckets of one tier into the next."""
+        source_name, source_resolution, _ = source
+        target_name, resolution, _ = target
+        last_source = self._bounds(client_name, source_name)[1]
+        if last_source is None:
+            return 0
+        # Only buckets that sealed source data has fully passed
+        horizon = (
+            math.floor((last_source + source_resolution) / resolution)
+            * resolution
+        )
+        last_target = self._bounds(client_name, target_name)[1]
+        start = last_target + resolution if last_target is not None else -math.inf
+        if horizon <= start:
+            return 0
+
+        timestamps, columns = self._read(client_name, source_name, start, horizon)
+        if not timestamps:
+            return 0
+        buckets = []
+        bounds = []
+        for index, timestamp in enumerate(timestamps):
+            bucket = math.floor(timestamp / resolution) * resolution
+            if not buckets or buckets[-1] != bucket:
+                buckets.append(bucket)
+                bounds.append(index)
+        bounds.append(len(timestamps))
+
+        rolled = {}
+        for name, column in columns.items():
+            if source_resolution:
+                metric, _, kind = name.rpartition(':')
+            else:
+                metric, kind = name, ''
+            for aggregate in AGGREGATES:
+                if source_resolution and kind != aggregate:
+                    continue
+                values = array('d')
+                for low, high in zip(bounds, bounds[1:]):
+                    present = [v for v in column[low:high] if not math.isnan(v)]
+                    if not present:
+                        values.append(NAN)
+                    elif aggregate == 'mean':
+                        values.append(sum(present) / len(present))
+                    else:
+                        pick = min if aggregate == 'min' else max
+                        values.append(pick(present))
+                rolled[f"{metric}:{aggregate}"] = values
+
+        # Split by target segment so no block straddles two files
+        bucket_times = array('d', buckets)
+        first = 0
+        for index in range(1, len(buckets) + 1):
+            if (index == len(buckets)
+                    or self._segment_file(client_name, target_name, buckets[index])
+                    != self._segment_file(client_name, target_name, buckets[first])):
+                self._write_block(
+                    client_name, target_name, bucket_times[first:index],
+                    {name: values[first:index] for name, values in rolled.items()}
+                )
+                first = index
+        return len(buckets)
+
+    def _expire(self, client_name: str, now: float) -> int:
+        removed = 0
+        for position, (name, _, span) in enumerate(TIERS):
+            cutoff = now - self.retention[name]
+            # Keep finer data until the next tier has rolled it up
+            if position + 1 < len(TIERS):
+                next_name, next_resolution, _ = TIERS[position + 1]
+                rolled = self._bounds(client_name, next_name)[1]
+                cutoff = min(cutoff, rolled + next_resolution
+                             if rolled is not None else -math.inf)
+            for start, segment_file in self._segments(client_name, name):
+                if start + span <= cutoff:
+                    os.remove(segment_file)
+                    removed += 1
+        return removed
+
+    def _trim(self, client_name: str) -> int:
+        """Drop the oldest finest segments while a client is over budget."""
+        removed = 0
+        while True:
+            segments = [
+                (position, start, segment_file)
+                for position, (name, _, _) in enumerate(TIERS)
+                for start, segment_file in self._segments(client_name, name)[:-1]
+            ]
+            usage = sum(
+                os.path.getsize(segment_file)
+                for name, _, _ in TIERS
+                for _, segment_file in self._segments(client_name, name)
+            )
+            if usage <= self.max_bytes or not segments:
+                return removed
+            _, _, segment_file = min(segments)
+            logger.warning(
+                f"{client_name} history over budget, removing {segment_file}"
+            )
+            os.remove(segment_file)
+            removed += 1
+
+    def maintain(self) -> dict:
+        """Seal stale heads, downsample, and enforce retention and size caps."""
+        try:
+            now = self.clock()
+            rolled_up = removed = 0
+            with self._lock:
+                for client_name in self.clients():
+                    head = self._head(client_name)
+                    if head and now - min(row[0] for row in head) >= self.max_head_age:
+                        self._seal(client_name)
+                    for source, target in zip(TIERS, TIERS[1:]):
+                        rolled_up += self._rollup(client_name, source, target)
+                    removed += self._expire(client_name, now)
+                    if self.max_bytes:
+                        removed += self._trim(client_name)
+            return {
+                'status': 'success',
+                'rolled_up': rolled_up,
+                'removed_segments': removed
+            }
+        except Exception as e:
+            logger.error(f"Time-series maintenance failed: {str(e)}")
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
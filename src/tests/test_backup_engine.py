@@ -0,0 +1,1103 @@
+"""
+EASY_SECURE Backup Engine Tests
+"""
+import os
+import json
+import sys
+import shutil
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.easy_secure.backup_config import BackupConfig
+from src.easy_secure.backup_manager import BackupManager
+from src.easy_secure.archive import ArchiveReader
+from src.easy_secure.chunk_store import Chunker, ChunkStore
+from src.easy_secure.copy_pipeline import copy_and_hash, hash_file
+from src.easy_secure.manifest import load_manifest
+from src.easy_secure.merkle import MerkleTree
+from src.easy_secure.parallel_engine import ParallelBackupEngine
+from src.easy_secure.retention import GarbageCollector, RetentionPolicy
+from src.easy_secure.scheduler import BackupScheduler
+from src.easy_secure.throttle import Throttle, TokenBucket
+from src.easy_secure.load_governor import LoadGovernor
+from src.easy_secure.continuous import ContinuousProtector, DirtyJournal
+from src.easy_secure.replication import Replicator
+from src.benchmarks import backup_benchmark
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run each test from an empty working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_tree(root, files):
+    """Create a source tree from a {relative path: bytes} mapping."""
+    for rel_path, data in files.items():
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    return str(root)
+
+
+class _Reader:
+    """Minimal stream that returns data in small reads."""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def read(self, size):
+        chunk = self.data[self.pos:self.pos + min(size, 5000)]
+        self.pos += len(chunk)
+        return chunk
+
+
+def test_chunker_boundaries_are_content_defined():
+    chunker = Chunker(min_size=64, avg_size=256, max_size=1024)
+    data = random.Random(7).randbytes(64 * 1024)
+
+    original = list(chunker.chunks(_Reader(data)))
+    shifted = list(chunker.chunks(_Reader(b'x' * 10 + data)))
+
+    assert b''.join(original) == data
+    assert len(set(original) & set(shifted)) >= len(original) - 3
+
+
+def test_chunked_backup_deduplicates_unchanged_data(workdir):
+    source = make_tree(workdir / 'src', {
+        'a.bin': os.urandom(300 * 1024),
+        'docs/b.txt': b'hello' * 1000,
+    })
+    config = BackupConfig('acme', backup_mode='chunked')
+
+    first = config.create_backup(source)
+    second = config.create_backup(source)
+
+    assert first['status'] == 'success'
+    assert second['timestamp'] != first['timestamp']
+    info = config.get_backup_info(second['timestamp'])
+    assert info['file_count'] == 2
+    assert info['size_bytes'] == 300 * 1024 + 5000
+    assert info['new_bytes'] == 0
+    assert config.verify_backup(second['timestamp'])['is_valid']
+
+
+def test_vectorized_chunker_matches_byte_loop():
+    from src.easy_secure import chunk_store
+    if chunk_store.numpy is None:
+        pytest.skip("numpy is not installed")
+
+    data = bytearray(random.Random(3).randbytes(200 * 1024))
+    data[5000:40000] = bytes(35000)  # runs of one byte value
+    for sizes in [(64, 256, 1024), (1024, 4096, 16384), (16, 16, 16)]:
+        chunker = Chunker(*sizes)
+        offset = 0
+        while offset < len(data):
+            rest = data[offset:]
+            cut = chunker._find_boundary_vectorized(rest, len(rest))
+            assert cut == chunker._find_boundary_python(rest, len(rest))
+            offset += cut
+
+
+def test_chunk_store_handles_concurrent_writers_of_one_chunk(workdir):
+    store = ChunkStore(str(workdir / 'chunks'))
+    for trial in range(20):
+        data = random.Random(trial).randbytes(256 * 1024)
+        barrier = threading.Barrier(8)
+        results, errors = [], []
+
+        def put():
+            barrier.wait()
+            try:
+                results.append(store.put_chunk(data))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=put) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert sum(is_new for _, is_new in results) == 1
+        assert store.get_chunk(results[0][0]) == data
+    assert not [name for _, _, files in os.walk(store.root)
+                for name in files if name.endswith('.tmp')]
+
+
+def test_chunked_verify_detects_corrupt_chunk(workdir):
+    source = make_tree(workdir / 'src', {'a.bin': os.urandom(4096)})
+    config = BackupConfig('acme', backup_mode='chunked')
+    result = config.create_backup(source)
+
+    digest = next(config.chunk_store.iter_chunks())
+    with open(config.chunk_store.chunk_path(digest), 'wb') as f:
+        f.write(b'corrupt')
+
+    assert not config.verify_backup(result['timestamp'])['is_valid']
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'chunked'])
+def test_incremental_backup_copies_only_changed_files(workdir, mode):
+    source = make_tree(workdir / 'src', {
+        'keep.txt': b'unchanged',
+        'edit.txt': b'before',
+    })
+    config = BackupConfig('acme', backup_mode=mode, incremental=True)
+    first = config.create_backup(source)
+
+    make_tree(workdir / 'src', {'edit.txt': b'after!', 'new.txt': b'new'})
+    os.utime(os.path.join(source, 'edit.txt'), ns=(1, 1))
+    second = config.create_backup(source)
+
+    info = config.get_backup_info(second['timestamp'])
+    assert info['file_count'] == 3
+    assert info['changed_files'] == 2
+    assert info['new_bytes'] == len(b'after!') + len(b'new')
+    if mode == 'mirror':
+        backup_dir = second['backup_location']
+        assert not os.path.exists(os.path.join(backup_dir, 'keep.txt'))
+        manifest = load_manifest(config._manifest_file(second['timestamp']))
+        assert manifest['files']['keep.txt']['base'] == first['timestamp']
+    assert config.verify_backup(second['timestamp'])['is_valid']
+
+
+def test_copy_and_hash_streams_through_small_buffer(tmp_path):
+    data = os.urandom(100 * 1024 + 7)
+    source = tmp_path / 'big.bin'
+    source.write_bytes(data)
+
+    result = copy_and_hash(str(source), str(tmp_path / 'copy.bin'), buffer_size=4096)
+
+    assert result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert (result['size'], result['class']) == (len(data), 'small')
+    assert (tmp_path / 'copy.bin').read_bytes() == data
+
+
+@pytest.mark.parametrize('strategy', ['stream', 'kernel'])
+def test_copy_keeps_holes_of_sparse_files(tmp_path, strategy):
+    source = tmp_path / 'disk.img'
+    with open(source, 'wb') as f:
+        f.seek(32 * 1024 * 1024)
+        f.write(b'data in the middle')
+        f.truncate(64 * 1024 * 1024)
+    if os.stat(source).st_blocks * 512 >= os.stat(source).st_size:
+        pytest.skip("filesystem does not support sparse files")
+    expected = hash_file(str(source))
+
+    result = copy_and_hash(str(source), str(tmp_path / 'copy.img'), strategy=strategy)
+
+    copy_stat = os.stat(tmp_path / 'copy.img')
+    assert result['sha256'] == expected
+    assert result['class'] == 'sparse'
+    assert copy_stat.st_size == 64 * 1024 * 1024
+    assert copy_stat.st_blocks * 512 < 1024 * 1024
+
+
+def test_mirror_backup_writes_verification_in_one_pass(workdir):
+    source = make_tree(workdir / 'src', {'a.txt': b'alpha', 'sub/b.txt': b'beta'})
+    config = BackupConfig('acme')
+
+    result = config.create_backup(source)
+
+    backup_dir = result['backup_location']
+    tree = MerkleTree.load(config._tree_file(result['timestamp']))
+    assert dict(tree.iter_files()) == result['verification']
+    assert tree.root_hash == result['root_hash']
+    assert result['verification']['sub/b.txt'] == hashlib.sha256(b'beta').hexdigest()
+    assert not any(name.endswith('.journal') for name in os.listdir(config.verify_path))
+    with open(os.path.join(backup_dir, 'sub', 'b.txt'), 'rb') as f:
+        assert f.read() == b'beta'
+
+
+@pytest.mark.parametrize('mode,worker_type', [
+    ('mirror', 'thread'), ('chunked', 'thread'), ('chunked', 'process')
+])
+def test_parallel_backup_matches_serial_manifest(workdir, mode, worker_type):
+    source = make_tree(workdir / 'src', {
+        f'dir{i % 3}/file{i}.bin': os.urandom(1000 + i) for i in range(40)
+    })
+    serial = BackupConfig('serial', backup_mode=mode)
+    parallel = BackupConfig(
+        'parallel', backup_mode=mode, workers=4, worker_type=worker_type
+    )
+
+    serial_ts = serial.create_backup(source)['timestamp']
+    parallel_ts = parallel.create_backup(source)['timestamp']
+
+    serial_files = load_manifest(serial._manifest_file(serial_ts))['files']
+    parallel_files = load_manifest(parallel._manifest_file(parallel_ts))['files']
+    assert list(parallel_files.items()) == list(serial_files.items())
+    assert parallel.verify_backup(parallel_ts)['is_valid']
+
+
+def test_engine_respects_shared_worker_cap():
+    limiter = threading.BoundedSemaphore(2)
+    engine = ParallelBackupEngine(workers=6, limiter=limiter)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def task(item):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.01)
+        with lock:
+            state['running'] -= 1
+        return item * 2
+
+    assert list(engine.map(task, range(20))) == [i * 2 for i in range(20)]
+    assert state['peak'] <= 2
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'chunked'])
+def test_verify_tiers_report_failed_files(workdir, mode):
+    source = make_tree(workdir / 'src', {
+        'a.txt': b'a' * 100, 'b.txt': b'b' * 100, 'c.txt': b'c' * 100
+    })
+    config = BackupConfig('acme', backup_mode=mode, workers=3)
+    timestamp = config.create_backup(source)['timestamp']
+    manifest = load_manifest(config._manifest_file(timestamp))
+
+    # Same size, different content: only the deep tier can notice
+    if mode == 'mirror':
+        damaged = os.path.join(config.backup_root, timestamp, 'b.txt')
+        stat = os.stat(damaged)
+        with open(damaged, 'wb') as f:
+            f.write(b'x' * 100)
+        os.utime(damaged, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    else:
+        digest = manifest['files']['b.txt']['chunks'][0]
+        with open(config.chunk_store.chunk_path(digest), 'wb') as f:
+            f.write(b'x' * 100)
+
+    quick = config.verify_backup(timestamp, level='quick')
+    deep = config.verify_backup(timestamp, level='deep')
+
+    assert quick['is_valid'] and quick['checked_files'] == 3
+    assert not deep['is_valid']
+    assert deep['failed_files'] == [{'path': 'b.txt', 'reason': 'hash'}]
+
+
+def test_verify_fail_fast_stops_at_first_mismatch(workdir):
+    source = make_tree(workdir / 'src', {f'f{i}.txt': b'data' for i in range(10)})
+    config = BackupConfig('acme')
+    timestamp = config.create_backup(source)['timestamp']
+    for i in range(10):
+        os.remove(os.path.join(config.backup_root, timestamp, f'f{i}.txt'))
+
+    result = config.verify_backup(level='quick', fail_fast=True)
+
+    assert result['timestamp'] == timestamp
+    assert result['failed_files'] == [{'path': 'f0.txt', 'reason': 'missing'}]
+
+
+def test_merkle_tree_diff_skips_equal_subtrees():
+    old = MerkleTree.from_hashes({
+        'same/a.txt': 'aa' * 32, 'same/b.txt': 'bb' * 32,
+        'work/c.txt': 'cc' * 32, 'gone.txt': 'dd' * 32,
+    })
+    new = MerkleTree.from_hashes({
+        'same/a.txt': 'aa' * 32, 'same/b.txt': 'bb' * 32,
+        'work/c.txt': 'ee' * 32, 'work/new/d.txt': 'ff' * 32,
+    })
+
+    assert old.node('same')[0] == new.node('same')[0]
+    assert old.diff(new) == {
+        'added': ['work/new/d.txt'],
+        'removed': ['gone.txt'],
+        'changed': ['work/c.txt'],
+    }
+
+
+def test_subtree_verification_and_backup_diff(workdir):
+    source = make_tree(workdir / 'src', {
+        'docs/a.txt': b'a', 'docs/b.txt': b'b', 'data/c.bin': b'c'
+    })
+    config = BackupConfig('acme', incremental=True)
+    first = config.create_backup(source)['timestamp']
+    make_tree(workdir / 'src', {'data/c.bin': b'changed'})
+    second = config.create_backup(source)['timestamp']
+
+    os.remove(os.path.join(config.backup_root, second, 'data', 'c.bin'))
+
+    docs = config.verify_backup(second, subtree='docs')
+    data = config.verify_backup(second, subtree='data')
+    diff = config.diff_backups(first, second)
+
+    assert docs['is_valid'] and docs['checked_files'] == 2
+    assert data['failed_files'] == [{'path': 'data/c.bin', 'reason': 'missing'}]
+    assert diff['changed'] == ['data/c.bin']
+    assert diff['added'] == diff['removed'] == []
+
+
+def test_catalog_answers_listing_and_info_without_walking(workdir, monkeypatch):
+    source = make_tree(workdir / 'src', {'a.txt': b'alpha', 'sub/b.txt': b'beta'})
+    legacy = BackupConfig('acme')
+    legacy_ts = legacy.create_backup(source)['timestamp']
+
+    manager = BackupManager(catalog_path=str(workdir / 'catalog.db'))
+    manager.add_client('acme')
+    latest = manager.create_backup('acme', source)['timestamp']
+
+    def no_walk(*args, **kwargs):
+        raise AssertionError("catalog queries must not walk the tree")
+    monkeypatch.setattr(os, 'walk', no_walk)
+
+    assert manager.get_client_backups('acme') == [latest, legacy_ts]
+    info = manager.get_backup_info('acme')
+    assert info['timestamp'] == latest
+    assert (info['file_count'], info['size_bytes']) == (2, 9)
+    files = manager.catalog.snapshot_files('acme', latest, prefix='sub')
+    assert [f['path'] for f in files] == ['sub/b.txt']
+
+
+def test_linked_snapshots_share_unchanged_files(workdir):
+    source = make_tree(workdir / 'src', {'same.bin': b's' * 5000, 'edit.txt': b'v1'})
+    config = BackupConfig('acme', backup_mode='linked', link_method='hardlink')
+    first = config.create_backup(source)
+
+    make_tree(workdir / 'src', {'edit.txt': b'v2!'})
+    second = config.create_backup(source)
+
+    assert first['bytes_written'] == 5002
+    assert second['bytes_written'] == 3
+    old_dir, new_dir = first['backup_location'], second['backup_location']
+    assert sorted(os.listdir(new_dir)) == ['edit.txt', 'same.bin']
+    assert os.stat(os.path.join(new_dir, 'same.bin')).st_ino == (
+        os.stat(os.path.join(old_dir, 'same.bin')).st_ino
+    )
+    with open(os.path.join(old_dir, 'edit.txt'), 'rb') as f:
+        assert f.read() == b'v1'
+    assert config.verify_backup(second['timestamp'])['is_valid']
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+def test_archive_backup_compresses_into_seekable_segments(workdir, codec):
+    source = make_tree(workdir / 'src', {
+        'notes.txt': b'quarterly report line\n' * 20000,
+        'empty.txt': b'',
+        'sub/data.bin': os.urandom(3000),
+    })
+    config = BackupConfig(
+        'acme', backup_mode='archive', compression=codec, compression_level=1,
+        workers=3
+    )
+    result = config.create_backup(source)
+
+    manifest = load_manifest(config._manifest_file(result['timestamp']))
+    entry = manifest['files']['notes.txt']
+    assert len(entry['blocks']) == 1 and entry['codec'] == codec
+    assert result['bytes_written'] < 20000
+    assert os.listdir(result['backup_location']) == ['segment_00000.seg']
+
+    with ArchiveReader(result['backup_location']) as reader:
+        data = b''.join(reader.read_blocks(manifest['files']['sub/data.bin']))
+    with open(os.path.join(source, 'sub', 'data.bin'), 'rb') as f:
+        assert data == f.read()
+    assert config.verify_backup(result['timestamp'])['is_valid']
+    assert config.verify_backup(result['timestamp'], level='quick')['is_valid']
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'chunked', 'linked', 'archive'])
+def test_selective_restore_in_parallel(workdir, mode):
+    files = {
+        'docs/report.txt': b'report',
+        'docs/old/notes.txt': b'notes',
+        'photos/cat.jpg': os.urandom(2000),
+        'readme.md': b'readme',
+    }
+    source = make_tree(workdir / 'src', files)
+    os.utime(os.path.join(source, 'readme.md'), ns=(10**18, 10**18))
+    config = BackupConfig('acme', backup_mode=mode, workers=4)
+    config.create_backup(source)
+    updates = []
+
+    result = config.restore_backup(
+        str(workdir / 'out'), patterns=['docs', '*.md'], newest_first=True,
+        progress=updates.append
+    )
+
+    assert result['is_complete']
+    assert result['files_done'] == 3
+    assert updates[-1]['files_done'] == 3
+    for rel_path in ('docs/report.txt', 'docs/old/notes.txt', 'readme.md'):
+        with open(workdir / 'out' / rel_path, 'rb') as f:
+            assert f.read() == files[rel_path]
+    assert not (workdir / 'out' / 'photos' / 'cat.jpg').exists()
+    assert os.stat(workdir / 'out' / 'readme.md').st_mtime_ns == 10**18
+
+
+def test_restore_reports_corrupt_files(workdir):
+    source = make_tree(workdir / 'src', {'a.txt': b'good', 'b.txt': b'fine'})
+    config = BackupConfig('acme')
+    result = config.create_backup(source)
+    with open(os.path.join(result['backup_location'], 'b.txt'), 'wb') as f:
+        f.write(b'evil')
+
+    restored = config.restore_backup(str(workdir / 'out'))
+
+    assert restored['failed_files'] == [{'path': 'b.txt', 'reason': 'hash'}]
+    assert not (workdir / 'out' / 'b.txt').exists()
+
+
+def test_retention_policy_keeps_gfs_snapshots():
+    timestamps = [
+        '20240131_020000', '20240215_020000', '20240228_020000',
+        '20240304_020000', '20240310_020000', '20240311_020000',
+        '20240311_140000', '20240312_020000', 'not-a-timestamp'
+    ]
+    policy = RetentionPolicy(daily=2, weekly=2, monthly=2)
+
+    kept, expired = policy.select(timestamps)
+
+    assert kept == [
+        'not-a-timestamp', '20240312_020000', '20240311_140000',
+        '20240310_020000', '20240228_020000'
+    ]
+    assert expired == [
+        '20240131_020000', '20240215_020000', '20240304_020000',
+        '20240311_020000'
+    ]
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'chunked', 'archive'])
+def test_garbage_collection_keeps_referenced_data(workdir, mode):
+    source = make_tree(workdir / 'src', {
+        'stable.bin': os.urandom(300 * 1024),
+        'docs/changing.txt': b'v0'
+    })
+    manager = BackupManager(catalog_path=str(workdir / 'catalog.db'))
+    manager.add_client(
+        'acme', backup_mode=mode, incremental=True,
+        retention=RetentionPolicy(daily=1, weekly=0, monthly=0)
+    )
+    config = manager.clients['acme']
+    stamps = iter(['20240101_020000', '20240102_020000', '20240103_020000'])
+    config._new_timestamp = lambda: next(stamps)
+    for version in range(3):
+        with open(os.path.join(source, 'docs', 'changing.txt'), 'w') as f:
+            f.write(f'version {version}' * 1000)
+        assert manager.create_backup('acme', source)['status'] == 'success'
+
+    result = manager.collect_garbage('acme')
+
+    stats = result['clients']['acme']
+    assert stats['expired'] == ['20240101_020000', '20240102_020000']
+    assert stats['reclaimed_bytes'] >= 2 * 9000
+    assert manager.get_client_backups('acme') == ['20240103_020000']
+    assert sorted(os.listdir(config.backup_root)) == ['20240103_020000']
+    assert not os.listdir(config.trash_root)
+    assert manager.verify_backup('acme')['is_valid']
+    info = manager.get_backup_info('acme')
+    assert info['garbage_collection']['reclaimed_bytes'] == stats['reclaimed_bytes']
+    assert info['garbage_collection']['expired_snapshots'] == 2
+
+    restored = manager.restore_backup('acme', str(workdir / 'out'))
+    assert restored['is_complete'] and restored['files_done'] == 2
+    assert hash_file(str(workdir / 'out' / 'stable.bin')) == hash_file(
+        os.path.join(source, 'stable.bin')
+    )
+
+
+def test_integrated_services_run_the_garbage_collector(workdir):
+    from src.integration.system_integrator import SystemIntegrator
+
+    integrator = SystemIntegrator()
+    integrator.check_interval = 0.05
+    integrator.monitor_manager.check_interval = 0.05
+    integrator.start_services()
+    try:
+        manager = integrator.backup_manager
+        assert manager._gc_thread is not None and manager._gc_thread.is_alive()
+        assert integrator.scheduler_thread.is_alive()
+    finally:
+        integrator.stop_services()
+
+    assert manager._gc_thread is None
+    assert integrator.scheduler_thread is None
+    assert manager.scheduler._closed
+
+
+def test_scheduler_spreads_jobs_inside_window_by_priority():
+    scheduler = BackupScheduler(
+        lambda client, path: {"status": "success"}, max_concurrent=2,
+        window_start="02:00", window_hours=1.0, default_estimate=600.0
+    )
+    for index in range(6):
+        scheduler.add_job(f"client{index}", "/data", priority=index % 2)
+    scheduler._history['client0'].extend([1200.0, 1100.0, 1300.0])
+    window = datetime(2024, 3, 12, 2, 0)
+
+    plan = scheduler.plan(window)
+
+    clients = [job.client_name for _, job in plan]
+    assert clients[:3] == ['client1', 'client3', 'client5']
+    assert clients[3] == 'client0'
+    starts = [start for start, _ in plan]
+    assert starts == sorted(starts) and starts[0] == window
+    assert len(set(starts)) == len(starts)
+    finishes = [
+        (start - window).total_seconds() + scheduler.estimate(job.client_name)
+        for start, job in plan
+    ]
+    assert max(finishes) <= 3600
+    assert scheduler.next_window(datetime(2024, 3, 12, 4, 0)) == datetime(
+        2024, 3, 13, 2, 0
+    )
+    scheduler.shutdown()
+
+
+def test_scheduler_bounds_concurrent_jobs():
+    running = []
+    peak = []
+    release = threading.Event()
+
+    def run_job(client, path):
+        running.append(client)
+        peak.append(len(running))
+        release.wait(5)
+        running.remove(client)
+        return {"status": "success"}
+
+    scheduler = BackupScheduler(run_job, max_concurrent=2, default_estimate=1.0)
+    for index in range(4):
+        scheduler.add_job(f"client{index}", "/data")
+
+    late = datetime(2024, 3, 12, 5, 59)
+    assert scheduler.run_pending(late) == 2
+    assert scheduler.run_pending(late) == 0
+    release.set()
+    deadline = time.time() + 5
+    started = 2
+    while started < 4 and time.time() < deadline:
+        started += scheduler.run_pending(late)
+        time.sleep(0.01)
+    scheduler.shutdown()
+
+    assert started == 4
+    assert max(peak) <= 2
+    assert len(scheduler._history['client0']) == 1
+
+
+def test_scheduler_shutdown_drops_pending_jobs():
+    ran = []
+    release = threading.Event()
+
+    def run_job(client, path):
+        ran.append(client)
+        release.wait(5)
+        return {"status": "success"}
+
+    scheduler = BackupScheduler(run_job, max_concurrent=1, default_estimate=1.0)
+    for index in range(3):
+        scheduler.add_job(f"client{index}", "/data")
+
+    late = datetime(2024, 3, 12, 5, 59)
+    assert scheduler.run_pending(late) == 1
+    scheduler.shutdown(wait=False)
+    release.set()
+    assert scheduler.run_pending(late) == 0
+    scheduler.shutdown(wait=True)
+
+    assert len(ran) == 1
+    assert scheduler.run_pending(late) == 0
+
+
+def test_token_bucket_paces_and_adjusts_live():
+    bucket = TokenBucket(rate=1000)
+    started = time.perf_counter()
+    bucket.consume(1000)
+    bucket.consume(400)
+    assert time.perf_counter() - started >= 0.35
+
+    bucket.set_rate(None)
+    started = time.perf_counter()
+    bucket.consume(10 ** 9)
+    assert time.perf_counter() - started < 0.1
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_throttle_applies_to_backup_and_verify(workdir, workers):
+    source = make_tree(workdir / 'src', {
+        'big.bin': os.urandom(3 * 1024 * 1024),
+        'small.txt': b'small'
+    })
+    manager = BackupManager(catalog_path=str(workdir / 'catalog.db'))
+    manager.add_client('acme', workers=workers)
+    assert manager.set_throttle('acme', bytes_per_sec=2 * 1024 * 1024)
+    assert manager.clients['acme'].throttle.parent is manager.throttle
+
+    started = time.perf_counter()
+    assert manager.create_backup('acme', source)['status'] == 'success'
+    assert time.perf_counter() - started >= 0.4
+
+    started = time.perf_counter()
+    assert manager.verify_backup('acme')['is_valid']
+    assert time.perf_counter() - started >= 0.4
+
+    assert manager.set_throttle('acme')
+    assert manager.set_throttle(files_per_sec=1)
+    started = time.perf_counter()
+    assert manager.verify_backup('acme', level='quick')['is_valid']
+    assert time.perf_counter() - started >= 0.9
+
+
+def test_load_governor_pauses_slows_and_recovers():
+    load = {'cpu_percent': 10.0, 'memory_percent': 20.0}
+    throttle = Throttle()
+    governor = LoadGovernor(
+        throttle, lambda: dict(load), min_bytes_per_sec=1000
+    )
+    assert governor.step() == "full"
+
+    throttle.consume(nbytes=100 * 1024 * 1024)
+    time.sleep(0.05)
+    load['cpu_percent'] = 80.0
+    assert governor.step() == "slowed"
+    limit = throttle.bytes.rate
+    assert 1000 <= limit < 100 * 1024 * 1024 / 0.05
+
+    load['disk_busy_percent'] = 99.0
+    assert governor.step() == "paused"
+    done = threading.Event()
+    worker = threading.Thread(
+        target=lambda: (throttle.consume(files=1), done.set())
+    )
+    worker.start()
+    assert not done.wait(0.1)
+
+    load.update(cpu_percent=10.0, disk_busy_percent=5.0)
+    governor.step()
+    assert done.wait(1)
+    worker.join()
+
+    # Idle host and jobs below the limit: the limit is lifted
+    time.sleep(0.05)
+    assert governor.step() == "full"
+    assert throttle.limits() == {'bytes_per_sec': None, 'files_per_sec': None}
+
+
+def _manifest_hashes(config, backup_timestamp):
+    manifest = load_manifest(config._manifest_file(backup_timestamp))
+    files = {path: entry['sha256'] for path, entry in manifest['files'].items()}
+    return files, sorted(manifest['dirs'])
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'chunked', 'linked', 'archive'])
+def test_changed_paths_snapshot_matches_full_scan(workdir, mode):
+    source = make_tree(workdir / 'src', {
+        'keep.txt': b'keep',
+        'edit.txt': b'before',
+        'gone/old.txt': b'old',
+        'deep/a/b.txt': b'b'
+    })
+    config = BackupConfig('acme', backup_mode=mode, incremental=True)
+    config.create_backup(source)
+
+    make_tree(source, {'edit.txt': b'after', 'new/dir/c.txt': b'c'})
+    shutil.rmtree(os.path.join(source, 'gone'))
+    changed = config.create_backup(source, ['edit.txt', 'new', 'gone'])
+    full = BackupConfig('full', backup_mode=mode).create_backup(source)
+
+    assert changed['status'] == 'success'
+    assert _manifest_hashes(config, changed['timestamp']) == _manifest_hashes(
+        BackupConfig('full'), full['timestamp']
+    )
+    out = workdir / 'out'
+    assert config.restore_backup(str(out))['is_complete']
+    assert (out / 'edit.txt').read_bytes() == b'after'
+    assert (out / 'keep.txt').read_bytes() == b'keep'
+    assert not (out / 'gone').exists()
+
+
+def test_dirty_journal_survives_restart_and_failed_snapshot(tmp_path):
+    journal_file = str(tmp_path / 'dirty.journal')
+    journal = DirtyJournal(journal_file)
+    journal.add(['a.txt', 'docs'])
+    journal.close()
+
+    journal = DirtyJournal(journal_file)
+    assert journal.paths == {'a.txt', 'docs'} and not journal.rescan
+    paths, rescan = journal.take()
+    journal.add(['b.txt'])
+    journal.restore()
+    assert journal.paths == {'a.txt', 'b.txt', 'docs'}
+
+    journal.take()
+    journal.commit()
+    journal.close()
+    assert not DirtyJournal(journal_file).pending
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify")
+def test_continuous_protection_snapshots_only_changed_paths(workdir):
+    source = make_tree(workdir / 'src', {'a.txt': b'a', 'sub/b.txt': b'b'})
+    config = BackupConfig('acme', incremental=True)
+    calls = []
+
+    def run_snapshot(paths):
+        calls.append(paths)
+        return config.create_backup(source, paths)
+
+    protector = ContinuousProtector(
+        source, str(workdir / 'dirty.journal'), run_snapshot, interval=0
+    )
+    protector.run_once(0)
+    assert calls == [None]
+
+    make_tree(source, {'sub/b.txt': b'B', 'new/deep/c.txt': b'c'})
+    make_tree(source, {'new/deep/d.txt': b'd'})
+    os.remove(os.path.join(source, 'a.txt'))
+    protector.run_once(0.2)
+    protector.stop()
+
+    assert {'a.txt', 'sub/b.txt', 'new'} <= set(calls[1])
+    assert 'sub' not in calls[1]
+    manifest = load_manifest(config._manifest_file(config._latest_backup()))
+    assert sorted(manifest['files']) == [
+        'new/deep/c.txt', 'new/deep/d.txt', 'sub/b.txt'
+    ]
+    assert manifest['scan'] == 'changed'
+
+
+@pytest.mark.parametrize('mode', ['mirror', 'linked'])
+def test_interrupted_backup_resumes_from_checkpoint(workdir, monkeypatch, mode):
+    from src.easy_secure import backup_config
+
+    files = {f'{name}.txt': name.encode() * 100 for name in 'abcdef'}
+    source = make_tree(workdir / 'src', files)
+    config = BackupConfig('acme', backup_mode=mode)
+    copied = []
+
+    def failing_copy(src, dst, *args, **kwargs):
+        if src.endswith('d.txt'):
+            raise OSError("disk unplugged")
+        copied.append(os.path.basename(src))
+        return copy_and_hash(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(backup_config, 'copy_and_hash', failing_copy)
+    assert config.create_backup(source)['status'] == 'error'
+    assert config.list_backups() == []
+    first = list(copied)
+    assert first
+
+    # The resumed run reuses the snapshot and copies only the rest
+    make_tree(source, {'a.txt': b'edited'})
+    copied.clear()
+    monkeypatch.setattr(backup_config, 'copy_and_hash', lambda *a, **k: (
+        copied.append(os.path.basename(a[0])) or copy_and_hash(*a, **k)
+    ))
+    result = config.create_backup(source)
+
+    assert result['status'] == 'success'
+    assert result['resumed_files'] == len(first)
+    assert sorted(copied) == sorted(
+        {'a.txt'} | set(files) - set(first)
+    )
+    assert config.list_backups() == [result['timestamp']]
+    assert config.verify_backup(result['timestamp'])['is_valid']
+    assert not [name for name in os.listdir(config.verify_path)
+                if name.startswith('checkpoint_')]
+
+
+def test_resumed_archive_backup_redoes_files_whose_data_was_lost(
+        workdir, monkeypatch):
+    from src.easy_secure import archive
+    from src.easy_secure.checkpoint import CheckpointJournal
+
+    files = {f'f{i:04d}': os.urandom(8192) for i in range(6)}
+    source = make_tree(workdir / 'src', files)
+    config = BackupConfig('acme', backup_mode='archive')
+    compress = archive._compress_block_task
+
+    def failing_compress(job):
+        if job[1] and job[1].endswith('f0004'):
+            raise OSError("disk unplugged")
+        return compress(job)
+
+    monkeypatch.setattr(archive, '_compress_block_task', failing_compress)
+    assert config.create_backup(source)['status'] == 'error'
+    journal_file, = config.checkpoint_files()
+    assert len(CheckpointJournal.load(journal_file)[1]) == 4
+
+    # A crash loses whatever the segment had not synced
+    staging, = [name for name in os.listdir(config.backup_root)
+                if name.startswith('.partial_')]
+    segment = os.path.join(config.backup_root, staging, archive.segment_name(0))
+    os.truncate(segment, os.path.getsize(segment) // 3)
+
+    monkeypatch.setattr(archive, '_compress_block_task', compress)
+    result = config.create_backup(source)
+    assert result['status'] == 'success'
+    assert config.verify_backup(result['timestamp'])['is_valid']
+
+
+def test_checkpoint_records_follow_the_data_sync(workdir):
+    from src.easy_secure.checkpoint import CheckpointJournal
+
+    events = []
+    journal = CheckpointJournal(str(workdir / 'journal.jsonl'), {'source': 's'},
+                                sync_interval=0.0)
+    journal.before_sync = lambda: events.append(
+        len(CheckpointJournal.load(journal.journal_file)[1])
+    )
+    journal.record('a', {'size': 1}, 1, 0, True)
+    journal.record('b', {'size': 2}, 2, 0, True)
+    journal.close()
+
+    # Each sync ran before any of its records were written
+    assert events == [0, 1]
+    assert sorted(CheckpointJournal.load(journal.journal_file)[1]) == ['a', 'b']
+
+
+def test_garbage_collection_keeps_chunks_of_interrupted_backup(workdir, monkeypatch):
+    from src.easy_secure.chunk_store import ChunkStore
+
+    source = make_tree(workdir / 'src', {'a.bin': os.urandom(64 * 1024)})
+    config = BackupConfig('acme', backup_mode='chunked',
+                          retention=RetentionPolicy(daily=1, weekly=0, monthly=0))
+    stamps = iter(['20240101_020000', '20240102_020000', '20240103_020000'])
+    config._new_timestamp = lambda: next(stamps)
+    for _ in range(2):
+        assert config.create_backup(source)['status'] == 'success'
+        os.remove(os.path.join(source, 'a.bin'))
+        make_tree(source, {'a.bin': os.urandom(64 * 1024)})
+
+    # The third run stores a.bin's chunks, then dies on d.bin
+    make_tree(source, {'d.bin': os.urandom(1024)})
+    store_file = ChunkStore.store_file
+
+    def failing_store(self, file_path, throttle=None):
+        if file_path.endswith('d.bin'):
+            raise OSError("disk unplugged")
+        return store_file(self, file_path, throttle)
+
+    monkeypatch.setattr(ChunkStore, 'store_file', failing_store)
+    assert config.create_backup(source)['status'] == 'error'
+
+    stats = GarbageCollector(config).run()
+    assert stats['expired'] == ['20240101_020000']
+    assert stats['deleted_chunks'] > 0
+
+    monkeypatch.setattr(ChunkStore, 'store_file', store_file)
+    result = config.create_backup(source)
+    assert result['status'] == 'success' and result['resumed_files'] == 1
+    assert config.verify_backup(result['timestamp'])['is_valid']
+
+
+class FakeS3:
+    """In-memory stand-in for the S3 client calls replication makes."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+        self.fail_part = None
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + 2]
+        return {
+            'Contents': [{'Key': k, 'Size': len(self.objects[k])} for k in page],
+            'IsTruncated': start + 2 < len(keys),
+            'NextContinuationToken': str(start + 2)
+        }
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append(('put', Key))
+        self.objects[Key] = bytes(Body)
+
+    def copy_object(self, Bucket, Key, CopySource):
+        self.calls.append(('copy', Key))
+        self.objects[Key] = self.objects[CopySource['Key']]
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if self.fail_part == PartNumber:
+            raise IOError("connection reset")
+        self.calls.append(('part', Key, PartNumber))
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {'ETag': hashlib.md5(Body).hexdigest()}
+
+    def list_parts(self, Bucket, Key, UploadId):
+        return {'Parts': [
+            {'PartNumber': n, 'ETag': hashlib.md5(data).hexdigest()}
+            for n, data in self.uploads[UploadId].items()
+        ]}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part['PartNumber'] for part in MultipartUpload['Parts']]
+        assert numbers == list(range(1, len(parts) + 1))
+        self.objects[Key] = b''.join(parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+
+def test_replication_resumes_multipart_uploads_and_skips_existing(workdir):
+    big = random.Random(7).randbytes(10 * 1000)
+    source = make_tree(workdir / 'src', {
+        'big.bin': big, 'small.txt': b'small', 'empty.txt': b''
+    })
+    manager = BackupManager(catalog_path=str(workdir / 'catalog.db'))
+    manager.add_client('acme', backup_mode='linked')
+    s3 = FakeS3()
+    manager.enable_replication('acme', s3, 'bucket', prefix='offsite',
+                               part_size=1000, workers=4)
+
+    s3.fail_part = 7
+    first = manager.create_backup('acme', source)
+    assert first['status'] == 'success'
+    assert first['replication']['status'] == 'error'
+    # An empty file is a put, not a server-side copy
+    puts = [c for c in s3.calls if c[0] == 'put']
+    assert f"offsite/backups/acme/{first['timestamp']}/empty.txt" in s3.objects
+    assert first['replication']['copied_objects'] == 0
+    assert first['replication']['uploaded_objects'] == len(puts)
+    assert not any(k.endswith(f"manifest_{first['timestamp']}.json")
+                   for k in s3.objects)
+
+    # Only the failed part is sent again
+    s3.fail_part = None
+    s3.calls.clear()
+    result = manager.replicate_backups('acme')
+    assert result['status'] == 'success'
+    assert [c for c in s3.calls if c[0] == 'part'] == [
+        ('part', f"offsite/backups/acme/{first['timestamp']}/big.bin", 7)
+    ]
+    assert s3.objects[f"offsite/backups/acme/{first['timestamp']}/big.bin"] == big
+
+    # Unchanged files of the next linked snapshot are copied server-side
+    make_tree(source, {'small.txt': b'changed'})
+    s3.calls.clear()
+    second = manager.create_backup('acme', source)
+    assert second['replication']['status'] == 'success'
+    assert ('copy', f"offsite/backups/acme/{second['timestamp']}/big.bin") in s3.calls
+    copies = [c for c in s3.calls if c[0] == 'copy']
+    assert second['replication']['copied_objects'] == len(copies)
+    assert second['replication']['uploaded_objects'] == len(s3.calls) - len(copies)
+    assert not [c for c in s3.calls if c[0] == 'part']
+
+    s3.calls.clear()
+    assert manager.replicate_backups('acme')['replicated'] == []
+    assert s3.calls == []
+
+
+def test_chunked_replication_uploads_each_chunk_once(workdir):
+    source = make_tree(workdir / 'src', {'a.txt': b'a' * 5000, 'b.txt': b'b'})
+    config = BackupConfig('acme', backup_mode='chunked')
+    config.create_backup(source)
+    make_tree(source, {'b.txt': b'B'})
+    config.create_backup(source)
+
+    s3 = FakeS3()
+    result = Replicator(config, s3, 'bucket', bytes_per_sec=10 ** 9).replicate()
+
+    assert result['status'] == 'success' and len(result['replicated']) == 2
+    chunk_puts = [c[1] for c in s3.calls if c[1].startswith('chunks/')]
+    assert len(chunk_puts) == len(set(chunk_puts)) == 3
+
+
+@pytest.mark.parametrize('mode', ['chunked', 'archive'])
+def test_encrypted_backup_round_trips_and_detects_tampering(workdir, mode):
+    pytest.importorskip('cryptography')
+    from src.easy_secure.encryption import KeyManager
+
+    secret = b'top secret payroll ' * 2000
+    source = make_tree(workdir / 'src', {'pay.txt': secret, 'b.txt': b'b'})
+    keys = KeyManager(str(workdir / 'keys'), master_key=b'k' * 32)
+    manager = BackupManager(catalog_path=str(workdir / 'catalog.db'),
+                            key_manager=keys)
+    manager.add_client('acme', encrypt=True, backup_mode=mode, workers=2,
+                       compression='none')
+    old = manager.create_backup('acme', source)['timestamp']
+
+    manager.rotate_client_key('acme')
+    make_tree(source, {'b.txt': b'changed'})
+    new = manager.create_backup('acme', source)['timestamp']
+
+    stored = [os.path.join(root, name) for area in ('chunks', 'backups')
+              for root, _, names in os.walk(area) for name in names]
+    assert stored and not any(
+        b'top secret' in open(path, 'rb').read() for path in stored
+    )
+    for timestamp in (old, new):
+        for level in ('quick', 'deep'):
+            assert manager.verify_backup('acme', timestamp, level)['is_valid']
+    out = workdir / 'out'
+    assert manager.restore_backup('acme', str(out), old)['is_complete']
+    assert (out / 'pay.txt').read_bytes() == secret
+
+    # Unwrapping with the wrong master key fails; flipping a byte is caught
+    with pytest.raises(ValueError):
+        KeyManager(str(workdir / 'keys'), master_key=b'x' * 32).cipher('acme')
+    target = max((p for p in stored if new not in p), key=os.path.getsize)
+    with open(target, 'r+b') as f:
+        f.seek(60)
+        byte = f.read(1)
+        f.seek(60)
+        f.write(bytes([byte[0] ^ 1]))
+    assert not manager.verify_backup('acme', old)['is_valid']
+
+
+def test_cipher_round_trips_short_key_ids_and_rejects_unfit_ones():
+    pytest.importorskip('cryptography')
+    from src.easy_secure.encryption import DataCipher
+
+    cipher = DataCipher({'k1': os.urandom(32)}, 'k1')
+    assert cipher.open(cipher.seal(b'x', b'aad'), b'aad') == b'x'
+    for key_id in ('', 'k' * 9, 'schl\u00fcssel'):
+        with pytest.raises(ValueError):
+            DataCipher({key_id: os.urandom(32)}, key_id)
+
+
+def test_benchmark_suite_measures_operations_and_flags_regressions(workdir):
+    run = backup_benchmark.run_suite(
+        ['tiny', 'sparse', 'deep'], ['mirror', 'archive'], scale=0.0005,
+        isolate=False, workdir=str(workdir / 'bench')
+    )
+    assert len(run['results']) == 3 * 2 * len(backup_benchmark.OPERATIONS)
+    assert all(r['status'] == 'success' for r in run['results'])
+    backup = run['results'][0]
+    assert backup['operation'] == 'backup' and backup['mb_per_s'] > 0
+
+    results_file = str(workdir / 'results.jsonl')
+    backup_benchmark.save_run(run, results_file)
+    slower = json.loads(json.dumps(run))
+    slower['results'][0]['seconds'] = run['results'][0]['seconds'] * 2 + 1
+    backup_benchmark.save_run(slower, results_file)
+
+    history = backup_benchmark.load_runs(results_file)
+    baseline = backup_benchmark.baseline_for(history[-1], history)
+    regressions = backup_benchmark.compare(baseline, history[-1])
+    assert [(r['scenario'], r['operation'], r['metric']) for r in regressions] == [
+        ('tiny', 'backup', 'seconds')
+    ]
+
+    # Chunking throughput is checked against the baseline and a floor
+    assert run['chunker']['mb_per_s'] > 0
+    slower['chunker']['mb_per_s'] = run['chunker']['mb_per_s'] / 2
+    assert ('chunker', 'chunking', 'mb_per_s') in [
+        (r['scenario'], r['operation'], r['metric'])
+        for r in backup_benchmark.compare(run, slower)
+    ]
+    assert backup_benchmark.check_chunker(slower, minimum=1e9)[0]['after'] == (
+        slower['chunker']['mb_per_s']
+    )
+
@@ -0,0 +1,256 @@
+"""
+PrecisionWatch Monitoring Tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+from src.precisionwatch.host_collector import HostCollector
+from src.precisionwatch.monitor_config import SystemMonitor
+
+
+def test_host_collector_samples_once_for_all_monitors():
+    calls = []
+
+    def slow(name, value):
+        def source():
+            calls.append(name)
+            time.sleep(0.2)
+            return value
+        return source
+
+    collector = HostCollector({
+        'cpu': slow('cpu', {'usage_percent': 90.0}),
+        'memory': slow('memory', {'percent': 10.0}),
+        'disk': slow('disk', {'/': {'percent': 95.0}}),
+        'network': slow('network', {'internet_access': True, 'latency': 0.1}),
+        'processes': slow('processes', {'high_usage_processes': []})
+    }, max_age=60)
+    monitors = [SystemMonitor(f"client{i}", collector) for i in range(40)]
+    monitors[0].set_threshold('cpu_percent', 95.0)
+
+    started = time.monotonic()
+    reports = [monitor.check_system_health() for monitor in monitors]
+    assert time.monotonic() - started < 1.0
+    assert sorted(calls) == ['cpu', 'disk', 'memory', 'network', 'processes']
+    assert [a['category'] for a in reports[0]['alerts']] == ['Disk']
+    assert [a['category'] for a in reports[1]['alerts']] == ['CPU', 'Disk']
+    collector.close()
+
+
+def test_rate_sampler_computes_rates_from_counter_deltas(monkeypatch):
+    from collections import namedtuple
+    import psutil
+    from src.precisionwatch.procfs import PsutilCounters
+    from src.precisionwatch.rate_sampler import RateSampler
+
+    CpuTimes = namedtuple('CpuTimes', 'user system idle iowait guest')
+    Disk = namedtuple('Disk', 'read_count write_count read_bytes write_bytes busy_time')
+    Nic = namedtuple('Nic', 'bytes_sent bytes_recv packets_sent packets_recv '
+                            'errin errout dropin dropout')
+    now = [100.0]
+    counters = {
+        'cpu': CpuTimes(10, 5, 80, 5, 3),
+        'disk': {'sda': Disk(100, 50, 10 ** 6, 2 * 10 ** 6, 1000)},
+        'net': {'eth0': Nic(1000, 5000, 10, 50, 0, 0, 0, 0)}
+    }
+    monkeypatch.setattr(psutil, 'cpu_times', lambda: counters['cpu'])
+    monkeypatch.setattr(psutil, 'disk_io_counters', lambda perdisk: counters['disk'])
+    monkeypatch.setattr(psutil, 'net_io_counters', lambda pernic: counters['net'])
+
+    sampler = RateSampler(clock=lambda: now[0], counters=PsutilCounters())
+    now[0] += 2.0
+    counters['cpu'] = CpuTimes(16, 7, 90, 7, 9)
+    counters['disk'] = {'sda': Disk(300, 90, 5 * 10 ** 6, 2 * 10 ** 6, 2000)}
+    counters['net'] = {'eth0': Nic(3000, 25000, 30, 90, 1, 1, 0, 2)}
+
+    # 8 busy of 20 seconds; iowait counts as idle
+    assert sampler.cpu()['usage_percent'] == 40.0
+    assert sampler.disk_io()['sda'] == {
+        'read_bytes_per_sec': 2 * 10 ** 6, 'write_bytes_per_sec': 0.0,
+        'read_iops': 100.0, 'write_iops': 20.0, 'busy_percent': 50.0
+    }
+    net = sampler.net_io()['eth0']
+    assert (net['recv_bytes_per_sec'], net['sent_bytes_per_sec']) == (10000.0, 1000.0)
+    assert net['errors_per_sec'] == 1.0 and net['drops_per_sec'] == 1.0
+
+    # A reset counter is skipped rather than reported as a negative rate
+    now[0] += 1.0
+    counters['disk'] = {'sda': Disk(0, 0, 0, 0, 0)}
+    assert sampler.disk_io() == {}
+
+
+def test_proc_counters_parse_proc_files(tmp_path):
+    from src.precisionwatch.procfs import ProcCounters
+
+    (tmp_path / 'net').mkdir()
+    (tmp_path / 'stat').write_text(
+        "cpu  100 20 30 400 50 6 7 8 9 0\ncpu0 100 20 30 400 50 6 7 8 9 0\n"
+    )
+    (tmp_path / 'meminfo').write_text(
+        "MemTotal:        1000 kB\nMemFree:          200 kB\n"
+        "MemAvailable:     600 kB\nBuffers:           50 kB\n"
+        "Cached:           250 kB\nSReclaimable:      20 kB\n"
+    )
+    (tmp_path / 'diskstats').write_text(
+        "   8       0 sda 10 1 80 5 20 2 160 9 0 30 14 0 0 0 0\n"
+    )
+    (tmp_path / 'net' / 'dev').write_text(
+        "Inter-|   Receive\n face |bytes    packets errs drop\n"
+        "  eth0: 5000 50 1 2 0 0 0 0 1000 10 3 4 0 0 0 0\n"
+    )
+    (tmp_path / 'net' / 'sockstat').write_text(
+        "sockets: used 9\nTCP: inuse 4 orphan 0 tw 2 alloc 6 mem 1\n"
+        "UDP: inuse 1 mem 0\n"
+    )
+
+    counters = ProcCounters(str(tmp_path))
+    ticks = os.sysconf('SC_CLK_TCK')
+    assert counters.cpu_times()['idle'] == 400 / ticks
+    assert len(counters.cpu_times()) == 10
+    assert counters.memory() == {
+        'total': 1024000, 'available': 614400, 'percent': 40.0, 'used': 491520
+    }
+    assert counters.disk_io()['sda'] == {
+        'read_count': 10, 'write_count': 20, 'read_bytes': 80 * 512,
+        'write_bytes': 160 * 512, 'read_time': 5, 'write_time': 9,
+        'busy_time': 30
+    }
+    assert counters.net_io()['eth0'] == {
+        'bytes_recv': 5000, 'packets_recv': 50, 'errin': 1, 'dropin': 2,
+        'bytes_sent': 1000, 'packets_sent': 10, 'errout': 3, 'dropout': 4
+    }
+    # No sockstat6 here, as on hosts without IPv6
+    assert counters.connection_count() == 7
+
+    # Open files are re-read in place
+    (tmp_path / 'stat').write_text("cpu  200 20 30 400 50 6 7 8 9 0\n")
+    assert counters.cpu_times()['user'] == 200 / ticks
+    counters.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="needs /proc")
+def test_proc_counters_agree_with_psutil():
+    from src.precisionwatch.procfs import ProcCounters, PsutilCounters
+
+    fast, slow = ProcCounters(), PsutilCounters()
+    assert set(fast.cpu_times()) <= set(slow.cpu_times())
+    assert fast.memory()['total'] == slow.memory()['total']
+    assert abs(fast.memory()['percent'] - slow.memory()['percent']) < 5
+    assert set(fast.net_io()) == set(slow.net_io())
+    for nic, stats in slow.net_io().items():
+        assert set(stats) == set(fast.net_io()[nic])
+    fast.close()
+
+
+def test_process_table_reports_real_cpu_and_drops_exited():
+    import subprocess
+    from src.precisionwatch.process_table import ProcessTable
+
+    busy = subprocess.Popen([sys.executable, '-c', 'while True: pass'])
+    try:
+        table = ProcessTable(top_n=3)
+        assert busy.pid in table.tracked_pids()
+        time.sleep(0.5)
+        report = table.sample()
+        assert len(report['top_cpu']) == 3
+        assert len(report['top_memory']) == 3
+        top = report['top_cpu'][0]
+        assert top['pid'] == busy.pid and top['cpu_percent'] > 50
+        assert busy.pid in [p['pid'] for p in report['high_usage_processes']]
+    finally:
+        busy.kill()
+        busy.wait()
+
+    report = table.sample()
+    assert busy.pid not in table.tracked_pids()
+    assert busy.pid not in [p['pid'] for p in report['top_cpu']]
+
+
+def test_timeseries_store_downsamples_and_bounds_history(tmp_path):
+    from src.precisionwatch.timeseries import TimeSeriesStore
+
+    now = [0.0]
+    store = TimeSeriesStore(str(tmp_path), block_rows=50,
+                            retention={'raw': 3 * 3600}, clock=lambda: now[0])
+    day = 86400
+    start = 10 * day
+    # Two days of 10-second samples; cpu ramps 0..5 within each minute
+    for i in range(2 * day // 10):
+        now[0] = start + i * 10
+        sample = {'cpu.usage_percent': float(i % 6)}
+        if i % 2:
+            sample['disk./.percent'] = 50.0
+        store.append('web', sample)
+        if i % 360 == 0:
+            assert store.maintain()['status'] == 'success'
+    store.flush()
+    assert store.maintain()['status'] == 'success'
+
+    # Recent data is raw and exact, including samples still in the head
+    recent = store.query('web', ['cpu.usage_percent', 'disk./.percent'],
+                         now[0] - 60, now[0] + 1)
+    assert recent['tier'] == 'raw'
+    assert len(recent['timestamps']) == 7
+    assert None in recent['series']['disk./.percent']
+
+    # Older data was rolled up; raw segments past retention are gone
+    minutes = store.query('web', ['cpu.usage_percent'], start + day - 300,
+                          start + day + 300, aggregate='max')
+    assert minutes['tier'] == '1m'
+    assert minutes['timestamps'] == [start + day + 60 * m for m in range(-5, 5)]
+    assert minutes['series']['cpu.usage_percent'] == [5.0] * 10
+    # Including the first minute of a new day segment
+    for minute in (start, start + day):
+        mean = store.query('web', ['cpu.usage_percent'], minute, minute + 60, tier='1m')
+        assert mean['series']['cpu.usage_percent'] == [2.5]
+    hours = store.query('web', ['cpu.usage_percent'], start, start + 7200,
+                        tier='1h', aggregate='min')
+    assert hours['timestamps'] == [start, start + 3600]
+    assert hours['series']['cpu.usage_percent'] == [0.0, 0.0]
+    assert len(os.listdir(tmp_path / 'web' / 'raw')) == 1
+
+    # Unsealed samples survive a restart, and a torn block is cut off
+    store.append('web', {'cpu.usage_percent': 9.0}, now[0] + 10)
+    segment = tmp_path / 'web' / 'raw' / os.listdir(tmp_path / 'web' / 'raw')[0]
+    with open(segment, 'ab') as f:
+        f.write(b'PWB1\x00\x01')
+    reopened = TimeSeriesStore(str(tmp_path), clock=lambda: now[0] + 20)
+    assert reopened.query('web', ['cpu.usage_percent'],
+                          now[0] + 5)['series']['cpu.usage_percent'] == [9.0]
+    reopened.flush()
+    reopened.append('web', {'cpu.usage_percent': 8.0}, now[0] + 20)
+    reopened.flush()
+    tail = reopened.query('web', ['cpu.usage_percent'], now[0] + 5)
+    assert tail['series']['cpu.usage_percent'] == [9.0, 8.0]
+
+    # A byte budget trims the oldest, finest segments first
+    capped = TimeSeriesStore(str(tmp_path), max_bytes=1, clock=lambda: now[0])
+    assert capped.maintain()['removed_segments'] > 0
+    assert len(os.listdir(tmp_path / 'web' / '1m')) == 1
+    assert len(os.listdir(tmp_path / 'web' / '1h')) == 1
+
+
+def test_monitor_manager_records_health_history(tmp_path, monkeypatch):
+    from datetime import datetime
+    from src.precisionwatch.monitor_manager import MonitorManager
+
+    monkeypatch.chdir(tmp_path)
+    manager = MonitorManager(history_root=str(tmp_path / 'history'))
+    sampled = datetime(2026, 1, 1, 12, 0, 0)
+    manager._process_health_data('web', {
+        'status': 'success',
+        'data': {'timestamp': sampled.isoformat(),
+                 'cpu': {'usage_percent': 12.5, 'core_count': 4},
+                 'processes': {'count': 80, 'top_cpu': [{'pid': 1}]}},
+        'alerts': []
+    })
+    assert [name for name in os.listdir(tmp_path) if name.startswith('health_')] == []
+
+    history = manager.get_client_history(
+        'web', ['cpu.usage_percent', 'processes.count'], sampled.timestamp()
+    )
+    assert history['series'] == {'cpu.usage_percent': [12.5], 'processes.count': [80.0]}
+    manager.collector.close()